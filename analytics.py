@@ -0,0 +1,234 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import YEAR_TYPE_COLUMNS
+from ledger import process_data
+from perf import timed
+from typed_ledger import AMOUNT_SATANG
+
+# ==========================================
+# วิเคราะห์การเบิกจ่าย: ยอดสะสมรายเดือน, อัตราการเบิกจ่ายเทียบวงเงิน, เทียบปีก่อน
+# ==========================================
+# group by รายการเบิกทั้งหมดครั้งเดียวเป็น "cube" ยอดรวม (สตางค์) ต่อ ปี/เดือน/คณะ/รหัสหมวด
+# (ไม่เกินหลักหมื่นแถวแม้ ledger มีเป็นล้านรายการ) แล้วคำนวณทุกตารางของทั้ง 3 ประเภทปีจาก cube นี้
+# ยอดเงินรวมจาก int64 สตางค์แล้วค่อยแปลงเป็นบาท ตัวเลขจึงไม่มีเศษ float สะสม
+# app.py cache ผลลัพธ์ไว้ด้วยคีย์ (เวอร์ชันข้อมูล, เวอร์ชันวงเงิน, วันที่) การสลับปี/ประเภทปีจึงไม่คำนวณใหม่
+
+# เดือนแรกของแต่ละประเภทปี และปี พ.ศ. ของเดือนแรกเทียบกับเลขปี (ตรงกับกฎใน process_data())
+# ปีงบประมาณ 2569 = ส.ค. 2568 - ก.ค. 2569, ปีการศึกษา 2569 = มิ.ย. 2569 - พ.ค. 2570
+START_MONTH = {"ปีงบประมาณ": 8, "ปีพุทธศักราช": 1, "ปีการศึกษา": 6}
+START_YEAR_OFFSET = {"ปีงบประมาณ": -1, "ปีพุทธศักราช": 0, "ปีการศึกษา": 0}
+
+DIMENSIONS = ["คณะ", "รหัสหมวด"]
+PERIODS = list(range(1, 13))
+
+
+@timed("analytics.cube")
+def spend_cube(claims):
+    """ยอดรวมสตางค์ต่อ (ปี, เดือน, คณะ, รหัสหมวด) จาก DataFrame ที่ผ่าน process_data() แล้ว"""
+    columns = ["ปี", "เดือน"] + DIMENSIONS + [AMOUNT_SATANG]
+    if claims.empty:
+        return pd.DataFrame(columns=columns)
+    valid = claims[(claims["ปี"] > 0) & claims["เดือน"].between(1, 12)]
+    if AMOUNT_SATANG in valid.columns:
+        satang = valid[AMOUNT_SATANG]
+    else:
+        satang = (valid["จำนวนเงิน"] * 100).round().astype("int64")
+    keys = [valid["ปี"].astype("int64"), valid["เดือน"].astype("int64")]
+    for dim in DIMENSIONS:
+        col = valid[dim]
+        # category จาก typed_ledger ใช้ได้เลย (group by เร็วกว่า) คอลัมน์ object ต้องเติมช่องว่างก่อน
+        keys.append(col if isinstance(col.dtype, pd.CategoricalDtype) else col.fillna("").astype(str))
+    cube = satang.groupby(keys, observed=True).sum().rename(AMOUNT_SATANG).reset_index()
+    cube[DIMENSIONS] = cube[DIMENSIONS].astype(str)
+    return cube[columns]
+
+
+def _long_cube(cube):
+    """cube ซ้อนกัน 3 ชุดตามประเภทปี: year_type, year, period (เดือนที่ 1-12 ของปีนั้น), คณะ, รหัสหมวด, สตางค์"""
+    if cube.empty:
+        return pd.DataFrame(columns=["year_type", "year", "period"] + DIMENSIONS + [AMOUNT_SATANG])
+    cube = process_data(cube.assign(จำนวนเงิน=cube[AMOUNT_SATANG] / 100))
+    frames = []
+    for year_type, col in YEAR_TYPE_COLUMNS.items():
+        frames.append(pd.DataFrame({
+            "year_type": year_type,
+            "year": cube[col].astype("int64"),
+            "period": (cube["เดือน"].astype("int64") - START_MONTH[year_type]) % 12 + 1,
+            "คณะ": cube["คณะ"],
+            "รหัสหมวด": cube["รหัสหมวด"],
+            AMOUNT_SATANG: cube[AMOUNT_SATANG].astype("int64"),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def period_month(year_type, year, period):
+    """(ปี พ.ศ., เดือน) ตามปฏิทินของเดือนที่ period ในปี year (รับ Series ได้)"""
+    start = np.vectorize(START_MONTH.get)(year_type) if not isinstance(year_type, str) else START_MONTH[year_type]
+    offset = np.vectorize(START_YEAR_OFFSET.get)(year_type) if not isinstance(year_type, str) else START_YEAR_OFFSET[year_type]
+    month = (start + period - 2) % 12 + 1
+    return year + offset + (month < start), month
+
+
+def year_start(year_type, year):
+    """วันแรกของปี (ค.ศ. แบบ Timestamp) รับ Series ได้"""
+    cal_year, month = period_month(year_type, year, 1)
+    return pd.to_datetime(pd.DataFrame({"year": np.asarray(cal_year) - 543, "month": month, "day": 1}))
+
+
+def current_period(year_type, today):
+    """(ปีของ year_type ที่มีวันนี้, เดือนที่เท่าไรของปีนั้น)"""
+    be_year, month = today.year + 543, today.month
+    start = START_MONTH[year_type]
+    year = be_year - START_YEAR_OFFSET[year_type] - (month < start)
+    return year, (month - start) % 12 + 1
+
+
+def _elapsed_periods(year_types, years, today):
+    """จำนวนเดือนที่ผ่านไปแล้ว (รวมเดือนปัจจุบัน) ของแต่ละปี: ปีที่จบแล้ว = 12, ปีอนาคต = 0"""
+    elapsed = np.zeros(len(years), dtype="int64")
+    for year_type in START_MONTH:
+        cur_year, cur_period = current_period(year_type, today)
+        mask = np.asarray(year_types == year_type)
+        yrs = np.asarray(years)[mask]
+        elapsed[mask] = np.where(yrs < cur_year, 12, np.where(yrs == cur_year, cur_period, 0))
+    return elapsed
+
+
+def _wide_cumulative(long, keys):
+    """ยอดสะสม (สตางค์) เดือนที่ 1..12 เป็นคอลัมน์ ต่อ keys (เดือนที่ไม่มีรายการ = ยอดเท่าเดือนก่อน)"""
+    monthly = long.groupby(keys + ["period"])[AMOUNT_SATANG].sum().unstack("period", fill_value=0)
+    return monthly.reindex(columns=PERIODS, fill_value=0).cumsum(axis=1)
+
+
+def cumulative_spend(long):
+    """ยอดรายเดือนและยอดสะสม 12 เดือนของทุก (ประเภทปี, ปี)"""
+    columns = ["year_type", "year", "period", "ปี", "เดือน", "จำนวนเงิน", "สะสม"]
+    if long.empty:
+        return pd.DataFrame(columns=columns)
+    cum = _wide_cumulative(long, ["year_type", "year"])
+    out = cum.stack().rename("สะสม").reset_index()
+    out["จำนวนเงิน"] = out.groupby(["year_type", "year"])["สะสม"].diff().fillna(out["สะสม"]) / 100
+    out["สะสม"] = out["สะสม"] / 100
+    out["ปี"], out["เดือน"] = period_month(out["year_type"].values, out["year"].values, out["period"].values)
+    return out[columns]
+
+
+def burn_rates(long, targets, today):
+    """อัตราการเบิกจ่ายเทียบวงเงินทุกรายการใน targets ({(year_type, year): {(คณะ, รหัสหมวด): amount}})
+
+    คืน DataFrame: year_type, year, คณะ, รหัสหมวด, วงเงิน, ใช้ไป, ใช้ไป_%, เวลาผ่านไป_%,
+    เฉลี่ยต่อเดือน, คาดการณ์ทั้งปี, วันที่คาดว่าเกินวงเงิน (NaT = ไม่เกินภายในปีนั้น), สถานะ
+    """
+    rows = [(yt, year, fac, cat, amount)
+            for (yt, year), scoped in targets.items() for (fac, cat), amount in scoped.items()]
+    tdf = pd.DataFrame(rows, columns=["year_type", "year", "คณะ", "รหัสหมวด", "วงเงิน"])
+    if tdf.empty:
+        return tdf.assign(ใช้ไป=pd.Series(dtype=float))
+
+    # ยอดใช้จ่ายของวงเงินแต่ละระดับ: รวมทั้งปี / รายคณะ / รายหมวด / คณะ+หมวด
+    parts = []
+    for has_fac in (False, True):
+        for has_cat in (False, True):
+            keys = ["year_type", "year"] + (["คณะ"] if has_fac else []) + (["รหัสหมวด"] if has_cat else [])
+            sub = tdf[((tdf["คณะ"] != "") == has_fac) & ((tdf["รหัสหมวด"] != "") == has_cat)]
+            if sub.empty:
+                continue
+            spent = long.groupby(keys)[AMOUNT_SATANG].sum().rename("ใช้ไป").reset_index() if not long.empty \
+                else pd.DataFrame(columns=keys + ["ใช้ไป"])
+            parts.append(sub.merge(spent, on=keys, how="left"))
+    out = pd.concat(parts, ignore_index=True)
+    out["ใช้ไป"] = pd.to_numeric(out["ใช้ไป"]).fillna(0) / 100
+    out["year"] = out["year"].astype("int64")
+
+    start = year_start(out["year_type"].values, out["year"].values)
+    end = (start.dt.to_period("M") + 12).dt.to_timestamp() - pd.Timedelta(days=1)
+    year_days = (end - start).dt.days + 1
+    now = pd.Timestamp(today)
+    days_elapsed = ((now - start).dt.days + 1).clip(0, year_days)
+    per_day = out["ใช้ไป"] / days_elapsed.where(days_elapsed > 0)
+
+    out["ใช้ไป_%"] = out["ใช้ไป"] / out["วงเงิน"].where(out["วงเงิน"] > 0) * 100
+    out["เวลาผ่านไป_%"] = days_elapsed / year_days * 100
+    out["เฉลี่ยต่อเดือน"] = per_day * year_days / 12
+    out["คาดการณ์ทั้งปี"] = per_day * year_days
+
+    in_progress = (days_elapsed > 0) & (days_elapsed < year_days)
+    exceeded = out["ใช้ไป"] > out["วงเงิน"]
+    days_left = np.ceil((out["วงเงิน"] - out["ใช้ไป"]) / per_day.where(per_day > 0))
+    overrun = now + pd.to_timedelta(days_left, unit="D")
+    will_exceed = in_progress & ~exceeded & (overrun <= end)
+    out["วันที่คาดว่าเกินวงเงิน"] = overrun.where(will_exceed)
+    out["สถานะ"] = np.select(
+        [exceeded, will_exceed, days_elapsed == 0],
+        ["เกินวงเงินแล้ว", "คาดว่าจะเกินวงเงิน", "ยังไม่เริ่มปี"],
+        "อยู่ในวงเงิน",
+    )
+    return out.sort_values(["year_type", "year", "คณะ", "รหัสหมวด"], ignore_index=True)
+
+
+def year_over_year(long, dim, today):
+    """ยอดต่อ dim (คณะ/รหัสหมวด) เทียบปีก่อนหน้า ทั้งทั้งปีและช่วงเดียวกัน (ปีที่ยังไม่จบเทียบเท่าจำนวนเดือนที่ผ่านไป)
+
+    คืน DataFrame: year_type, year, dim, จำนวนเงิน, ปีก่อน, ปีก่อน_ช่วงเดียวกัน, เปลี่ยนแปลง, เปลี่ยนแปลง_%
+    """
+    keys = ["year_type", "year", dim]
+    columns = keys + ["จำนวนเงิน", "ปีก่อน", "ปีก่อน_ช่วงเดียวกัน", "เปลี่ยนแปลง", "เปลี่ยนแปลง_%"]
+    if long.empty:
+        return pd.DataFrame(columns=columns)
+    cum = _wide_cumulative(long, keys)
+    prev = cum.rename(index=lambda y: y + 1, level="year")
+    # ทุก (ปี, dim) ที่มียอดในปีนั้นหรือปีก่อน เฉพาะปีที่มีข้อมูล (ไม่สร้างแถวของปีถัดจากปีล่าสุด)
+    index = cum.index.union(prev.index)
+    years = cum.index.droplevel(dim).unique()
+    index = index[index.droplevel(dim).isin(years)]
+    cur_cum = cum.reindex(index, fill_value=0).to_numpy()
+    prev_cum = prev.reindex(index, fill_value=0).to_numpy()
+
+    out = index.to_frame(index=False)
+    elapsed = _elapsed_periods(out["year_type"].values, out["year"].values, today)
+    same_period = np.where(elapsed > 0, prev_cum[np.arange(len(out)), np.maximum(elapsed, 1) - 1], 0)
+    out["จำนวนเงิน"] = cur_cum[:, -1] / 100
+    out["ปีก่อน"] = prev_cum[:, -1] / 100
+    out["ปีก่อน_ช่วงเดียวกัน"] = same_period / 100
+    out["เปลี่ยนแปลง"] = out["จำนวนเงิน"] - out["ปีก่อน_ช่วงเดียวกัน"]
+    out["เปลี่ยนแปลง_%"] = out["เปลี่ยนแปลง"] / out["ปีก่อน_ช่วงเดียวกัน"].where(out["ปีก่อน_ช่วงเดียวกัน"] > 0) * 100
+    return out.sort_values(keys, ignore_index=True)[columns]
+
+
+@timed("analytics.build")
+def build_analytics(claims, targets, today=None):
+    """คำนวณทุกตารางจาก DataFrame ที่ผ่าน process_data() (หรือ typed_ledger.load_claims()) ในครั้งเดียว
+
+    คืน dict: "cumulative", "burn", "yoy" ({"คณะ": DataFrame, "รหัสหมวด": DataFrame})
+    """
+    today = today or date.today()
+    long = _long_cube(spend_cube(claims))
+    return {
+        "today": today,
+        "cumulative": cumulative_spend(long),
+        "burn": burn_rates(long, targets, today),
+        "yoy": {dim: year_over_year(long, dim, today) for dim in DIMENSIONS},
+    }
+
+
+def select_year(result, year_type, year):
+    """ตัดเฉพาะ (year_type, year) จากผลของ build_analytics() สำหรับหน้าสรุป
+
+    "cumulative" ของปีที่ยังไม่จบมีเฉพาะเดือนที่ผ่านมาแล้ว, "previous" = ยอดสะสมทั้งปีของปีก่อนหน้า
+    """
+    year = int(year)
+
+    def pick(df, y=year):
+        return df[(df["year_type"] == year_type) & (df["year"] == y)].drop(columns=["year_type", "year"])
+
+    elapsed = _elapsed_periods(np.array([year_type]), np.array([year]), result["today"])[0]
+    cumulative = pick(result["cumulative"])
+    return {
+        "cumulative": cumulative[cumulative["period"] <= elapsed],
+        "previous": pick(result["cumulative"], year - 1),
+        "burn": pick(result["burn"]),
+        "yoy": {dim: pick(df) for dim, df in result["yoy"].items()},
+    }
@@ -1,17 +1,25 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import os
 import io
-import altair as alt
-import requests
-
-# --- Library สำหรับ PDF ---
-from pypdf import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.pagesizes import A4
+import math
+
+import perf
+import sqlite_store
+from doc_numbers import parse_doc_seq, peek_next_doc_no
+from dashboard_data import file_version, sync_rollup, sync_monthly, summarize, available_years
+from ledger import ensure_ledger, needs_compaction, process_data
+from analytics import build_analytics, select_year
+from charts import cumulative_spec, donut_spec, monthly_trend_spec
+from budget_targets import TargetStore, attach_targets
+from bulk_import import REQUIRED_COLUMNS, read_upload, import_claims
+from batch_pdf import select_claims, write_merged_pdf, write_zip
+from export import EXPORT_FORMATS, available_formats, export_to_tempfile, iter_ledger_chunks
+from master_data import BUDGET_MASTER, FACULTY_MASTER, category_label
+from pdf_render import TEMPLATE_PDF, FONT_FILE, THAI_MONTHS, create_filled_pdf, ensure_font
+from thai_baht import bahttext
+from typed_ledger import load_claims
+from write_queue import WriteQueue
 
 # ==========================================
 # 1. ตั้งค่าระบบ (Configuration)
@@ -20,304 +28,200 @@ st.set_page_config(page_title="ระบบบริหารจัดการ
 
 DB_FILE = "database_claims.csv"
 TARGET_FILE = "budget_targets.csv"
-TEMPLATE_PDF = "ใบเบิก.pdf"         
-FONT_FILE = "THSarabunNew.ttf"       
-FONT_URL = "https://github.com/gungunss/ThaiFonts/raw/master/THSarabunNew.ttf"
-
-# --- 🎯 ฐานข้อมูลพิกัดข้อความ (PDF CONFIG) จัดกลุ่มล็อกบรรทัด ---
-# แกน Y (ความสูง) ของข้อมูลบรรทัดเดียวกันจะเท่ากันเสมอ เพื่อไม่ให้ข้อความเด้ง
-PDF_CONFIG = {
-    # บรรทัดที่ 1 (หน่วยงาน)
-    "faculty":    (160, 765),
-    
-    # บรรทัดที่ 2 (ที่ มพย และ วันที่)
-    "doc_no":     (100, 740),
-    "date_day":   (360, 740),
-    "date_month": (410, 740),
-    "date_year":  (490, 740),
-    
-    # บรรทัดที่ 3 (เรื่อง)
-    "subject":    (100, 715),
-    
-    # บรรทัดที่ 4 (สิ่งที่ส่งมาด้วย)
-    "attach_1":   (130, 665),
-    
-    # บรรทัดที่ 5 (ขอเบิกเงิน และ จำนวนเงินตัวเลข)
-    "check_req":  (72, 625),   # กากบาท [X] หน้าขอเบิกเงิน
-    "amount":     (190, 625),  # ตัวเลขจำนวนเงิน
-    
-    # บรรทัดที่ 6 (จำนวนเงินตัวอักษร - อยู่บรรทัดถัดลงมาตรงวงเล็บ)
-    "amount_txt": (150, 600),
-    
-    # บรรทัดที่ 7 (สั่งจ่าย และ วันที่รับเงิน)
-    "pay_to":     (130, 575),
-    "req_d":      (340, 575),
-    "req_m":      (390, 575),
-    "req_y":      (470, 575),
-    
-    # บรรทัดที่ 8 (เข้าบัญชีธนาคาร)
-    "check_bank": (72, 500),   # กากบาท [X] หน้าเข้าบัญชีธนาคาร
-    "bank_detail":(230, 500),  # ชื่อธนาคารและเลขบัญชี
-    
-    # บรรทัดที่ 9 (เพื่อใช้ในกิจกรรม)
-    "project":    (210, 475),
-    
-    # บรรทัดที่ 10 (งบประมาณของหน่วยงาน)
-    "faculty_budget": (240, 450),
-    
-    # บรรทัดที่ 11 (ในงบประมาณข้อ)
-    "check_budget": (72, 425), # กากบาท [X] หน้าในงบประมาณข้อ
-    "budget_cat": (180, 425),  # หมวดงบประมาณ
-    
-    # ส่วนลงชื่อผู้เบิก (ด้านล่างขวา)
-    "leader":     (360, 310),
-    "position":   (360, 285),
-}
-
-# --- Master Data ---
-BUDGET_MASTER = {
-    "541010001": "หมวดส่งเสริมการวิจัย", 
-    "521130002": "ค่าถ่ายเอกสาร",
-    "521130004": "วัสดุสิ้นเปลืองสำนักงาน", 
-    "531111005": "ค่ายานพาหนะ",
-    "521140007": "สัมมนาภายใน", 
-    "531104002": "ค่าไปรษณียากร"
-}
-
-FACULTY_MASTER = [
-    "คณะนิติศาสตร์", "คณะบริหารธุรกิจ", "วิทยาลัยสหวิทยาการ",
-    "คณะพยาบาลศาสตร์แมคคอร์มิค", "คณะเภสัชศาสตร์", "วิทยาลัยนานาชาติ",
-    "วิทยาลัยดุริยศิลป์", "วิทยาลัยพระคริสต์ธรรมแมคกิลวารี",
-    "บัณฑิตวิทยาลัย", "สำนักการศึกษาทั่วไป", "สำนักวิจัย", "สำนักบริการวิชาการ"
-]
+COUNTER_DB = "doc_counter.db"       # ตัวนับเลขที่เอกสารแยกตามปี
+ROLLUP_FILE = "budget_rollup.json"  # ยอดรวมสำหรับหน้าสรุป (อัปเดตทุกครั้งที่บันทึก)
+TYPED_FILE = "database_claims.parquet"  # สำเนา DB_FILE แบบ typed สำหรับงานวิเคราะห์ (typed_ledger.py)
+SQLITE_DB = sqlite_store.SQLITE_DB
+IMPORT_TIMEOUT = 600  # วินาที: นำเข้าจำนวนมากรอคิวเขียนได้นานกว่างานอื่น (ค่าเริ่มต้น WRITE_TIMEOUT)
+
+# เลือกที่เก็บข้อมูล: "csv" (ค่าเริ่มต้น) หรือ "sqlite"
+# ย้ายข้อมูลเดิมด้วย: python sqlite_store.py migrate แล้วตั้ง PAYAP_STORAGE=sqlite
+STORAGE_BACKEND = os.environ.get("PAYAP_STORAGE", "csv").lower()
+USE_SQLITE = STORAGE_BACKEND == "sqlite"
+if USE_SQLITE:
+    # ตัวนับเลขที่เอกสารอยู่ในไฟล์ฐานข้อมูลเดียวกัน (migrator ตั้งเลขต่อจากข้อมูลเดิมไว้แล้ว)
+    COUNTER_DB = SQLITE_DB
 
 # ==========================================
 # 2. ฟังก์ชันระบบจัดการไฟล์
 # ==========================================
 
 def check_and_download_font():
-    if not os.path.exists(FONT_FILE):
-        try:
-            response = requests.get(FONT_URL)
-            if response.status_code == 200:
-                with open(FONT_FILE, "wb") as f: 
-                    f.write(response.content)
-        except: 
-            pass
+    # ไม่บล็อกการแสดงผล: ใช้ไฟล์ที่มีอยู่/สำเนาใน cache ถ้าไม่มีจะดาวน์โหลดเบื้องหลัง
+    return ensure_font(FONT_FILE)
 
 def init_files():
-    if not os.path.exists(DB_FILE):
-        cols = [
-            "NO", "เลขที่ออก", "วัน", "เดือน", "ปี", "ผู้ลงนาม", "ถึง", "เรื่อง", 
-            "คณะ", "หัวหน้าโครงการวิจัย", "ผู้ประสาน", "เงินที่อนุมัติ", 
-            "จำนวนเงิน", "ชื่อโครงการ", "รหัสหมวด", "บันทึกเมื่อ", 
-            "สิ่งที่ส่งมาด้วย", "จำนวนเงิน_ตัวอักษร", "สั่งจ่ายให้", "ธนาคาร", "ตำแหน่ง"
-        ]
-        pd.DataFrame(columns=cols).to_csv(DB_FILE, index=False, encoding='utf-8-sig')
-    
-    if not os.path.exists(TARGET_FILE):
-        pd.DataFrame(columns=["year_type", "year", "amount"]).to_csv(TARGET_FILE, index=False, encoding='utf-8-sig')
-        
+    if USE_SQLITE:
+        sqlite_store.init_db(SQLITE_DB)
+        check_and_download_font()
+        return
+
+    if not os.path.exists(DB_FILE) or needs_compaction(DB_FILE):
+        # สร้างไฟล์ใหม่ หรือไฟล์เก่าที่หัวตารางไม่ตรง schema/มีแถวเขียนค้าง -> จัดระเบียบครั้งเดียว
+        # ทำผ่านคิวเขียน ไม่งั้นอาจเขียนทับแถวที่ session อื่นเพิ่งบันทึก
+        get_write_queue().call(ensure_ledger, DB_FILE)
+
     check_and_download_font()
 
 def get_current_date():
     now = datetime.now()
     thai_year = now.year + 543
-    thai_months = [
-        "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน", "พฤษภาคม", "มิถุนายน",
-        "กรกฎาคม", "สิงหาคม", "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม"
-    ]
-    month_str = thai_months[now.month - 1]
+    month_str = THAI_MONTHS[now.month - 1]
     return now, thai_year, f"{now.day} {month_str} {thai_year}", month_str
 
 def get_next_doc_no():
+    """เลขที่เอกสารถัดไปสำหรับแสดงผล (ยังไม่จอง)"""
+    _, current_year, _, _ = get_current_date()
     try:
-        if not os.path.exists(DB_FILE): 
-            return "0203/001"
-            
-        df = pd.read_csv(DB_FILE, encoding='utf-8-sig')
-        if df.empty: 
-            return "0203/001"
-            
-        df['ปี'] = pd.to_numeric(df['ปี'], errors='coerce').fillna(0).astype(int)
-        _, current_year, _, _ = get_current_date()
-        
-        if current_year > df['ปี'].max(): 
-            return "0203/001"
-            
-        last_doc = str(df['เลขที่ออก'].iloc[-1])
-        if "/" in last_doc: 
-            return f"0203/{int(last_doc.split('/')[-1]) + 1:03d}"
-            
-        return "0203/001"
-    except: 
+        return peek_next_doc_no(COUNTER_DB, current_year, None if USE_SQLITE else DB_FILE)
+    except Exception:
         return "0203/001"
 
-def process_data(df):
-    if df.empty: 
-        return df
-        
-    required_cols = ['ปี', 'เดือน', 'จำนวนเงิน', 'ปีงบประมาณ', 'ปีการศึกษา', 'ปีปฏิทิน']
-    for col in required_cols:
-        if col not in df.columns: 
-            if col == 'จำนวนเงิน':
-                df[col] = pd.Series(dtype='float')
-            else:
-                df[col] = pd.Series(dtype='int')
-                
-    df['ปี'] = pd.to_numeric(df['ปี'], errors='coerce').fillna(0).astype(int)
-    df['เดือน'] = pd.to_numeric(df['เดือน'], errors='coerce').fillna(0).astype(int)
-    df['จำนวนเงิน'] = pd.to_numeric(df['จำนวนเงิน'], errors='coerce').fillna(0.0)
-    
-    df['ปีงบประมาณ'] = df.apply(lambda x: int(x['ปี']) + 1 if int(x['เดือน']) >= 8 else int(x['ปี']), axis=1)
-    df['ปีการศึกษา'] = df.apply(lambda x: int(x['ปี']) if int(x['เดือน']) >= 6 else int(x['ปี']) - 1, axis=1)
-    df['ปีปฏิทิน'] = df['ปี']
-    
-    return df
+def reset_all_data():
+    """ลบไฟล์ข้อมูลทั้งหมดแล้วสร้างใหม่ (เรียกผ่านคิวเขียน จึงไม่ชนกับการบันทึกที่ค้างอยู่)"""
+    if os.path.exists(DB_FILE): 
+        os.remove(DB_FILE)
+    if os.path.exists(TARGET_FILE): 
+        os.remove(TARGET_FILE)
+    if os.path.exists(COUNTER_DB): 
+        os.remove(COUNTER_DB)
+    if os.path.exists(ROLLUP_FILE): 
+        os.remove(ROLLUP_FILE)
+    if os.path.exists(TYPED_FILE):
+        os.remove(TYPED_FILE)
+    if os.path.exists(FONT_FILE): 
+        os.remove(FONT_FILE)
+    init_files()
 
 # ==========================================
 # 3. PDF Generator & Budget Functions
 # ==========================================
-def get_target_budget(year_type, year):
-    if not os.path.exists(TARGET_FILE): 
-        return 0.0
-    try:
-        df = pd.read_csv(TARGET_FILE)
-        match = df[(df['year_type'] == year_type) & (df['year'] == year)]
-        if not match.empty: 
-            return float(match['amount'].iloc[0])
-        return 0.0
-    except: 
-        return 0.0
-
-def save_target_budget(year_type, year, amount):
-    if not os.path.exists(TARGET_FILE):
-        df = pd.DataFrame(columns=["year_type", "year", "amount"])
-    else: 
-        df = pd.read_csv(TARGET_FILE)
-        
-    df = df[~((df['year_type'] == year_type) & (df['year'] == year))]
-    new_row = pd.DataFrame([{"year_type": year_type, "year": year, "amount": amount}])
-    df = pd.concat([df, new_row], ignore_index=True)
-    df.to_csv(TARGET_FILE, index=False, encoding='utf-8-sig')
-
-def create_filled_pdf(data):
-    if not os.path.exists(TEMPLATE_PDF):
-        st.error(f"❌ ไม่พบไฟล์ {TEMPLATE_PDF}")
-        return None
-    
-    font_name = "Helvetica"
-    if os.path.exists(FONT_FILE):
-        pdfmetrics.registerFont(TTFont('ThaiFont', FONT_FILE))
-        font_name = 'ThaiFont'
-    
-    packet = io.BytesIO()
-    can = canvas.Canvas(packet, pagesize=A4)
-    can.setFont(font_name, 14)
-
-    def draw(key, text):
-        if key in PDF_CONFIG:
-            base_x, base_y = PDF_CONFIG[key]
-            can.drawString(base_x, base_y, str(text))
-
-    # --- วาดข้อความลง PDF ---
-    draw("faculty", data.get("คณะ", ""))
-    draw("doc_no", data.get("เลขที่ออก", ""))
-    draw("date_day", data["วัน"])
-    draw("date_month", data["เดือน_ตัวอักษร"])
-    draw("date_year", data["ปี"])
-    
-    draw("subject", data.get("เรื่อง", ""))
-    # ไม่ดึง "ถึง" หรือ "เรียน" มาวาดใน PDF แล้ว
-    
-    draw("attach_1", data.get("สิ่งที่ส่งมาด้วย", "-"))
-    
-    can.setFont("Helvetica-Bold", 14)
-    draw("check_req", "X")
-    can.setFont(font_name, 14)
-    
-    draw("amount", f"{data['จำนวนเงิน']:,.2f}")
-    draw("amount_txt", f"({data.get('จำนวนเงิน_ตัวอักษร', '')})")
-    
-    draw("pay_to", data.get("สั่งจ่ายให้", ""))
-    draw("req_d", data["วัน"])
-    draw("req_m", data["เดือน_ตัวอักษร"])
-    draw("req_y", data["ปี"])
-    
-    if data.get("ธนาคาร", "") != "":
-        can.setFont("Helvetica-Bold", 14)
-        draw("check_bank", "X")
-        can.setFont(font_name, 12)
-        draw("bank_detail", data.get("ธนาคาร", ""))
-        can.setFont(font_name, 14)
-    
-    draw("project", data.get("ชื่อโครงการ", ""))
-    draw("faculty_budget", data.get("คณะ", ""))
-    
-    can.setFont("Helvetica-Bold", 14)
-    draw("check_budget", "X")
-    can.setFont(font_name, 14)
-    draw("budget_cat", data.get("รหัสหมวด", ""))
-    
-    draw("leader", f"({data.get('หัวหน้าโครงการวิจัย', '')})")
-    draw("position", data.get("ตำแหน่ง", ""))
-
-    can.save()
-    packet.seek(0)
-    
-    try:
-        new_pdf = PdfReader(packet)
-        existing_pdf = PdfReader(open(TEMPLATE_PDF, "rb"))
-        output = PdfWriter()
-        page = existing_pdf.pages[0]
-        page.merge_page(new_pdf.pages[0])
-        output.add_page(page)
-        
-        out_stream = io.BytesIO()
-        output.write(out_stream)
-        out_stream.seek(0)
-        return out_stream
-    except Exception as e:
-        st.error(f"PDF Error: {e}")
-        return None
-
-def plot_donut_chart(data, category_col, value_col):
+@st.cache_resource
+def get_write_queue():
+    # thread เขียนตัวเดียวต่อ process: ทุก session บันทึกรายการ/วงเงิน/ล้างข้อมูลผ่านคิวนี้
+    if USE_SQLITE:
+        return WriteQueue(COUNTER_DB, sqlite_db=SQLITE_DB)
+    return WriteQueue(COUNTER_DB, DB_FILE, ROLLUP_FILE)
+
+@st.cache_resource
+def get_target_store():
+    # สร้างครั้งเดียวต่อ process ทุก session ใช้ dict วงเงินชุดเดียวกัน
+    return TargetStore(TARGET_FILE)
+
+def get_target_budget(year_type, year, faculty="", category=""):
+    if USE_SQLITE:
+        return sqlite_store.get_target(SQLITE_DB, year_type, year, faculty, category)
+    return get_target_store().get(year_type, year, faculty, category)
+
+def get_scoped_targets(year_type, year):
+    """วงเงินรายคณะ/รายหมวดของปีนั้น {(คณะ, รหัสหมวด): amount}"""
+    if USE_SQLITE:
+        return sqlite_store.get_targets_for_year(SQLITE_DB, year_type, year)
+    return get_target_store().for_year(year_type, year)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _cached_rollup(version):
+    return sync_rollup(DB_FILE, ROLLUP_FILE)
+
+def get_rollup():
+    """ตารางยอดรวมของหน้าสรุป โหลดใหม่เฉพาะเมื่อ DB_FILE เปลี่ยน"""
+    return _cached_rollup(file_version(DB_FILE))
+
+def get_spend_source():
+    """คืน (source, summarize, available_years) ของที่เก็บข้อมูลที่เลือก
+    CSV ใช้ rollup, SQLite ใช้ query ที่มี index (ทั้งสองแบบมี signature เดียวกัน)"""
+    if USE_SQLITE:
+        return SQLITE_DB, sqlite_store.summarize, sqlite_store.available_years
+    return get_rollup(), summarize, available_years
+
+def save_claim(data):
+    """บันทึกผ่านคิวเขียน (จองเลขที่เอกสาร + เขียนรวมกับ session อื่นที่กดพร้อมกัน) คืนเลขที่เอกสาร"""
+    return get_write_queue().save_claim(data)
+
+def iter_export_chunks(**filters):
+    """อ่านเฉพาะแถวที่กรองแล้วทีละ chunk จากที่เก็บข้อมูลที่เลือก"""
+    if USE_SQLITE:
+        return sqlite_store.iter_claim_chunks(SQLITE_DB, **filters)
+    return iter_ledger_chunks(DB_FILE, **filters)
+
+def select_claims_for_print(*args):
+    return sqlite_store.select_claims(SQLITE_DB, *args) if USE_SQLITE else select_claims(DB_FILE, *args)
+
+def save_target_budget(year_type, year, amount, faculty="", category=""):
+    if USE_SQLITE:
+        get_write_queue().call(sqlite_store.save_target, SQLITE_DB, year_type, year, amount, faculty, category)
+        return
+    get_write_queue().call(get_target_store().set, year_type, year, amount, faculty, category)
+
+def get_data_version():
+    """เวอร์ชันของข้อมูลรายการเบิก (mtime, size) ใช้เป็นคีย์ cache ของกราฟ"""
+    return file_version(SQLITE_DB if USE_SQLITE else DB_FILE)
+
+def get_monthly_spend():
+    if USE_SQLITE:
+        return sqlite_store.monthly_spend(SQLITE_DB)
+    return sync_monthly(DB_FILE, ROLLUP_FILE)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _cached_donut_spec(year_type, year, dim, version, _data):
+    # _data ไม่ถูก hash: คีย์ cache คือ (year_type, year, dim, version) เท่านั้น
+    return donut_spec(_data, dim, "จำนวนเงิน")
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_trend_spec(year_type, year, version):
+    return monthly_trend_spec(get_monthly_spend(), year_type, year)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _cached_analytics(data_version, target_version, today):
+    if USE_SQLITE:
+        claims = sqlite_store.read_claims(SQLITE_DB, ["ปี", "เดือน", "คณะ", "รหัสหมวด", "จำนวนเงิน"])
+        return build_analytics(process_data(claims), sqlite_store.get_all_targets(SQLITE_DB), today)
+    # CSV: อ่านจากสำเนา typed (Parquet) เฉพาะคอลัมน์ที่ใช้ ไม่ต้อง parse ledger ทั้งไฟล์ทุกครั้ง
+    return build_analytics(load_claims(DB_FILE, TYPED_FILE), get_target_store().all(), today)
+
+def get_analytics():
+    """ผลวิเคราะห์ทุกประเภทปี/ทุกปี คำนวณใหม่เฉพาะเมื่อรายการเบิกหรือวงเงินเปลี่ยน (หรือขึ้นวันใหม่)"""
+    target_version = None if USE_SQLITE else file_version(TARGET_FILE)
+    return _cached_analytics(get_data_version(), target_version, datetime.now().date())
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cached_cumulative_spec(year_type, year, target, _view, version, today):
+    # _view ไม่ถูก hash: คีย์ cache คือ (year_type, year, target, version, today)
+    # ต้องมี today เพราะยอดสะสมของ _view ถูกตัดถึงเดือนปัจจุบัน (ขึ้นเดือนใหม่แล้วกราฟต้องยาวขึ้น)
+    return cumulative_spec(_view["cumulative"], _view["previous"], year, target)
+
+def thai_date(d):
+    return f"{d.day} {THAI_MONTHS[d.month - 1]} {d.year + 543}"
+
+def format_baht(value):
+    return "-" if math.isnan(value) else f"{value:,.2f} บาท"
+
+def plot_donut_chart(data, category_col, year_type, year):
     if data.empty:
         st.info("ไม่มีข้อมูล")
         return
-    base = alt.Chart(data).encode(theta=alt.Theta(value_col, stack=True))
-    pie = base.mark_arc(innerRadius=60).encode(
-        color=alt.Color(category_col),
-        order=alt.Order(value_col, sort="descending"),
-        tooltip=[category_col, alt.Tooltip(value_col, format=",.2f")]
-    )
-    text = base.mark_text(radius=140).encode(
-        text=alt.Text(value_col, format=",.0f"),
-        order=alt.Order(value_col, sort="descending"),
-        color=alt.value("black")  
-    )
-    st.altair_chart(pie + text, use_container_width=True)
+    spec = _cached_donut_spec(year_type, year, category_col, get_data_version(), data)
+    st.vega_lite_chart(spec, use_container_width=True)
 
 # ==========================================
 # 4. Main UI
 # ==========================================
+perf.start_rerun()
 init_files()
 
 # --- Sidebar ---
 st.sidebar.title("🛡️ เมนูหลัก")
-menu = st.sidebar.radio("เลือกเมนู", ["📝 บันทึกตั้งเบิก", "📊 สรุปและคุมงบประมาณ"])
+menu = st.sidebar.radio("เลือกเมนู", ["📝 บันทึกตั้งเบิก", "📥 นำเข้าข้อมูลจำนวนมาก", "📊 สรุปและคุมงบประมาณ", "🖨️ พิมพ์ใบเบิกย้อนหลัง"])
 
 st.sidebar.markdown("---")
 if st.sidebar.button("⚠️ ล้างฐานข้อมูลทั้งหมด"):
-    if os.path.exists(DB_FILE): 
-        os.remove(DB_FILE)
-    if os.path.exists(TARGET_FILE): 
-        os.remove(TARGET_FILE)
-    if os.path.exists(FONT_FILE): 
-        os.remove(FONT_FILE)
-    init_files()
-    st.sidebar.success("ล้างข้อมูลเรียบร้อย!")
-    st.rerun()
+    try:
+        get_write_queue().call(reset_all_data)
+    except TimeoutError as e:
+        st.sidebar.error(str(e))
+    else:
+        st.sidebar.success("ล้างข้อมูลเรียบร้อย!")
+        st.rerun()
 
 # --- หน้าบันทึก ---
 if menu == "📝 บันทึกตั้งเบิก":
@@ -348,7 +252,7 @@ if menu == "📝 บันทึกตั้งเบิก":
         c5, c6 = st.columns(2)
         with c5: 
             amount = st.number_input("จำนวนเงินที่ขอเบิก (บาท)", min_value=0.0, format="%.2f")
-            amount_text = st.text_input("จำนวนเงินตัวอักษร (เช่น หนึ่งพันบาทถ้วน)")
+            amount_text = st.text_input("จำนวนเงินตัวอักษร (เว้นว่างไว้ = แปลงจากตัวเลขอัตโนมัติ)")
         with c6:
             budget_total = st.number_input("วงเงินงบประมาณทั้งโครงการ (บาท)", min_value=0.0, format="%.2f")
             budget_cat = st.selectbox("ประเภทงบประมาณ", list(BUDGET_MASTER.keys()), format_func=lambda x: f"{x} - {BUDGET_MASTER[x]}")
@@ -369,14 +273,15 @@ if menu == "📝 บันทึกตั้งเบิก":
         if not subject or not project:
             st.error("กรุณากรอกข้อมูลสำคัญให้ครบถ้วน")
         else:
+            amount_text = amount_text.strip() or bahttext(amount)
             new_data = {
-                "NO": "", "เลขที่ออก": next_doc,
+                "NO": "", "เลขที่ออก": "",
                 "วัน": now.day, "เดือน": now.month, "ปี": thai_year,
                 "ผู้ลงนาม": "ผู้อำนวยการ", "ถึง": to_who, "เรื่อง": subject,
                 "คณะ": faculty, "หัวหน้าโครงการวิจัย": leader,
                 "ผู้ประสาน": "", "เงินที่อนุมัติ": budget_total,
                 "จำนวนเงิน": amount, "ชื่อโครงการ": project,
-                "รหัสหมวด": f"{budget_cat} {BUDGET_MASTER[budget_cat]}",
+                "รหัสหมวด": category_label(budget_cat),
                 "บันทึกเมื่อ": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "สิ่งที่ส่งมาด้วย": attachments,
                 "จำนวนเงิน_ตัวอักษร": amount_text,
@@ -384,20 +289,26 @@ if menu == "📝 บันทึกตั้งเบิก":
                 "ธนาคาร": bank_detail,
                 "ตำแหน่ง": position
             }
-            try: 
-                df_curr = pd.read_csv(DB_FILE)
-            except: 
-                df_curr = pd.DataFrame()
-            
-            df_new = pd.DataFrame([new_data])
-            df_out = pd.concat([df_curr, df_new], ignore_index=True)
-            df_out.to_csv(DB_FILE, index=False, encoding='utf-8-sig')
+            try:
+                doc_no = save_claim(new_data)
+            except TimeoutError as e:
+                st.error(str(e))
+            else:
+                new_data['เลขที่ออก'] = doc_no
 
-            st.success(f"บันทึกสำเร็จ! เลขที่ {next_doc}")
+                st.success(f"บันทึกสำเร็จ! เลขที่ {doc_no} ({amount:,.2f} บาท - {amount_text})")
             
-            pdf_data = new_data.copy()
-            pdf_data['เดือน_ตัวอักษร'] = month_str
-            st.session_state['pdf_bytes'] = create_filled_pdf(pdf_data)
+                pdf_data = new_data.copy()
+                pdf_data['เดือน_ตัวอักษร'] = month_str
+                try:
+                    st.session_state['pdf_bytes'] = create_filled_pdf(pdf_data)
+                except FileNotFoundError:
+                    st.error(f"❌ ไม่พบไฟล์ {TEMPLATE_PDF}")
+                    st.session_state['pdf_bytes'] = None
+                except Exception as e:
+                    st.error(f"PDF Error: {e}")
+                    st.session_state['pdf_bytes'] = None
+                st.session_state['pdf_doc_no'] = doc_no
 
     if st.session_state['pdf_bytes']:
         st.markdown("---")
@@ -405,20 +316,59 @@ if menu == "📝 บันทึกตั้งเบิก":
         st.download_button(
             label="📄 ดาวน์โหลดใบเบิก (PDF)", 
             data=st.session_state['pdf_bytes'], 
-            file_name=f"ใบเบิก_{next_doc.replace('/', '-')}.pdf", 
+            file_name=f"ใบเบิก_{st.session_state.get('pdf_doc_no', next_doc).replace('/', '-')}.pdf", 
             mime="application/pdf", 
             type="primary"
         )
 
+# --- หน้านำเข้าข้อมูลจำนวนมาก ---
+elif menu == "📥 นำเข้าข้อมูลจำนวนมาก":
+    st.title("📥 นำเข้าข้อมูลจำนวนมาก")
+    st.caption(f"ไฟล์ Excel/CSV ต้องมีคอลัมน์: {', '.join(REQUIRED_COLUMNS)} (วัน/เดือน/ปี ไม่ระบุ = วันนี้)")
+
+    uploaded = st.file_uploader("เลือกไฟล์", type=["xlsx", "xls", "csv"])
+    if uploaded is not None:
+        try:
+            upload_df = read_upload(uploaded, uploaded.name)
+        except Exception as e:
+            st.error(f"อ่านไฟล์ไม่ได้: {e}")
+            upload_df = None
+
+        if upload_df is not None:
+            st.write(f"พบ {len(upload_df):,} รายการ")
+            st.dataframe(upload_df.head(20), hide_index=True)
+            skip_invalid = st.checkbox("ข้ามรายการที่ไม่ถูกต้อง แล้วนำเข้าเฉพาะที่ถูกต้อง")
+            make_pdf = st.checkbox("สร้างใบเบิก (PDF) ของรายการที่นำเข้า")
+
+            if st.button("✅ นำเข้าข้อมูล", type="primary"):
+                try:
+                    with st.spinner("กำลังนำเข้า..."):
+                        imported, invalid = get_write_queue().call(
+                            import_claims, upload_df, COUNTER_DB, DB_FILE, ROLLUP_FILE,
+                            SQLITE_DB if USE_SQLITE else None, skip_invalid, timeout=IMPORT_TIMEOUT
+                        )
+                except (ValueError, TimeoutError) as e:
+                    st.error(str(e))
+                    imported, invalid = None, None
+
+                if invalid is not None and not invalid.empty:
+                    st.warning(f"พบ {len(invalid):,} รายการที่ไม่ถูกต้อง" + ("" if skip_invalid else " (ยังไม่ได้บันทึกข้อมูล)"))
+                    st.dataframe(invalid, hide_index=True)
+                if imported is not None and not imported.empty:
+                    st.success(f"นำเข้า {len(imported):,} รายการเรียบร้อย")
+                    if make_pdf:
+                        out = io.BytesIO()
+                        with st.spinner("กำลังสร้างใบเบิก..."):
+                            try:
+                                write_merged_pdf(imported.to_dict("records"), out)
+                                st.download_button("📄 ดาวน์โหลดใบเบิก (PDF)", out.getvalue(), "ใบเบิก_นำเข้า.pdf", "application/pdf")
+                            except FileNotFoundError:
+                                st.error(f"❌ ไม่พบไฟล์ {TEMPLATE_PDF}")
+
 # --- หน้าสรุป ---
 elif menu == "📊 สรุปและคุมงบประมาณ":
     st.title("📊 ศูนย์บัญชาการงบประมาณ")
-    try: 
-        raw_df = pd.read_csv(DB_FILE, encoding='utf-8-sig')
-    except: 
-        raw_df = pd.DataFrame()
-        
-    df = process_data(raw_df)
+    spend_source, summarize_spend, spend_years = get_spend_source()
 
     with st.container():
         st.markdown("##### 🔍 ตัวกรองข้อมูล")
@@ -426,17 +376,12 @@ elif menu == "📊 สรุปและคุมงบประมาณ":
         with c1:
             year_type_options = ["ปีงบประมาณ", "ปีพุทธศักราช", "ปีการศึกษา"]
             selected_type_label = st.selectbox("1. เลือกประเภทปี", year_type_options)
-            type_map = {"ปีงบประมาณ": "ปีงบประมาณ", "ปีพุทธศักราช": "ปีปฏิทิน", "ปีการศึกษา": "ปีการศึกษา"}
-            selected_col = type_map[selected_type_label]
         with c2:
             current_y = datetime.now().year + 543
-            if not df.empty and df['ปี'].sum() > 0:
-                available_years = sorted(df[selected_col].unique(), reverse=True)
-                if current_y not in available_years: 
-                    available_years.insert(0, current_y)
-            else: 
-                available_years = [current_y]
-            selected_year = st.selectbox("2. เลือกปี (พ.ศ.)", available_years)
+            year_options = [y for y in spend_years(spend_source, selected_type_label) if y > 0]
+            if current_y not in year_options: 
+                year_options.insert(0, current_y)
+            selected_year = st.selectbox("2. เลือกปี (พ.ศ.)", year_options)
 
     st.markdown("---")
     with st.expander("⚙️ ตั้งค่าวงเงินงบประมาณ", expanded=True):
@@ -453,16 +398,47 @@ elif menu == "📊 สรุปและคุมงบประมาณ":
             st.write("")
             st.write("")
             if st.button("💾 บันทึกยอด"):
-                save_target_budget(selected_type_label, selected_year, target_input)
-                st.success("บันทึกเรียบร้อย")
-                st.rerun()
-
-    if not df.empty: 
-        filtered_df = df[df[selected_col] == selected_year]
-    else: 
-        filtered_df = pd.DataFrame(columns=df.columns)
-
-    total_spent = filtered_df['จำนวนเงิน'].sum()
+                try:
+                    save_target_budget(selected_type_label, selected_year, target_input)
+                except TimeoutError as e:
+                    st.error(str(e))
+                else:
+                    st.success("บันทึกเรียบร้อย")
+                    st.rerun()
+
+        st.markdown("###### วงเงินรายคณะ / รายหมวด")
+        col_sc1, col_sc2, col_sc3 = st.columns([1, 2, 1])
+        with col_sc1:
+            scope_dim = st.radio("ระดับ", ["คณะ", "รหัสหมวด"], format_func=lambda x: "รายคณะ" if x == "คณะ" else "รายหมวด")
+        with col_sc2:
+            scope_options = FACULTY_MASTER if scope_dim == "คณะ" else [category_label(k) for k in BUDGET_MASTER]
+            scope_key = st.selectbox("คณะ/หน่วยงาน" if scope_dim == "คณะ" else "หมวดงบประมาณ", scope_options)
+            scope_args = (scope_key, "") if scope_dim == "คณะ" else ("", scope_key)
+            scope_input = st.number_input(
+                f"วงเงิน {scope_key}",
+                min_value=0.0,
+                value=get_target_budget(selected_type_label, selected_year, *scope_args),
+                format="%.2f"
+            )
+        with col_sc3:
+            st.write("")
+            st.write("")
+            if st.button("💾 บันทึกวงเงินย่อย"):
+                try:
+                    save_target_budget(selected_type_label, selected_year, scope_input, *scope_args)
+                except TimeoutError as e:
+                    st.error(str(e))
+                else:
+                    st.success("บันทึกเรียบร้อย")
+                    st.rerun()
+
+    cat_sum = summarize_spend(spend_source, selected_type_label, selected_year, "รหัสหมวด")
+    fac_sum = summarize_spend(spend_source, selected_type_label, selected_year, "คณะ")
+    total_spent = summarize_spend(spend_source, selected_type_label, selected_year)
+    has_data = selected_year in spend_years(spend_source, selected_type_label)
+    scoped_targets = get_scoped_targets(selected_type_label, selected_year)
+    cat_table = attach_targets(cat_sum, "รหัสหมวด", scoped_targets)
+    fac_table = attach_targets(fac_sum, "คณะ", scoped_targets)
     remaining_budget = target_input - total_spent
     percent_used = (total_spent / target_input * 100) if target_input > 0 else 0
 
@@ -477,25 +453,135 @@ elif menu == "📊 สรุปและคุมงบประมาณ":
     col_chart1, col_chart2 = st.columns(2)
     with col_chart1:
         st.subheader("📊 สัดส่วนตามหมวดงบประมาณ")
-        if not filtered_df.empty:
-            cat_sum = filtered_df.groupby("รหัสหมวด")['จำนวนเงิน'].sum().reset_index()
-            plot_donut_chart(cat_sum, "รหัสหมวด", "จำนวนเงิน")
+        if has_data:
+            plot_donut_chart(cat_sum, "รหัสหมวด", selected_type_label, selected_year)
             with st.expander("ดูตารางข้อมูล"): 
-                st.dataframe(cat_sum.style.format({"จำนวนเงิน": "{:,.2f}"}), hide_index=True)
+                st.dataframe(cat_table.style.format("{:,.2f}", subset=cat_table.columns[1:]), hide_index=True)
         else: 
             st.info("ไม่มีข้อมูล")
             
     with col_chart2:
         st.subheader("🏢 สัดส่วนตามคณะ/หน่วยงาน")
-        if not filtered_df.empty:
-            fac_sum = filtered_df.groupby("คณะ")['จำนวนเงิน'].sum().reset_index()
-            plot_donut_chart(fac_sum, "คณะ", "จำนวนเงิน")
+        if has_data:
+            plot_donut_chart(fac_sum, "คณะ", selected_type_label, selected_year)
             with st.expander("ดูตารางข้อมูล"): 
-                st.dataframe(fac_sum.style.format({"จำนวนเงิน": "{:,.2f}"}), hide_index=True)
+                st.dataframe(fac_table.style.format("{:,.2f}", subset=fac_table.columns[1:]), hide_index=True)
         else: 
             st.info("ไม่มีข้อมูล")
 
-    if not filtered_df.empty:
+    if has_data:
+        st.markdown("---")
+        st.subheader("📅 แนวโน้มการเบิกจ่ายรายเดือน")
+        st.vega_lite_chart(_cached_trend_spec(selected_type_label, selected_year, get_data_version()), use_container_width=True)
+
+        st.markdown("---")
+        st.subheader("🔥 อัตราการเบิกจ่ายและเทียบปีก่อน")
+        analytics = get_analytics()
+        analytics_view = select_year(analytics, selected_type_label, selected_year)
+        burn = analytics_view["burn"]
+        overall = burn[(burn["คณะ"] == "") & (burn["รหัสหมวด"] == "")]
+        if not overall.empty:
+            b = overall.iloc[0]
+            b1, b2, b3 = st.columns(3)
+            b1.metric("เฉลี่ยต่อเดือน", format_baht(b['เฉลี่ยต่อเดือน']))
+            b2.metric("คาดการณ์ทั้งปี", format_baht(b['คาดการณ์ทั้งปี']),
+                      delta=f"เวลาผ่านไป {b['เวลาผ่านไป_%']:.0f}% ของปี", delta_color="off")
+            will_exceed = b['สถานะ'] == "คาดว่าจะเกินวงเงิน"
+            b3.metric("คาดว่าจะเกินวงเงิน", thai_date(b['วันที่คาดว่าเกินวงเงิน']) if will_exceed else b['สถานะ'])
+        st.vega_lite_chart(
+            _cached_cumulative_spec(selected_type_label, selected_year, target_input, analytics_view,
+                                    get_data_version(), analytics["today"]),
+            use_container_width=True
+        )
+
+        scoped_burn = burn[(burn["คณะ"] != "") | (burn["รหัสหมวด"] != "")]
+        if not scoped_burn.empty:
+            with st.expander("วงเงินรายคณะ/รายหมวด"):
+                st.dataframe(
+                    scoped_burn[["คณะ", "รหัสหมวด", "วงเงิน", "ใช้ไป", "ใช้ไป_%", "คาดการณ์ทั้งปี", "วันที่คาดว่าเกินวงเงิน", "สถานะ"]].style.format(
+                        {"วงเงิน": "{:,.2f}", "ใช้ไป": "{:,.2f}", "ใช้ไป_%": "{:.1f}%", "คาดการณ์ทั้งปี": "{:,.2f}",
+                         "วันที่คาดว่าเกินวงเงิน": thai_date}, na_rep="-"),
+                    hide_index=True
+                )
+
+        yoy_format = {"จำนวนเงิน": "{:,.2f}", "ปีก่อน": "{:,.2f}", "ปีก่อน_ช่วงเดียวกัน": "{:,.2f}",
+                      "เปลี่ยนแปลง": "{:+,.2f}", "เปลี่ยนแปลง_%": "{:+.1f}%"}
+        y1, y2 = st.columns(2)
+        for col, dim, title in ((y1, "รหัสหมวด", "เทียบปีก่อน: รายหมวด"), (y2, "คณะ", "เทียบปีก่อน: รายคณะ")):
+            with col:
+                st.markdown(f"###### {title}")
+                yoy = analytics_view["yoy"][dim].sort_values("จำนวนเงิน", ascending=False)
+                st.dataframe(yoy.style.format(yoy_format, na_rep="-"), hide_index=True)
+
         st.markdown("---")
-        with open(DB_FILE, "rb") as f:
-            st.download_button("📥 ดาวน์โหลดข้อมูลทั้งหมด (CSV)", f, "database_claims.csv", "text/csv")
+        with st.expander("📥 ดาวน์โหลดข้อมูล"):
+            with st.form("export_form"):
+                e1, e2, e3 = st.columns(3)
+                with e1:
+                    export_scope = st.radio("ช่วงข้อมูล", [f"{selected_type_label} {selected_year}", "ทั้งหมด"])
+                with e2:
+                    export_faculty = st.multiselect("คณะ/หน่วยงาน (ไม่เลือก = ทั้งหมด)", FACULTY_MASTER)
+                    export_category = st.multiselect("หมวดงบประมาณ (ไม่เลือก = ทั้งหมด)", [category_label(k) for k in BUDGET_MASTER])
+                with e3:
+                    export_format = st.selectbox("รูปแบบไฟล์", available_formats(), format_func=str.upper)
+                export_submitted = st.form_submit_button("📦 เตรียมไฟล์")
+
+            if export_submitted:
+                filters = {"faculty": export_faculty or None, "category": export_category or None}
+                if export_scope != "ทั้งหมด":
+                    filters.update(year=selected_year, year_type=selected_type_label)
+                with st.spinner("กำลังเตรียมไฟล์..."):
+                    out, count = export_to_tempfile(iter_export_chunks(**filters), export_format)
+                mime, ext = EXPORT_FORMATS[export_format]
+                st.download_button(f"📥 ดาวน์โหลด {count:,} รายการ ({export_format.upper()})", out, f"database_claims{ext}", mime)
+
+# --- หน้าพิมพ์ใบเบิกย้อนหลัง ---
+elif menu == "🖨️ พิมพ์ใบเบิกย้อนหลัง":
+    st.title("🖨️ พิมพ์ใบเบิกย้อนหลัง")
+    _, thai_year, _, _ = get_current_date()
+
+    with st.form("batch_form"):
+        c1, c2 = st.columns(2)
+        with c1:
+            batch_year_type = st.selectbox("ประเภทปี", ["ปีพุทธศักราช", "ปีงบประมาณ", "ปีการศึกษา"])
+            batch_year = st.number_input("ปี (พ.ศ.)", min_value=2500, max_value=2700, value=thai_year, step=1)
+            batch_faculty = st.multiselect("คณะ/หน่วยงาน (ไม่เลือก = ทั้งหมด)", FACULTY_MASTER)
+        with c2:
+            doc_from = st.text_input("ตั้งแต่เลขที่ (เช่น 0203/001)")
+            doc_to = st.text_input("ถึงเลขที่ (เช่น 0203/100)")
+            batch_format = st.radio("รูปแบบไฟล์", ["PDF ไฟล์เดียว", "ZIP แยกไฟล์"])
+        batch_submitted = st.form_submit_button("🖨️ สร้างไฟล์")
+
+    # แปลงช่วงเลขที่ครั้งเดียวที่นี่ แล้วส่งเป็นตัวเลขให้ทั้ง CSV และ SQLite (ช่องว่าง = ไม่จำกัด)
+    seq_from = parse_doc_seq(doc_from) if doc_from.strip() else None
+    seq_to = parse_doc_seq(doc_to) if doc_to.strip() else None
+    bad_range = (doc_from.strip() and seq_from is None) or (doc_to.strip() and seq_to is None)
+
+    if batch_submitted and bad_range:
+        st.error("❌ เลขที่ต้องเป็นตัวเลข เช่น 0203/001 หรือ 1")
+    elif batch_submitted:
+        claims = select_claims_for_print(seq_from, seq_to, int(batch_year), batch_year_type, batch_faculty or None)
+        out = io.BytesIO()
+        with st.spinner("กำลังสร้างเอกสาร..."):
+            try:
+                if batch_format == "ZIP แยกไฟล์":
+                    count = write_zip(claims, out)
+                    file_name, mime = f"ใบเบิก_{int(batch_year)}.zip", "application/zip"
+                else:
+                    count = write_merged_pdf(claims, out)
+                    file_name, mime = f"ใบเบิก_{int(batch_year)}.pdf", "application/pdf"
+            except FileNotFoundError:
+                st.error(f"❌ ไม่พบไฟล์ {TEMPLATE_PDF}")
+                count = 0
+        if count:
+            st.success(f"สร้างใบเบิก {count} ฉบับ")
+            st.download_button("📥 ดาวน์โหลด", out.getvalue(), file_name, mime, type="primary")
+        else:
+            st.info("ไม่มีข้อมูล")
+
+# --- แผงจับเวลาสำหรับผู้ดูแลระบบ (PAYAP_PERF=1 และเปิดหน้าเว็บด้วย ?admin=1) ---
+perf_report = perf.finish_rerun(menu)
+if perf_report and st.query_params.get("admin") == "1":
+    with st.sidebar.expander("⏱️ เวลาที่ใช้ (rerun ล่าสุด)"):
+        st.caption(f"รวม {perf_report['total_ms']:,.1f} ms | log: {perf.LOG_FILE}")
+        st.dataframe(perf.summarize_spans(perf_report['spans']), hide_index=True)
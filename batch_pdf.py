@@ -0,0 +1,197 @@
+import argparse
+import io
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboard_data import YEAR_TYPE_COLUMNS
+from doc_numbers import parse_doc_seq
+from export import iter_ledger_chunks
+from pdf_render import FONT_FILE, TEMPLATE_PDF, THAI_MONTHS, draw_overlay, add_template_page, get_font_name
+from perf import timed
+
+# ==========================================
+# พิมพ์ใบเบิกย้อนหลังทีละหลายฉบับ (Batch PDF)
+# ==========================================
+# อ่าน ledger ทีละ chunk เลือกเฉพาะรายการที่ต้องการ แล้ววาด overlay ทั้ง batch
+# ลงใน canvas เดียว (ฟอนต์ถูกฝังครั้งเดียวต่อ batch) ก่อนประกบกับหน้าแม่แบบที่ parse ไว้แล้ว
+#
+#   python batch_pdf.py --year 2569 --faculty คณะนิติศาสตร์ -o reprint.pdf
+#   python batch_pdf.py --year 2569 --from 0203/010 --to 0203/050 --format zip -o reprint.zip
+#   python batch_pdf.py --year 2569 --workers 4 -o reprint.pdf
+#
+# --workers > 1 จะกระจายการวาด overlay + ประกบหน้าไปยัง process pool (งานเป็น CPU-bound)
+# แต่ละ worker มี cache ฟอนต์/แม่แบบของตัวเอง ผลลัพธ์ถูกเรียงกลับตามลำดับ batch ที่ส่งเข้าไป
+
+BATCH_SIZE = 200
+
+
+def select_claims(ledger_path, seq_from=None, seq_to=None, year=None, year_type="ปีพุทธศักราช",
+                  faculty=None, chunksize=5000):
+    """คืนรายการเบิก (dict) ที่ตรงเงื่อนไขตามลำดับใน ledger โดยอ่านไฟล์ทีละ chunk
+    seq_from/seq_to = ลำดับของเลขที่ออก (int, แปลงจากข้อความด้วย doc_numbers.parse_doc_seq())"""
+    chunks = iter_ledger_chunks(ledger_path, chunksize, year=year, year_type=year_type, faculty=faculty,
+                                seq_from=seq_from, seq_to=seq_to)
+    for chunk in chunks:
+        for row in chunk.to_dict("records"):
+            yield row
+
+
+def claim_to_pdf_data(row):
+    """แถวจาก ledger -> dict ที่ create_filled_pdf()/draw_overlay() ใช้"""
+    data = dict(row)
+    month = int(data.get('เดือน') or 0)
+    data['เดือน_ตัวอักษร'] = THAI_MONTHS[month - 1] if 1 <= month <= 12 else ""
+    data['จำนวนเงิน'] = float(data.get('จำนวนเงิน') or 0.0)
+    return data
+
+
+def _batches(claims, batch_size):
+    batch = []
+    for claim in claims:
+        batch.append(claim_to_pdf_data(claim))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def render_overlays(batch, font_name):
+    """วาด overlay ของทั้ง batch ใน canvas เดียว (1 หน้า/รายการ) คืน PdfReader"""
+    from pypdf import PdfReader
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=A4)
+    for data in batch:
+        draw_overlay(can, data, font_name)
+        can.showPage()
+    can.save()
+    packet.seek(0)
+    return PdfReader(packet)
+
+
+def _render_batch_pdf(batch, template_path, font_path):
+    """(ทำงานใน worker) ใบเบิกทั้ง batch เป็น PDF หลายหน้า คืน bytes"""
+    from pypdf import PdfWriter
+
+    overlays = render_overlays(batch, get_font_name(font_path))
+    writer = PdfWriter()
+    for overlay in overlays.pages:
+        add_template_page(writer, template_path).merge_page(overlay)
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+def _render_batch_files(batch, template_path, font_path):
+    """(ทำงานใน worker) ใบเบิกทั้ง batch แยกไฟล์ละฉบับ คืน list ของ (เลขที่ออก, bytes)"""
+    from pypdf import PdfWriter
+
+    overlays = render_overlays(batch, get_font_name(font_path))
+    files = []
+    for data, overlay in zip(batch, overlays.pages):
+        writer = PdfWriter()
+        add_template_page(writer, template_path).merge_page(overlay)
+        buf = io.BytesIO()
+        writer.write(buf)
+        files.append((str(data.get('เลขที่ออก', '')), buf.getvalue()))
+    return files
+
+
+def _run_batches(func, claims, template_path, font_path, batch_size, workers):
+    """เรียก func กับทุก batch คืนผลตามลำดับ batch เดิม
+
+    workers > 1 ใช้ process pool โดยส่งงานค้างไว้ไม่เกิน 2 เท่าของจำนวน worker
+    เพื่อไม่ให้ทุก batch ถูกดึงเข้าหน่วยความจำพร้อมกัน
+    """
+    if workers <= 1:
+        for batch in _batches(claims, batch_size):
+            yield func(batch, template_path, font_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for batch in _batches(claims, batch_size):
+            pending.append(pool.submit(func, batch, template_path, font_path))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@timed("pdf.batch_merge")
+def write_merged_pdf(claims, out, template_path=TEMPLATE_PDF, font_path=FONT_FILE, batch_size=BATCH_SIZE, workers=1):
+    """เขียนใบเบิกทุกฉบับรวมเป็น PDF ไฟล์เดียวลงใน out (file object) คืนจำนวนหน้า"""
+    from pypdf import PdfReader, PdfWriter
+
+    writer = PdfWriter()
+    count = 0
+    if workers <= 1:
+        # ทำใน process เดียว: ประกบลง writer ตัวเดียวโดยตรง ทรัพยากรของแม่แบบถูกใช้ร่วมกันทุกหน้า
+        font_name = get_font_name(font_path)
+        for batch in _batches(claims, batch_size):
+            overlays = render_overlays(batch, font_name)
+            for overlay in overlays.pages:
+                add_template_page(writer, template_path).merge_page(overlay)
+                count += 1
+    else:
+        for pdf_bytes in _run_batches(_render_batch_pdf, claims, template_path, font_path, batch_size, workers):
+            part = PdfReader(io.BytesIO(pdf_bytes))
+            writer.append(part)
+            count += len(part.pages)
+    writer.write(out)
+    return count
+
+
+@timed("pdf.batch_zip")
+def write_zip(claims, out, template_path=TEMPLATE_PDF, font_path=FONT_FILE, batch_size=BATCH_SIZE, workers=1):
+    """เขียนใบเบิกแยกไฟล์ละฉบับลงใน ZIP (out) ทีละ batch หน่วยความจำไม่โตตามจำนวนรายการ คืนจำนวนไฟล์"""
+    count = 0
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for files in _run_batches(_render_batch_files, claims, template_path, font_path, batch_size, workers):
+            for doc_no, pdf_bytes in files:
+                count += 1
+                name = f"ใบเบิก_{(doc_no or str(count)).replace('/', '-')}_{count:05d}.pdf"
+                zf.writestr(name, pdf_bytes)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="พิมพ์ใบเบิกย้อนหลังหลายฉบับจาก database_claims.csv")
+    parser.add_argument("--ledger", default="database_claims.csv")
+    parser.add_argument("--sqlite", metavar="DB", help="อ่านจากฐานข้อมูล SQLite แทนไฟล์ CSV")
+    parser.add_argument("--template", default=TEMPLATE_PDF)
+    parser.add_argument("--font", default=FONT_FILE)
+    parser.add_argument("--from", dest="doc_from", help="เลขที่ออกเริ่มต้น เช่น 0203/010")
+    parser.add_argument("--to", dest="doc_to", help="เลขที่ออกสิ้นสุด เช่น 0203/050")
+    parser.add_argument("--year", type=int, help="ปี พ.ศ.")
+    parser.add_argument("--year-type", default="ปีพุทธศักราช", choices=list(YEAR_TYPE_COLUMNS))
+    parser.add_argument("--faculty", action="append", help="คณะ/หน่วยงาน (ระบุซ้ำได้)")
+    parser.add_argument("--format", choices=["pdf", "zip"], default="pdf")
+    parser.add_argument("--workers", type=int, default=1, help="จำนวน process ที่ใช้สร้าง PDF พร้อมกัน")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+
+    bounds = []
+    for flag, doc_no in (("--from", args.doc_from), ("--to", args.doc_to)):
+        seq = parse_doc_seq(doc_no) if doc_no else None
+        if doc_no and seq is None:
+            parser.error(f"{flag}: เลขที่ออกไม่ถูกต้อง {doc_no!r}")
+        bounds.append(seq)
+
+    if args.sqlite:
+        import sqlite_store
+        claims = sqlite_store.select_claims(args.sqlite, *bounds, args.year, args.year_type, args.faculty)
+    else:
+        claims = select_claims(args.ledger, *bounds, args.year, args.year_type, args.faculty)
+    write = write_zip if args.format == "zip" else write_merged_pdf
+    with open(args.output, "wb") as out:
+        count = write(claims, out, args.template, args.font, workers=args.workers)
+    print(f"สร้าง {count} ใบเบิก -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""วัดเวลา analytics.build_analytics() (ยอดสะสม, อัตราการเบิกจ่าย, เทียบปีก่อน) ต่อขนาด ledger
+
+เทียบกับการคำนวณยอดรวมตรง ๆ ด้วย groupby ต่อปีแต่ละแบบ และตรวจว่ายอดรวมต่อปีตรงกัน
+
+    python benchmarks/bench_analytics.py --sizes 100000 1000000
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+
+from synthetic import make_realistic_ledger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import build_analytics  # noqa: E402
+from dashboard_data import YEAR_TYPE_COLUMNS  # noqa: E402
+from ledger import process_data  # noqa: E402
+
+
+def _timed(func, repeat=3):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    for n in args.sizes:
+        claims = process_data(make_realistic_ledger(n))
+        targets = {("ปีงบประมาณ", int(claims[YEAR_TYPE_COLUMNS["ปีงบประมาณ"]].max())): {("", ""): float(claims["จำนวนเงิน"].sum())}}
+        result, t_build = _timed(lambda: build_analytics(claims, targets, today), args.repeat)
+        _, t_groupby = _timed(lambda: [claims.groupby(col)["จำนวนเงิน"].sum() for col in YEAR_TYPE_COLUMNS.values()], args.repeat)
+
+        cum = result["cumulative"]
+        bad = []
+        for year_type, col in YEAR_TYPE_COLUMNS.items():
+            expected = claims.groupby(col)["จำนวนเงิน"].sum()
+            got = cum[cum["year_type"] == year_type].groupby("year")["สะสม"].max()
+            if not (got.reindex(expected.index).fillna(0) - expected).abs().lt(0.01).all():
+                bad.append(year_type)
+
+        print(f"--- {n:,} รายการ")
+        print(f"build_analytics          {t_build:9.1f} ms")
+        print(f"groupby ยอดรวม 3 แบบ      {t_groupby:9.1f} ms")
+        print("ยอดรวมต่อปี: " + ("ตรงกันทุกแบบปี" if not bad else "ไม่ตรง " + ", ".join(bad)))
+
+
+if __name__ == "__main__":
+    main()
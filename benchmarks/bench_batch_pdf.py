@@ -0,0 +1,47 @@
+"""Throughput ของการพิมพ์ใบเบิกแบบ batch เทียบกับจำนวน worker
+
+    python benchmarks/bench_batch_pdf.py --rows 2000 --workers 1 2 4 8
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import make_ledger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_pdf import select_claims, write_merged_pdf  # noqa: E402
+from ledger import append_claims  # noqa: E402
+from pdf_render import FONT_FILE, TEMPLATE_PDF  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = os.path.join(tmp, "claims.csv")
+        append_claims(ledger_path, make_ledger(args.rows).to_dict("records"))
+
+        print(f"cpu_count={os.cpu_count()}, {args.rows} claims")
+        print(f"{'workers':>8} {'seconds':>9} {'PDF/s':>8} {'speedup':>8}")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            count = write_merged_pdf(select_claims(ledger_path), io.BytesIO(),
+                                     os.path.join(ROOT, TEMPLATE_PDF), os.path.join(ROOT, FONT_FILE),
+                                     batch_size=args.batch_size, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {count / elapsed:>8.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
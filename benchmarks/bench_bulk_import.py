@@ -0,0 +1,75 @@
+"""เวลานำเข้ารายการเบิกจำนวนมาก (ตรวจ + จองเลข + บันทึก) เทียบกับการบันทึกทีละรายการแบบเดิม
+
+    python benchmarks/bench_bulk_import.py --rows 10000 --legacy-rows 300
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_import import commit_claims, prepare_rows, validate  # noqa: E402
+from ledger import CLAIM_COLUMNS  # noqa: E402
+from master_data import BUDGET_MASTER, FACULTY_MASTER  # noqa: E402
+
+
+def make_upload(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "เรื่อง": [f"ขออนุมัติเบิกเงิน {i}" for i in range(n)],
+        "ชื่อโครงการ": rng.choice(["โครงการ ก", "โครงการ ข", "โครงการ ค"], n),
+        "คณะ": rng.choice(FACULTY_MASTER, n),
+        "จำนวนเงิน": (rng.integers(100, 5_000_000, n) / 100).astype(str),
+        "รหัสหมวด": rng.choice(list(BUDGET_MASTER), n),
+    })
+
+
+def legacy_save(path, row):
+    """วิธีเดิมในหน้าฟอร์ม: อ่านทั้งไฟล์ ต่อ 1 แถว แล้วเขียนทับทั้งไฟล์"""
+    try:
+        df_curr = pd.read_csv(path)
+    except Exception:
+        df_curr = pd.DataFrame()
+    pd.concat([df_curr, pd.DataFrame([row])], ignore_index=True).to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--legacy-rows", type=int, default=300)
+    args = parser.parse_args()
+
+    upload = make_upload(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger_path = os.path.join(tmp, "claims.csv")
+        counter_db = os.path.join(tmp, "doc_counter.db")
+
+        t0 = time.perf_counter()
+        cleaned, errors = validate(upload)
+        t1 = time.perf_counter()
+        rows = prepare_rows(cleaned[errors == ""], counter_db, ledger_path)
+        t2 = time.perf_counter()
+        commit_claims(rows, ledger_path, os.path.join(tmp, "rollup.json"))
+        t3 = time.perf_counter()
+
+        print(f"bulk import of {args.rows:,} rows: validate {t1 - t0:.3f}s, allocate {t2 - t1:.3f}s, "
+              f"commit {t3 - t2:.3f}s, total {t3 - t0:.3f}s ({args.rows / (t3 - t0):,.0f} rows/s)")
+
+        legacy_path = os.path.join(tmp, "legacy.csv")
+        pd.DataFrame(columns=CLAIM_COLUMNS).to_csv(legacy_path, index=False, encoding='utf-8-sig')
+        legacy_rows = rows.head(args.legacy_rows).to_dict("records")
+        start = time.perf_counter()
+        for row in legacy_rows:
+            legacy_save(legacy_path, row)
+        elapsed = time.perf_counter() - start
+        print(f"legacy one-by-one save of {len(legacy_rows):,} rows: {elapsed:.3f}s "
+              f"({len(legacy_rows) / elapsed:,.0f} rows/s, and each save grows with the ledger)")
+
+
+if __name__ == "__main__":
+    main()
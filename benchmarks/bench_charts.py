@@ -0,0 +1,60 @@
+"""เวลาสร้างกราฟหน้าสรุปและขนาดข้อมูลที่ส่งไปเบราว์เซอร์
+
+เทียบการสร้าง spec ใหม่ทุก rerun กับการดึง spec ที่ cache ไว้ และขนาดข้อมูลกราฟแนวโน้ม
+แบบส่งทุกรายการ (ไม่ได้รวมฝั่ง server) กับแบบรวมรายเดือน/ลดจำนวนจุดแล้ว
+
+    python benchmarks/bench_charts.py --rows 200000 --runs 20
+"""
+import argparse
+import json
+import time
+
+import altair as alt
+import numpy as np
+
+from synthetic import make_ledger
+from charts import donut_spec, monthly_trend_spec
+from dashboard_data import monthly_from_frame, rollup_from_frame, summarize
+from ledger import process_data
+from master_data import BUDGET_MASTER, FACULTY_MASTER, category_label
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    df = make_ledger(args.rows)
+    rng = np.random.default_rng(1)
+    df["คณะ"] = rng.choice(FACULTY_MASTER, args.rows)
+    df["รหัสหมวด"] = rng.choice([category_label(k) for k in BUDGET_MASTER], args.rows)
+    df = process_data(df)
+    rollup = rollup_from_frame(df)
+    fac_sum = summarize(rollup, "ปีงบประมาณ", 2565, "คณะ")
+
+    key = ("ปีงบประมาณ", 2565, "คณะ", (0, args.rows))
+    cache = {key: donut_spec(fac_sum, "คณะ", "จำนวนเงิน")}
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        donut_spec(fac_sum, "คณะ", "จำนวนเงิน")
+    rebuild = (time.perf_counter() - start) / args.runs
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        if key not in cache:
+            cache[key] = donut_spec(fac_sum, "คณะ", "จำนวนเงิน")
+    cached = (time.perf_counter() - start) / args.runs
+    print(f"donut spec: rebuild {rebuild * 1000:.1f} ms/rerun, cached {cached * 1000:.3f} ms/rerun")
+
+    alt.data_transformers.disable_max_rows()  # ค่าเริ่มต้นของ Altair ไม่ยอมฝังข้อมูลเกิน 5,000 แถว
+    raw = alt.Chart(df[["ปี", "เดือน", "จำนวนเงิน"]]).mark_bar().encode(x="เดือน:O", y="sum(จำนวนเงิน):Q").to_dict()
+    start = time.perf_counter()
+    trend = monthly_trend_spec(monthly_from_frame(df), "ปีงบประมาณ", 2565)
+    trend_time = time.perf_counter() - start
+    print(f"trend payload: raw rows {len(json.dumps(raw, ensure_ascii=False)) / 1024:,.0f} KiB, "
+          f"server-binned {len(json.dumps(trend, ensure_ascii=False)) / 1024:,.1f} KiB "
+          f"({trend_time * 1000:.1f} ms to build)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""หน่วยความจำสูงสุดของการส่งออกข้อมูลแบบ streaming เทียบกับการอ่านทั้งไฟล์ (แบบเดิม) เมื่อ ledger โตขึ้น
+
+    python benchmarks/bench_export.py --sizes 20000 100000 400000 --format csv
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from synthetic import make_ledger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import iter_ledger_chunks, write_export  # noqa: E402
+from ledger import append_claims, read_ledger  # noqa: E402
+
+
+def _measure(func):
+    # จับเวลาแยกจากการวัดหน่วยความจำ เพราะ tracemalloc ทำให้ช้าลงมาก
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000, 400_000])
+    parser.add_argument("--format", default="csv", choices=["csv", "parquet", "xlsx"])
+    parser.add_argument("--year", type=int, default=2565)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'full read MiB':>14} {'streaming MiB':>14} {'streaming s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, f"export.{args.format}")
+        for n in args.sizes:
+            ledger_path = os.path.join(tmp, f"claims_{n}.csv")
+            append_claims(ledger_path, make_ledger(n).to_dict("records"))
+
+            def full_read():
+                # แบบเดิม: อ่านทั้งไฟล์เข้าหน่วยความจำก่อนแล้วค่อยกรอง
+                df = read_ledger(ledger_path)
+                df = df[pd.to_numeric(df['ปี'], errors='coerce') == args.year]
+                df.to_csv(out_path, index=False, encoding='utf-8-sig')
+
+            def streaming():
+                with open(out_path, "wb") as out:
+                    write_export(iter_ledger_chunks(ledger_path, year=args.year), out, args.format)
+
+            full_mib, _ = _measure(full_read)
+            stream_mib, stream_s = _measure(streaming)
+            print(f"{n:>9,} {full_mib:>14.1f} {stream_mib:>14.1f} {stream_s:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
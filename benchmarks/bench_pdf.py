@@ -0,0 +1,49 @@
+"""เวลาสร้างใบเบิก PDF ต่อฉบับ: cold (ล้าง cache ทุกครั้ง) เทียบกับ warm (ใช้ฟอนต์/แม่แบบใน cache)
+
+    python benchmarks/bench_pdf.py --n 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pdf_render import FONT_FILE, TEMPLATE_PDF, create_filled_pdf, clear_resource_cache  # noqa: E402
+
+SAMPLE_CLAIM = {
+    "คณะ": "คณะนิติศาสตร์", "เลขที่ออก": "0203/001", "วัน": 18, "เดือน_ตัวอักษร": "ตุลาคม", "ปี": 2569,
+    "เรื่อง": "ขออนุมัติเบิกเงิน", "สิ่งที่ส่งมาด้วย": "ใบเสร็จรับเงิน 3 ฉบับ", "จำนวนเงิน": 1234.5,
+    "จำนวนเงิน_ตัวอักษร": "หนึ่งพันสองร้อยสามสิบสี่บาทห้าสิบสตางค์", "สั่งจ่ายให้": "บริษัท ตัวอย่าง จำกัด",
+    "ธนาคาร": "กรุงไทย 123-4-56789-0", "ชื่อโครงการ": "โครงการทดสอบ",
+    "รหัสหมวด": "541010001 หมวดส่งเสริมการวิจัย", "หัวหน้าโครงการวิจัย": "ผู้ทดสอบ", "ตำแหน่ง": "อาจารย์",
+}
+
+
+def _measure(n, cold):
+    times = []
+    for _ in range(n):
+        if cold:
+            clear_resource_cache()
+        start = time.perf_counter()
+        create_filled_pdf(SAMPLE_CLAIM, os.path.join(ROOT, TEMPLATE_PDF), os.path.join(ROOT, FONT_FILE))
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=50)
+    args = parser.parse_args()
+
+    _measure(1, cold=False)  # warm-up import/JIT ของไลบรารี
+    for label, cold in (("cold", True), ("warm", False)):
+        times = _measure(args.n, cold)
+        print(f"{label}: median {statistics.median(times) * 1000:.1f} ms, "
+              f"p95 {sorted(times)[int(len(times) * 0.95) - 1] * 1000:.1f} ms ({args.n} PDFs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""ค่าใช้จ่ายของ perf.span()/@timed เมื่อปิด (ค่าเริ่มต้น) และเมื่อเปิด PAYAP_PERF=1
+
+perf.ENABLED อ่านจาก environment ตอน import จึงวัดแต่ละโหมดใน subprocess แยกกัน
+
+    python benchmarks/bench_perf_overhead.py --n 200000
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import sys, time
+sys.path.insert(0, {root!r})
+import perf
+
+def plain(x):
+    return x
+
+@perf.timed("bench.timed")
+def decorated(x):
+    return x
+
+def with_span(x):
+    with perf.span("bench.span"):
+        return x
+
+perf.start_rerun()
+for label, func in (("plain", plain), ("@timed", decorated), ("span()", with_span)):
+    start = time.perf_counter()
+    for i in range({n}):
+        func(i)
+    print(f"{{label:<8}} {{(time.perf_counter() - start) / {n} * 1e9:8.0f}} ns/call")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    code = _CHILD.format(root=ROOT, n=args.n)
+    for label, value in (("PAYAP_PERF ปิด", "0"), ("PAYAP_PERF=1", "1")):
+        print(f"--- {label}")
+        env = dict(os.environ, PAYAP_PERF=value)
+        sys.stdout.flush()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""เปรียบเทียบ process_data() แบบ vectorized กับแบบเดิม (df.apply ทีละแถว)
+
+    python benchmarks/bench_process_data.py --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from synthetic import make_ledger
+from ledger import process_data
+
+
+def process_data_legacy(df):
+    """process_data() เวอร์ชันเดิมก่อน vectorize ใช้เป็นเกณฑ์เทียบ"""
+    if df.empty:
+        return df
+    df['ปี'] = pd.to_numeric(df['ปี'], errors='coerce').fillna(0).astype(int)
+    df['เดือน'] = pd.to_numeric(df['เดือน'], errors='coerce').fillna(0).astype(int)
+    df['จำนวนเงิน'] = pd.to_numeric(df['จำนวนเงิน'], errors='coerce').fillna(0.0)
+    df['ปีงบประมาณ'] = df.apply(lambda x: int(x['ปี']) + 1 if int(x['เดือน']) >= 8 else int(x['ปี']), axis=1)
+    df['ปีการศึกษา'] = df.apply(lambda x: int(x['ปี']) if int(x['เดือน']) >= 6 else int(x['ปี']) - 1, axis=1)
+    df['ปีปฏิทิน'] = df['ปี']
+    return df
+
+
+def _timed(func, df):
+    start = time.perf_counter()
+    out = func(df)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in args.sizes:
+        raw = make_ledger(n)
+        legacy, t_legacy = _timed(process_data_legacy, raw.copy())
+        fast, t_fast = _timed(process_data, raw.copy())
+        pd.testing.assert_frame_equal(legacy, fast)
+        print(f"{n:>10,} {t_legacy:>12.3f} {t_fast:>15.3f} {t_legacy / t_fast:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""เวลา import และเวลาจนหน้าแรกแสดงผล (first render) ของ app.py ใน process ใหม่ทุกครั้ง
+
+import: เวลา import ทุกโมดูลที่ app.py import ไว้ที่ระดับบนสุดของไฟล์ (streamlit import ไว้ก่อนแล้ว ไม่นับ)
+first render: เวลา AppTest.run() ครั้งแรก (หน้า "บันทึกตั้งเบิก") รวม init_files() และการตรวจฟอนต์
+ทั้งแบบมีไฟล์ฟอนต์ และแบบไม่มีไฟล์ฟอนต์ (เดิมจะดาวน์โหลดแบบ blocking)
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --repo /path/to/old/checkout   # วัดโค้ดรุ่นก่อนเพื่อเทียบ
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["pandas", "altair", "pypdf", "reportlab", "requests"]
+
+_CHILD = r"""
+import ast, json, os, sys, time
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, os.getcwd())
+tree = ast.parse(open("app.py", encoding="utf-8").read())
+stmts = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+start = time.perf_counter()
+exec(compile(ast.Module(body=stmts, type_ignores=[]), "app_imports", "exec"), {})
+import_s = time.perf_counter() - start
+loaded = [m for m in HEAVY if m in sys.modules]
+
+start = time.perf_counter()
+at = AppTest.from_file(os.path.abspath("app.py"), default_timeout=120).run()
+render_s = time.perf_counter() - start
+loaded_after = [m for m in HEAVY if m in sys.modules]
+print(json.dumps({"import_s": import_s, "render_s": render_s, "error": bool(at.exception),
+                  "loaded_at_import": loaded, "loaded_after_render": loaded_after}))
+"""
+
+
+def run_once(repo, with_font):
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in os.listdir(repo):
+            if name.endswith(".py") or name == "ใบเบิก.pdf" or (with_font and name.endswith(".ttf")):
+                shutil.copy(os.path.join(repo, name), tmp)
+        # แยก cache ฟอนต์ออกจากเครื่องจริง เพื่อให้กรณี "ไม่มีฟอนต์" ไม่มีสำเนาเก่าช่วย
+        env = dict(os.environ, XDG_CACHE_HOME=os.path.join(tmp, ".cache"), PAYAP_PERF="0")
+        code = _CHILD.replace("HEAVY", repr(HEAVY_MODULES))
+        out = subprocess.run([sys.executable, "-c", code], cwd=tmp, env=env, capture_output=True, text=True, check=True)
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repo", default=ROOT)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for with_font in (True, False):
+        results = [run_once(args.repo, with_font) for _ in range(args.runs)]
+        label = "มีไฟล์ฟอนต์" if with_font else "ไม่มีไฟล์ฟอนต์"
+        print(f"--- {label} ({args.runs} runs)")
+        print(f"import       median {statistics.median(r['import_s'] for r in results) * 1000:8.0f} ms")
+        print(f"first render median {statistics.median(r['render_s'] for r in results) * 1000:8.0f} ms")
+        print(f"โหลดตอน import: {', '.join(results[-1]['loaded_at_import']) or '-'}")
+        print(f"โหลดหลังหน้าแรก: {', '.join(results[-1]['loaded_after_render']) or '-'}")
+        if any(r["error"] for r in results):
+            print("!! หน้าแรกมี exception")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""ชุด benchmark ทุกเส้นทางหลักของ app.py บน ledger สังเคราะห์ขนาดต่าง ๆ ผลลัพธ์เป็น JSON
+
+ledger สร้างด้วย init_ledger() + CLAIM_COLUMNS + BUDGET_MASTER/FACULTY_MASTER เหมือนข้อมูลจริง
+แต่ละขนาดวัด (median ของ --repeat รอบ, หน่วย ms):
+
+    read_ledger              อ่าน database_claims.csv ทั้งไฟล์
+    process_data             แปลงชนิด + คอลัมน์ปีงบ/ปีการศึกษา/ปีปฏิทิน
+    get_next_doc_no_cold     ยังไม่มีตัวนับของปีนั้น (หาเลขสูงสุดจาก ledger)
+    get_next_doc_no_warm     มีตัวนับแล้ว
+    dashboard_rebuild        สร้าง rollup ใหม่ทั้งหมด (เปิดหน้าสรุปครั้งแรก)
+    dashboard_rerun          rollup ทันแล้ว + summarize ยอดรวม/รายหมวด/รายคณะ
+    dashboard_filter_groupby กรอง + group by บน DataFrame ทั้งก้อน (วิธีก่อนมี rollup)
+    save_target_budget       บันทึกวงเงิน 1 รายการ
+    append_claim             บันทึกรายการเบิก 1 รายการ + อัปเดต rollup
+    create_filled_pdf        สร้างใบเบิก PDF 1 ฉบับ (ไม่ขึ้นกับขนาด ledger ใช้ดูว่าคงที่)
+
+--storage sqlite วัดเส้นทางเดียวกันของ PAYAP_STORAGE=sqlite (ไม่มี dashboard_rebuild / filter_groupby)
+
+    python benchmarks/bench_suite.py --sizes 1000 10000 100000 1000000 -o bench.json
+    python benchmarks/bench_suite.py --sizes 1000 10000 --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from synthetic import make_realistic_ledger, write_ledger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import sqlite_store  # noqa: E402
+from budget_targets import TargetStore  # noqa: E402
+from dashboard_data import YEAR_TYPE_COLUMNS, summarize, sync_rollup  # noqa: E402
+from doc_numbers import allocate_doc_no, peek_next_doc_no  # noqa: E402
+from ledger import append_claim, process_data, read_ledger  # noqa: E402
+from pdf_render import FONT_FILE, TEMPLATE_PDF, create_filled_pdf  # noqa: E402
+
+YEAR_TYPE, YEAR = "ปีงบประมาณ", 2568
+
+
+def _time(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def _new_claim(sample):
+    claim = dict(sample)
+    claim["เลขที่ออก"] = "0203/999999"
+    claim["บันทึกเมื่อ"] = "2026-10-18 09:00:00"
+    return claim
+
+
+def _pdf_data(sample):
+    data = process_data(pd.DataFrame([sample])).iloc[0].to_dict()
+    data["เดือน_ตัวอักษร"] = "ตุลาคม"
+    return data
+
+
+def _dashboard(rollup):
+    summarize(rollup, YEAR_TYPE, YEAR)
+    summarize(rollup, YEAR_TYPE, YEAR, "รหัสหมวด")
+    summarize(rollup, YEAR_TYPE, YEAR, "คณะ")
+
+
+def _filter_groupby(df):
+    sub = df[df[YEAR_TYPE_COLUMNS[YEAR_TYPE]] == YEAR]
+    sub['จำนวนเงิน'].sum()
+    sub.groupby('รหัสหมวด')['จำนวนเงิน'].sum()
+    sub.groupby('คณะ')['จำนวนเงิน'].sum()
+
+
+def bench_csv(tmp, raw, repeat):
+    ledger = os.path.join(tmp, "database_claims.csv")
+    rollup = os.path.join(tmp, "budget_rollup.json")
+    counter = os.path.join(tmp, "doc_counter.db")
+    targets = os.path.join(tmp, "budget_targets.csv")
+    write_ledger(ledger, raw)
+    sample = raw.iloc[-1].to_dict()
+    results = {}
+
+    results["read_ledger"] = _time(lambda: read_ledger(ledger), repeat)
+    results["process_data"] = _time(lambda: process_data(raw.copy()), repeat)
+
+    def reset_counter():
+        if os.path.exists(counter):
+            os.remove(counter)
+    results["get_next_doc_no_cold"] = _time(lambda: peek_next_doc_no(counter, YEAR, ledger), repeat, reset_counter)
+    allocate_doc_no(counter, YEAR, ledger)
+    results["get_next_doc_no_warm"] = _time(lambda: peek_next_doc_no(counter, YEAR, ledger), repeat)
+
+    def reset_rollup():
+        if os.path.exists(rollup):
+            os.remove(rollup)
+    results["dashboard_rebuild"] = _time(lambda: sync_rollup(ledger, rollup), repeat, reset_rollup)
+    sync_rollup(ledger, rollup)
+    results["dashboard_rerun"] = _time(lambda: _dashboard(sync_rollup(ledger, rollup)), repeat)
+    processed = process_data(raw.copy())
+    results["dashboard_filter_groupby"] = _time(lambda: _filter_groupby(processed), repeat)
+
+    store = TargetStore(targets)
+    results["save_target_budget"] = _time(lambda: store.set(YEAR_TYPE, YEAR, 1_000_000.0, faculty=sample["คณะ"]), repeat)
+
+    claim = _new_claim(sample)
+    results["append_claim"] = _time(lambda: (append_claim(ledger, claim), sync_rollup(ledger, rollup)), repeat)
+
+    pdf_data = _pdf_data(sample)
+    template, font = os.path.join(ROOT, TEMPLATE_PDF), os.path.join(ROOT, FONT_FILE)
+    create_filled_pdf(pdf_data, template, font)
+    results["create_filled_pdf"] = _time(lambda: create_filled_pdf(pdf_data, template, font), repeat)
+    return results
+
+
+def bench_sqlite(tmp, raw, repeat):
+    db = os.path.join(tmp, sqlite_store.SQLITE_DB)
+    sqlite_store.insert_claims(db, raw.to_dict("records"))
+    sample = raw.iloc[-1].to_dict()
+    results = {}
+
+    results["read_ledger"] = _time(lambda: sqlite_store.read_claims(db), repeat)
+    results["process_data"] = _time(lambda: process_data(raw.copy()), repeat)
+    results["get_next_doc_no_cold"] = _time(lambda: peek_next_doc_no(db, YEAR + 100), repeat)
+    allocate_doc_no(db, YEAR)
+    results["get_next_doc_no_warm"] = _time(lambda: peek_next_doc_no(db, YEAR), repeat)
+
+    def dashboard():
+        sqlite_store.summarize(db, YEAR_TYPE, YEAR)
+        sqlite_store.summarize(db, YEAR_TYPE, YEAR, "รหัสหมวด")
+        sqlite_store.summarize(db, YEAR_TYPE, YEAR, "คณะ")
+    results["dashboard_rerun"] = _time(dashboard, repeat)
+    results["save_target_budget"] = _time(lambda: sqlite_store.save_target(db, YEAR_TYPE, YEAR, 1_000_000.0), repeat)
+    claim = _new_claim(sample)
+    results["append_claim"] = _time(lambda: sqlite_store.insert_claims(db, [claim]), repeat)
+
+    pdf_data = _pdf_data(sample)
+    template, font = os.path.join(ROOT, TEMPLATE_PDF), os.path.join(ROOT, FONT_FILE)
+    create_filled_pdf(pdf_data, template, font)
+    results["create_filled_pdf"] = _time(lambda: create_filled_pdf(pdf_data, template, font), repeat)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(current, baseline_path):
+    """พิมพ์อัตราส่วนเวลา (ปัจจุบัน / baseline) ของแต่ละ (ขนาด, การวัด) ที่มีทั้งสองฝั่ง"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    base = {(r["rows"], r["op"]): r["median_ms"] for r in baseline["results"]}
+    print(f"เทียบกับ {baseline_path} (commit {baseline.get('commit')})", file=sys.stderr)
+    for r in current["results"]:
+        old = base.get((r["rows"], r["op"]))
+        if old:
+            ratio = r["median_ms"] / old
+            flag = "  <-- ช้าลง" if ratio > 1.2 else ""
+            print(f"{r['rows']:>9,} {r['op']:<26} {old:10.2f} -> {r['median_ms']:10.2f} ms  x{ratio:.2f}{flag}",
+                  file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("-o", "--out", help="เขียนผล JSON ลงไฟล์ (ค่าเริ่มต้น: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="ไฟล์ JSON จากรอบก่อนเพื่อเทียบ")
+    args = parser.parse_args()
+
+    report = {
+        "commit": _git_commit(),
+        "storage": args.storage,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "repeat": args.repeat,
+        "results": [],
+    }
+    bench = bench_sqlite if args.storage == "sqlite" else bench_csv
+    for n in args.sizes:
+        raw = make_realistic_ledger(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            for op, ms in bench(tmp, raw, args.repeat).items():
+                report["results"].append({"rows": n, "op": op, "median_ms": round(ms, 3)})
+                print(f"{n:>9,} {op:<26} {ms:10.2f} ms", file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
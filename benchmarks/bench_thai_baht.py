@@ -0,0 +1,50 @@
+"""วัดความเร็วของ thai_baht.bahttext() (ความถูกต้องอยู่ใน tests/test_thai_baht.py)
+
+วัด: cold (ล้าง cache ก่อนวัด จำนวนเงินไม่ซ้ำ) เทียบกับ warm (จำนวนเงินซ้ำแบบงานนำเข้าจริง)
+
+    python benchmarks/bench_thai_baht.py --n 200000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from thai_baht import _bahttext_cached, _satang_text, bahttext, bahttext_series, number_text  # noqa: E402
+
+
+def _clear():
+    number_text.cache_clear()
+    _satang_text.cache_clear()
+    _bahttext_cached.cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    unique = [rng.randrange(1, 10 ** 9) / 100 for _ in range(args.n)]
+    # งานจริง: จำนวนเงินซ้ำกันมาก (ค่าธรรมเนียม/ค่าตอบแทนอัตราเดียวกัน)
+    repeated = [rng.choice(unique[:500]) for _ in range(args.n)]
+
+    for label, amounts in (("cold (unique)", unique), ("warm (repeated)", repeated)):
+        _clear()
+        start = time.perf_counter()
+        for a in amounts:
+            bahttext(a)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {args.n / elapsed:,.0f} amounts/s")
+
+    _clear()
+    start = time.perf_counter()
+    bahttext_series(repeated)
+    print(f"bahttext_series (repeated): {args.n / (time.perf_counter() - start):,.0f} amounts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""ledger แบบ CSV + process_data() เทียบกับ typed_ledger.load_claims() (Parquet แบบ typed)
+
+ต่อขนาด ledger วัด: เวลาโหลด, หน่วยความจำของ DataFrame (memory_usage(deep=True)), ขนาดไฟล์
+และความต่างของยอดรวมแบบ float (บาท) กับแบบ int64 (สตางค์)
+พร้อมตรวจว่าแปลง CSV -> Parquet -> CSV แล้วข้อมูลเหมือนเดิม
+
+    python benchmarks/bench_typed_ledger.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from synthetic import make_realistic_ledger, write_ledger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import append_claims, process_data, read_ledger  # noqa: E402
+from typed_ledger import CORE_COLUMNS, check_round_trip, load_claims  # noqa: E402
+
+
+def _timed(func, repeat=3):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times) * 1000
+
+
+def _mib(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            ledger_path = os.path.join(tmp, "database_claims.csv")
+            typed_path = os.path.join(tmp, "database_claims.parquet")
+            source = make_realistic_ledger(n)
+            write_ledger(ledger_path, source)
+
+            csv_df, t_csv = _timed(lambda: process_data(read_ledger(ledger_path)), args.repeat)
+            start = time.perf_counter()
+            load_claims(ledger_path, typed_path)
+            t_convert = (time.perf_counter() - start) * 1000
+            core, t_core = _timed(lambda: load_claims(ledger_path, typed_path), args.repeat)
+            full, t_full = _timed(lambda: load_claims(ledger_path, typed_path, columns=CORE_COLUMNS + ["ชื่อโครงการ", "เรื่อง"]),
+                                  args.repeat)
+            # มีรายการใหม่ต่อท้าย 100 รายการ (ยังไม่ถึงเกณฑ์เขียน Parquet ใหม่ -> อ่านส่วนท้ายจาก CSV)
+            append_claims(ledger_path, make_realistic_ledger(100, seed=1).to_dict("records"))
+            _, t_tail = _timed(lambda: load_claims(ledger_path, typed_path), args.repeat)
+
+            float_total = csv_df["จำนวนเงิน"].sum()
+            satang_total = int(core["จำนวนเงิน_สตางค์"].sum())
+            bad = check_round_trip(ledger_path, tmp)
+
+            print(f"--- {n:,} รายการ")
+            print(f"CSV + process_data       {t_csv:9.1f} ms  {_mib(csv_df):8.1f} MiB  ไฟล์ {os.path.getsize(ledger_path) / 2**20:7.1f} MiB")
+            print(f"แปลงเป็น Parquet ครั้งแรก  {t_convert:9.1f} ms")
+            print(f"typed (คอลัมน์หลัก)        {t_core:9.1f} ms  {_mib(core):8.1f} MiB  ไฟล์ {os.path.getsize(typed_path) / 2**20:7.1f} MiB")
+            print(f"typed + ข้อความ 2 คอลัมน์    {t_full:9.1f} ms  {_mib(full):8.1f} MiB")
+            print(f"typed + ส่วนท้าย 100 แถว   {t_tail:9.1f} ms")
+            print(f"ยอดรวม float - สตางค์      {float_total - satang_total / 100:+.6f} บาท")
+            print("แปลงไป-กลับ: " + ("ตรงกันทุกคอลัมน์" if not bad else "ไม่ตรง " + ", ".join(bad)))
+
+
+if __name__ == "__main__":
+    main()
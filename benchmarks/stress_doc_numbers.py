@@ -0,0 +1,48 @@
+"""Stress test ตัวนับเลขที่เอกสาร: หลาย process ขอเลขพร้อมกัน ต้องไม่ซ้ำและไม่ข้าม
+
+    python benchmarks/stress_doc_numbers.py --workers 16 --per-worker 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from doc_numbers import allocate_doc_no  # noqa: E402
+
+
+def _worker(args):
+    db_path, year, count = args
+    return [allocate_doc_no(db_path, year) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--per-worker", type=int, default=200)
+    parser.add_argument("--year", type=int, default=2569)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "doc_counter.db")
+        start = time.perf_counter()
+        with Pool(args.workers) as pool:
+            results = pool.map(_worker, [(db_path, args.year, args.per_worker)] * args.workers)
+        elapsed = time.perf_counter() - start
+
+        # ปีถัดไปต้องเริ่มนับ 001 ใหม่
+        assert allocate_doc_no(db_path, args.year + 1) == "0203/001"
+
+    nums = sorted(int(doc.split("/")[-1]) for batch in results for doc in batch)
+    total = args.workers * args.per_worker
+    assert len(nums) == len(set(nums)), "พบเลขที่เอกสารซ้ำ"
+    assert nums == list(range(1, total + 1)), "พบเลขที่เอกสารข้าม"
+    print(f"OK: {total} numbers from {args.workers} processes, no duplicates/gaps "
+          f"({elapsed:.2f}s, {total / elapsed:,.0f} allocations/s)")
+
+
+if __name__ == "__main__":
+    main()
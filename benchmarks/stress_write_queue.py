@@ -0,0 +1,196 @@
+"""Stress test คิวเขียน: หลาย session (thread แบบเดียวกับ Streamlit) กดบันทึกพร้อมกัน
+
+แต่ละ session บันทึกรายการเบิกทีละรายการ (รอผลก่อนกดครั้งถัดไป) และบันทึกวงเงินของตัวเองแทรกเป็นระยะ
+ระหว่างนั้นมี session หน้าสรุป (--readers) อ่าน rollup/ยอดรายเดือน/สำเนา Parquet วนไปเรื่อย ๆ
+ซึ่งเขียนไฟล์ rollup/Parquet เองนอกคิว (แบบเดียวกับหน้าสรุปจริง)
+ตรวจว่า: ไม่มี exception ทั้งฝั่งบันทึกและฝั่งอ่าน, ไม่มีรายการหาย, เลขที่เอกสารไม่ซ้ำ/ไม่ข้าม,
+เลขที่แต่ละ session ได้รับตรงกับแถวใน ledger, rollup ตรงกับการคำนวณใหม่, วงเงินครบทุก session
+และ span ของงานที่ทำใน thread เขียน (จองเลข, append, sync rollup, บันทึกวงเงิน) อยู่ใน rerun ของ session
+--baseline วัดแบบเดิมเทียบ (ทุก thread จองเลข + append + sync rollup เอง ไม่ผ่านคิว)
+
+    python benchmarks/stress_write_queue.py --sessions 48 --per-session 20
+    python benchmarks/stress_write_queue.py --storage sqlite
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# เปิดการจับเวลาก่อน import โมดูลของแอป (@timed ตัดสินตอน import) เพื่อตรวจว่า span ไม่หาย
+os.environ["PAYAP_PERF"] = "1"
+
+import perf  # noqa: E402
+import sqlite_store  # noqa: E402
+from budget_targets import TargetStore, read_targets  # noqa: E402
+from dashboard_data import check_rollup, sync_rollup  # noqa: E402
+from doc_numbers import allocate_doc_no  # noqa: E402
+from ledger import append_claim, read_ledger  # noqa: E402
+from typed_ledger import load_claims  # noqa: E402
+from write_queue import WriteQueue  # noqa: E402
+
+YEAR = 2569
+# span ที่ต้องอยู่ใน rerun ของ session ที่บันทึก (เกิดใน thread เขียน)
+WRITER_SPANS = {
+    "csv": {"doc_no.allocate", "ledger.append", "rollup.sync", "targets.write"},
+    "sqlite": {"doc_no.allocate", "sqlite.insert"},
+}
+
+
+def _claim(session, i):
+    return {"NO": "", "เลขที่ออก": "", "วัน": 1, "เดือน": 1 + i % 12, "ปี": YEAR, "เรื่อง": f"s{session}-{i}",
+            "คณะ": "คณะนิติศาสตร์", "จำนวนเงิน": 100.25, "ชื่อโครงการ": "stress", "รหัสหมวด": "521130002"}
+
+
+def _run_sessions(n_sessions, session_func):
+    barrier = threading.Barrier(n_sessions)
+    results, errors = {}, []
+
+    def worker(session):
+        barrier.wait()
+        try:
+            results[session] = session_func(session)
+        except Exception as e:  # นับไว้รายงาน ไม่ให้ thread อื่นหยุด
+            errors.append(repr(e))
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in range(n_sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors, time.perf_counter() - start
+
+
+def _start_readers(n_readers, read_once):
+    """session หน้าสรุปที่อ่านวนไปจนกว่าจะสั่งหยุด คืน (stop, threads, errors, counter)"""
+    stop = threading.Event()
+    errors, reads = [], [0]
+
+    def reader():
+        while not stop.is_set():
+            try:
+                read_once()
+                reads[0] += 1
+            except Exception as e:
+                errors.append(repr(e))
+            stop.wait(0.005)  # เว้นช่วงแบบ rerun ของผู้ใช้ ไม่ให้ thread อ่านแย่ง GIL จนคิวเขียนช้าผิดจริง
+
+    threads = [threading.Thread(target=reader) for _ in range(n_readers)]
+    for t in threads:
+        t.start()
+    return stop, threads, errors, reads
+
+
+def run_queue(tmp, args):
+    ledger_path = os.path.join(tmp, "database_claims.csv")
+    rollup_path = os.path.join(tmp, "budget_rollup.json")
+    typed_path = os.path.join(tmp, "database_claims.parquet")
+    counter_db = os.path.join(tmp, "doc_counter.db")
+    target_path = os.path.join(tmp, "budget_targets.csv")
+    perf_log = os.path.join(tmp, "perf_log.jsonl")
+    if args.storage == "sqlite":
+        db = os.path.join(tmp, "claims.db")
+        sqlite_store.init_db(db)
+        wq = WriteQueue(db, sqlite_db=db)
+
+        def read_once():
+            sqlite_store.summarize(db, "ปีงบประมาณ", YEAR)
+            sqlite_store.monthly_spend(db)
+    else:
+        wq = WriteQueue(counter_db, ledger_path, rollup_path)
+
+        def read_once():
+            # เหมือนหน้าสรุป: sync rollup/ยอดรายเดือน และโหลดสำเนา Parquet (เขียนไฟล์เองนอกคิว)
+            if os.path.exists(ledger_path):
+                sync_rollup(ledger_path, rollup_path)
+                load_claims(ledger_path, typed_path)
+    targets = TargetStore(target_path)
+
+    def session(s):
+        perf.start_rerun()
+        got = {}
+        for i in range(args.per_session):
+            got[f"s{s}-{i}"] = wq.save_claim(_claim(s, i))
+            if i % 5 == 0:
+                if args.storage == "sqlite":
+                    wq.call(sqlite_store.save_target, db, "ปีงบประมาณ", YEAR, 1000 + i, "", f"s{s}")
+                else:
+                    wq.call(targets.set, "ปีงบประมาณ", YEAR, 1000 + i, "", f"s{s}")
+        report = perf.finish_rerun("stress", perf_log)
+        missing = WRITER_SPANS[args.storage] - {span["name"] for span in report["spans"]}
+        assert not missing, f"session {s} ไม่มี span {sorted(missing)}"
+        return got
+
+    stop, readers, read_errors, reads = _start_readers(args.readers, read_once)
+    results, errors, elapsed = _run_sessions(args.sessions, session)
+    stop.set()
+    for t in readers:
+        t.join()
+    wq.close()
+
+    total = args.sessions * args.per_session
+    returned = {key: doc for got in results.values() for key, doc in got.items()}
+    ledger = sqlite_store.read_claims(db) if args.storage == "sqlite" else read_ledger(ledger_path, dtype=str)
+    in_ledger = dict(zip(ledger["เรื่อง"], ledger["เลขที่ออก"]))
+    nums = sorted(int(doc.split("/")[-1]) for doc in returned.values())
+
+    assert not errors, errors[:3]
+    assert not read_errors, read_errors[:3]
+    assert len(ledger) == total, f"ledger มี {len(ledger)} แถว คาดไว้ {total}"
+    assert nums == list(range(1, total + 1)), "เลขที่เอกสารซ้ำหรือข้าม"
+    assert in_ledger == returned, "เลขที่ที่ session ได้รับไม่ตรงกับใน ledger"
+    if args.storage == "sqlite":
+        scoped = sqlite_store.get_targets_for_year(db, "ปีงบประมาณ", YEAR)
+    else:
+        scoped = read_targets(target_path).get(("ปีงบประมาณ", YEAR), {})
+        assert check_rollup(ledger_path, rollup_path).empty, "rollup ไม่ตรงกับ ledger"
+    assert len(scoped) == args.sessions, f"วงเงินมี {len(scoped)} รายการ คาดไว้ {args.sessions}"
+    print(f"คิวเขียน ({args.storage}): {total} รายการจาก {args.sessions} sessions ครบ ไม่ซ้ำ ไม่ข้าม "
+          f"{elapsed:.2f}s = {total / elapsed:,.0f} รายการ/s, "
+          f"{wq.commits} commits (เฉลี่ย {wq.claims_written / max(wq.commits, 1):.1f} รายการ/commit), "
+          f"หน้าสรุป {args.readers} sessions อ่าน {reads[0]} รอบ ไม่มี error, span ครบทุก session")
+
+
+def run_baseline(tmp, args):
+    """เส้นทางเดิม: แต่ละ session จองเลข + append + sync rollup เองโดยไม่มีคิว"""
+    ledger_path = os.path.join(tmp, "baseline.csv")
+    rollup_path = os.path.join(tmp, "baseline_rollup.json")
+    counter_db = os.path.join(tmp, "baseline_counter.db")
+
+    def session(s):
+        for i in range(args.per_session):
+            row = _claim(s, i)
+            row["เลขที่ออก"] = allocate_doc_no(counter_db, YEAR, ledger_path)
+            append_claim(ledger_path, row)
+            sync_rollup(ledger_path, rollup_path)
+
+    _, errors, elapsed = _run_sessions(args.sessions, session)
+    total = args.sessions * args.per_session
+    rows = len(read_ledger(ledger_path))
+    bad = len(check_rollup(ledger_path, rollup_path))
+    print(f"แบบเดิม (ไม่มีคิว): {rows}/{total} แถวใน ledger, {len(errors)} session มี exception, "
+          f"rollup ไม่ตรง {bad} แถว, {elapsed:.2f}s = {rows / elapsed:,.0f} รายการ/s")
+    if errors:
+        print(f"  เช่น {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=48)
+    parser.add_argument("--per-session", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=6, help="จำนวน session หน้าสรุปที่อ่านพร้อมกัน")
+    parser.add_argument("--storage", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--baseline", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run_queue(tmp, args)
+        if args.baseline:
+            run_baseline(tmp, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""สร้างข้อมูล ledger สังเคราะห์สำหรับ benchmark"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import CLAIM_COLUMNS  # noqa: E402
+
+
+def make_ledger(n_rows, seed=0):
+    """DataFrame ตาม schema ของ ledger (ค่าเป็นสตริงเหมือนที่อ่านจาก CSV)"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: [""] * n_rows for col in CLAIM_COLUMNS})
+    df["เลขที่ออก"] = [f"0203/{i % 999 + 1:03d}" for i in range(n_rows)]
+    df["วัน"] = rng.integers(1, 29, n_rows).astype(str)
+    df["เดือน"] = rng.integers(1, 13, n_rows).astype(str)
+    df["ปี"] = rng.integers(2560, 2570, n_rows).astype(str)
+    df["จำนวนเงิน"] = (rng.integers(100, 5_000_000, n_rows) / 100).astype(str)
+    return df
+
+
+def make_realistic_ledger(n_rows, seed=0, years=(2565, 2570)):
+    """เหมือน make_ledger() แต่ทุกคอลัมน์มีค่าแบบข้อมูลจริง: คณะ/หมวดจาก master data,
+    เลขที่ออกเรียงต่อเนื่องในแต่ละปี, จำนวนเงินตัวอักษร และเรียงตามวันที่บันทึก"""
+    from master_data import BUDGET_MASTER, FACULTY_MASTER, category_label
+    from thai_baht import bahttext_series
+
+    rng = np.random.default_rng(seed)
+    year = rng.integers(years[0], years[1], n_rows)
+    month = rng.integers(1, 13, n_rows)
+    day = rng.integers(1, 29, n_rows)
+    order = np.lexsort((day, month, year))
+    year, month, day = year[order], month[order], day[order]
+    # จำนวนเงินส่วนใหญ่เป็นจำนวนเต็มสิบบาท (ค่าตอบแทน/ค่าธรรมเนียมอัตราเดียวกันซ้ำบ่อย)
+    amount = rng.integers(10, 500_000, n_rows) // 10 * 10 + np.where(rng.random(n_rows) < 0.1, 0.5, 0.0)
+
+    df = pd.DataFrame({col: [""] * n_rows for col in CLAIM_COLUMNS})
+    df["ปี"] = year.astype(str)
+    df["เดือน"] = month.astype(str)
+    df["วัน"] = day.astype(str)
+    seq = pd.Series(year).groupby(year).cumcount() + 1
+    df["เลขที่ออก"] = "0203/" + seq.astype(str).str.zfill(3)
+    df["ผู้ลงนาม"] = "ผู้อำนวยการ"
+    df["ถึง"] = "หัวหน้าแผนกการเงิน"
+    df["เรื่อง"] = "ขออนุมัติเบิกเงิน"
+    df["คณะ"] = rng.choice(FACULTY_MASTER, n_rows)
+    df["รหัสหมวด"] = rng.choice([category_label(k) for k in BUDGET_MASTER], n_rows)
+    df["ชื่อโครงการ"] = "โครงการที่ " + pd.Series(rng.integers(1, 500, n_rows)).astype(str)
+    df["เงินที่อนุมัติ"] = (amount * 4).astype(str)
+    df["จำนวนเงิน"] = amount.astype(str)
+    df["จำนวนเงิน_ตัวอักษร"] = bahttext_series(amount).values
+    df["บันทึกเมื่อ"] = (pd.Series(year - 543).astype(str) + "-" + pd.Series(month).astype(str).str.zfill(2)
+                         + "-" + pd.Series(day).astype(str).str.zfill(2) + " 09:00:00")
+    df["สั่งจ่ายให้"] = "บริษัท ตัวอย่าง จำกัด"
+    return df
+
+
+def write_ledger(path, df):
+    """เขียน DataFrame เป็นไฟล์ ledger รูปแบบเดียวกับที่แอปสร้าง (init_ledger + ต่อท้าย)"""
+    from ledger import init_ledger
+
+    init_ledger(path)
+    # ต่อท้ายด้วย utf-8 ธรรมดา (BOM มีแล้วที่หัวไฟล์จาก init_ledger)
+    df[CLAIM_COLUMNS].to_csv(path, mode="a", header=False, index=False, encoding="utf-8", lineterminator="\n")
+    # fsync ตอนนี้เลย ไม่งั้น fsync ของการบันทึกรายการแรกใน benchmark จะต้องเขียนทั้งไฟล์ลงดิสก์แทน
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
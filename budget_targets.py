@@ -0,0 +1,126 @@
+import csv
+import logging
+import threading
+
+import pandas as pd
+
+from dashboard_data import file_version
+from ledger import ENCODING, atomic_write
+from perf import timed
+
+# ==========================================
+# วงเงินงบประมาณ (budget_targets.csv)
+# ==========================================
+# เก็บวงเงินทั้งหมดไว้ใน dict ในหน่วยความจำ: {(year_type, year): {(คณะ, รหัสหมวด): amount}}
+# ("", "") = วงเงินรวมทั้งปี, (คณะ, "") = รายคณะ, ("", รหัสหมวด) = รายหมวด
+# อ่านไฟล์ครั้งเดียว (ตรวจแค่ mtime/size ของไฟล์ เผื่อ process อื่นแก้ไฟล์) และบันทึกแบบ write-through:
+# เขียนไฟล์ชั่วคราว + fsync แล้ว os.replace ไฟล์จริงจึงไม่มีทางเสียครึ่ง ๆ กลาง ๆ
+
+TARGET_COLUMNS = ["year_type", "year", "amount", "faculty", "category"]
+
+logger = logging.getLogger(__name__)
+
+
+@timed("targets.read")
+def read_targets(path):
+    """อ่าน budget_targets.csv เป็น dict ซ้อน (ไฟล์รุ่นเก่าที่มีแค่ 3 คอลัมน์ = วงเงินรวมทั้งปี)
+
+    แถวที่ปี/วงเงินไม่ใช่ตัวเลขหรือไม่มีประเภทปี (เช่นแก้ไฟล์ด้วยมือ) จะถูกข้ามและ log เลขบรรทัดไว้
+    แถวเดียวที่เสียจึงไม่ทำให้หน้าสรุปหรือการย้ายข้อมูลไป SQLite ล้มทั้งหมด
+    """
+    try:
+        df = pd.read_csv(path, encoding=ENCODING, dtype=str, keep_default_na=False)
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return {}
+    df = df.reindex(columns=TARGET_COLUMNS, fill_value="")
+    year = pd.to_numeric(df["year"].str.strip(), errors="coerce")
+    amount = pd.to_numeric(df["amount"].str.strip(), errors="coerce")
+    valid = year.notna() & (year % 1 == 0) & amount.notna() & (df["year_type"].str.strip() != "")
+    if not valid.all():
+        # +2 = หัวตาราง + นับบรรทัดจาก 1
+        logger.warning("%s: ข้ามวงเงินที่ไม่ถูกต้อง บรรทัด %s", path, ", ".join(str(i + 2) for i in df.index[~valid]))
+    targets = {}
+    for r, y, amt in zip(df[valid].itertuples(index=False), year[valid], amount[valid]):
+        targets.setdefault((r.year_type, int(y)), {})[(r.faculty, r.category)] = float(amt)
+    return targets
+
+
+@timed("targets.write")
+def write_targets(path, targets):
+    """เขียนวงเงินทั้งหมดลงไฟล์แบบ atomic (ผ่าน atomic_write())"""
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding=ENCODING, newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(TARGET_COLUMNS)
+            for (year_type, year), scoped in sorted(targets.items()):
+                for (faculty, category), amount in sorted(scoped.items()):
+                    writer.writerow([year_type, year, amount, faculty, category])
+
+    atomic_write(path, write)
+
+
+class TargetStore:
+    """วงเงินงบประมาณในหน่วยความจำ ใช้ร่วมกันได้หลาย session (ล็อกด้วย threading.Lock)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._targets = {}
+        self._version = False  # False = ยังไม่เคยโหลด (file_version() คืน None เมื่อไม่มีไฟล์)
+
+    def _refresh(self):
+        version = file_version(self.path)
+        if version != self._version:
+            self._targets = read_targets(self.path)
+            self._version = version
+
+    def get(self, year_type, year, faculty="", category=""):
+        with self._lock:
+            self._refresh()
+            return self._targets.get((year_type, int(year)), {}).get((faculty, category), 0.0)
+
+    def for_year(self, year_type, year):
+        """วงเงินทุกระดับของปีนั้น {(คณะ, รหัสหมวด): amount}"""
+        with self._lock:
+            self._refresh()
+            return dict(self._targets.get((year_type, int(year)), {}))
+
+    def all(self):
+        """วงเงินทั้งหมด {(year_type, year): {(คณะ, รหัสหมวด): amount}} (สำเนา)"""
+        with self._lock:
+            self._refresh()
+            return {key: dict(scoped) for key, scoped in self._targets.items()}
+
+    def set(self, year_type, year, amount, faculty="", category=""):
+        """บันทึกวงเงิน (amount=None = ลบวงเงินนั้น) เขียนลงไฟล์ก่อนแล้วค่อยเปลี่ยนค่าในหน่วยความจำ"""
+        key = (year_type, int(year))
+        with self._lock:
+            self._refresh()
+            targets = dict(self._targets)
+            scoped = dict(targets.get(key, {}))
+            if amount is None:
+                scoped.pop((faculty, category), None)
+            else:
+                scoped[(faculty, category)] = float(amount)
+            if scoped:
+                targets[key] = scoped
+            else:
+                targets.pop(key, None)
+            write_targets(self.path, targets)
+            self._targets = targets
+            self._version = file_version(self.path)
+
+
+def attach_targets(summary, dim, scoped):
+    """เติมคอลัมน์ วงเงิน/คงเหลือ ให้ตารางสรุปรายคณะหรือรายหมวด (แสดงรายการที่ตั้งวงเงินแต่ยังไม่ได้ใช้ด้วย)"""
+    if dim == "คณะ":
+        limits = {fac: amt for (fac, cat), amt in scoped.items() if fac and not cat}
+    else:
+        limits = {cat: amt for (fac, cat), amt in scoped.items() if cat and not fac}
+    if not limits:
+        return summary
+    limit_df = pd.DataFrame({dim: list(limits), "วงเงิน": list(limits.values())})
+    merged = summary.merge(limit_df, on=dim, how="outer")
+    merged["จำนวนเงิน"] = merged["จำนวนเงิน"].fillna(0.0)
+    merged["คงเหลือ"] = merged["วงเงิน"] - merged["จำนวนเงิน"]
+    return merged
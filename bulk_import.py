@@ -0,0 +1,172 @@
+import argparse
+from datetime import datetime
+
+import pandas as pd
+
+from doc_numbers import allocate_doc_block
+from ledger import CLAIM_COLUMNS
+from master_data import BUDGET_MASTER, FACULTY_MASTER
+from perf import timed
+from thai_baht import bahttext_series
+from write_queue import write_claims
+
+# ==========================================
+# นำเข้ารายการเบิกจำนวนมากจากไฟล์ Excel/CSV
+# ==========================================
+# ตรวจทุกแถวพร้อมกันแบบ vectorized (เทียบกับ BUDGET_MASTER / FACULTY_MASTER)
+# จองเลขที่เอกสารต่อเนื่องเป็นก้อนเดียวต่อปี แล้วบันทึกทั้งชุดในการเขียนครั้งเดียว
+#
+#   python bulk_import.py claims.xlsx
+#   python bulk_import.py claims.csv --skip-invalid --pdf claims.pdf
+
+REQUIRED_COLUMNS = ["เรื่อง", "ชื่อโครงการ", "คณะ", "จำนวนเงิน", "รหัสหมวด"]
+
+DEFAULTS = {"ผู้ลงนาม": "ผู้อำนวยการ", "ถึง": "หัวหน้าแผนกการเงิน"}
+
+# ปี พ.ศ. ที่รับได้ (ช่วงเดียวกับช่องปีในหน้าพิมพ์ย้อนหลัง) กันปี ค.ศ./0 ไปเปิดตัวนับเลขที่เอกสารของปีที่ไม่มีจริง
+YEAR_RANGE = (2500, 2700)
+
+
+@timed("import.read")
+def read_upload(path_or_buffer, filename=None):
+    """อ่านไฟล์ .xlsx/.xls หรือ .csv เป็น DataFrame (ทุกคอลัมน์เป็นข้อความ)"""
+    name = (filename or str(path_or_buffer)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        df = pd.read_excel(path_or_buffer, dtype=str)
+    else:
+        df = pd.read_csv(path_or_buffer, encoding="utf-8-sig", dtype=str)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df.fillna("")
+
+
+@timed("import.validate")
+def validate(df):
+    """ตรวจข้อมูลทั้งตาราง คืน (df ที่ปรับรูปแบบแล้ว, Series ข้อความผิดพลาดต่อแถว: "" = ผ่าน)"""
+    df = df.copy()
+    missing_cols = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing_cols:
+        raise ValueError(f"ไม่พบคอลัมน์: {', '.join(missing_cols)}")
+
+    errors = pd.Series("", index=df.index)
+
+    def flag(mask, message):
+        errors.loc[mask] = errors.loc[mask] + message + "; "
+
+    for col in ["เรื่อง", "ชื่อโครงการ"]:
+        df[col] = df[col].astype(str).str.strip()
+        flag(df[col] == "", f"ไม่มี{col}")
+
+    df['คณะ'] = df['คณะ'].astype(str).str.strip()
+    flag(~df['คณะ'].isin(FACULTY_MASTER), "คณะไม่อยู่ในรายชื่อ")
+
+    # รับได้ทั้ง "541010001" และ "541010001 หมวดส่งเสริมการวิจัย" แล้วปรับเป็นรูปแบบเดียวกับหน้าฟอร์ม
+    codes = df['รหัสหมวด'].astype(str).str.strip().str.split().str[0].fillna("")
+    valid_code = codes.isin(BUDGET_MASTER.keys())
+    flag(~valid_code, "รหัสหมวดไม่ถูกต้อง")
+    df['รหัสหมวด'] = (codes + " " + codes.map(BUDGET_MASTER).fillna("")).where(valid_code, df['รหัสหมวด'])
+
+    amount = pd.to_numeric(df['จำนวนเงิน'].astype(str).str.replace(",", "", regex=False), errors='coerce')
+    flag(amount.isna() | (amount <= 0), "จำนวนเงินไม่ถูกต้อง")
+    df['จำนวนเงิน'] = amount.round(2)
+
+    if 'เงินที่อนุมัติ' in df.columns:
+        df['เงินที่อนุมัติ'] = pd.to_numeric(df['เงินที่อนุมัติ'].astype(str).str.replace(",", "", regex=False),
+                                            errors='coerce').fillna(0.0)
+
+    # วันที่: ใช้ วัน/เดือน/ปี (พ.ศ.) ในไฟล์ถ้ามีคอลัมน์นั้น (ค่าที่ไม่ใช่จำนวนเต็มหรือเว้นว่าง = ผิด)
+    # ไม่มีคอลัมน์ -> ใช้วันนี้
+    now = datetime.now()
+    numeric = {}
+    for col, default in (("วัน", now.day), ("เดือน", now.month), ("ปี", now.year + 543)):
+        if col in df.columns:
+            value = pd.to_numeric(df[col].astype(str).str.strip(), errors='coerce')
+            numeric[col] = value.notna() & (value % 1 == 0)
+            flag(~numeric[col], f"{col}ไม่ใช่ตัวเลข")
+            df[col] = value.where(numeric[col], 0).astype(int)
+        else:
+            numeric[col] = pd.Series(True, index=df.index)
+            df[col] = default
+    year_ok = df['ปี'].between(*YEAR_RANGE)
+    flag(numeric['ปี'] & ~year_ok, f"ปีต้องเป็น พ.ศ. {YEAR_RANGE[0]}-{YEAR_RANGE[1]}")
+    month_ok = df['เดือน'].between(1, 12)
+    flag(numeric['เดือน'] & ~month_ok, "เดือนไม่ถูกต้อง")
+    # วันต้องมีจริงในเดือน/ปีนั้น (เช่น 31/2 หรือ 29/2 ของปีที่ไม่ใช่ปีอธิกสุรทิน)
+    dates = pd.to_datetime(pd.DataFrame({"year": df['ปี'].where(year_ok, YEAR_RANGE[0]) - 543,
+                                         "month": df['เดือน'].where(month_ok, 1),
+                                         "day": df['วัน']}), errors='coerce')
+    flag(numeric['วัน'] & year_ok & month_ok & dates.isna(), "วันไม่ถูกต้อง")
+
+    return df, errors.str.rstrip("; ")
+
+
+def prepare_rows(df, counter_db, ledger_path=None):
+    """จองเลขที่เอกสารเป็นก้อนต่อปี แล้วเติมคอลัมน์ให้ครบตาม schema คืน DataFrame พร้อมบันทึก"""
+    df = df.reindex(columns=CLAIM_COLUMNS, fill_value="")
+    for col, value in DEFAULTS.items():
+        df[col] = df[col].where(df[col].astype(str) != "", value)
+    df['NO'] = ""
+    # จำนวนเงินตัวอักษรที่เว้นว่าง -> แปลงจากตัวเลข (คำนวณเฉพาะจำนวนเงินที่ไม่ซ้ำกัน)
+    blank = df['จำนวนเงิน_ตัวอักษร'].astype(str).str.strip() == ""
+    if blank.any():
+        df.loc[blank, 'จำนวนเงิน_ตัวอักษร'] = bahttext_series(df.loc[blank, 'จำนวนเงิน'])
+    df['บันทึกเมื่อ'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    for year, idx in df.groupby('ปี').groups.items():
+        df.loc[idx, 'เลขที่ออก'] = allocate_doc_block(counter_db, int(year), len(idx), ledger_path)
+    return df
+
+
+def commit_claims(df, ledger_path=None, rollup_path=None, sqlite_db=None):
+    """บันทึกทั้งชุดในการเขียนครั้งเดียว (CSV: append + fsync ครั้งเดียว, SQLite: transaction เดียว)"""
+    write_claims(df.to_dict("records"), ledger_path, rollup_path, sqlite_db)
+
+
+@timed("import.commit")
+def import_claims(df, counter_db, ledger_path=None, rollup_path=None, sqlite_db=None, skip_invalid=False):
+    """ตรวจ + จองเลข + บันทึก คืน (DataFrame ที่บันทึกแล้ว, DataFrame แถวที่ผิดพร้อมคอลัมน์ error)
+
+    มีแถวผิดและ skip_invalid=False -> ไม่บันทึกอะไรเลย
+    """
+    cleaned, errors = validate(df)
+    invalid = df[errors != ""].assign(error=errors[errors != ""])
+    if not invalid.empty and not skip_invalid:
+        return cleaned.iloc[0:0], invalid
+    valid = cleaned[errors == ""]
+    if valid.empty:
+        return valid, invalid
+    rows = prepare_rows(valid, counter_db, None if sqlite_db else ledger_path)
+    commit_claims(rows, ledger_path, rollup_path, sqlite_db)
+    return rows, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="นำเข้ารายการเบิกจำนวนมากจากไฟล์ Excel/CSV")
+    parser.add_argument("file")
+    parser.add_argument("--ledger", default="database_claims.csv")
+    parser.add_argument("--rollup", default="budget_rollup.json")
+    parser.add_argument("--counter", default="doc_counter.db")
+    parser.add_argument("--sqlite", metavar="DB", help="บันทึกลงฐานข้อมูล SQLite (ตัวนับเลขอยู่ในไฟล์เดียวกัน)")
+    parser.add_argument("--skip-invalid", action="store_true", help="นำเข้าเฉพาะแถวที่ถูกต้อง")
+    parser.add_argument("--pdf", metavar="OUT", help="สร้างใบเบิกของรายการที่นำเข้าเป็น PDF ไฟล์เดียว")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    counter_db = args.sqlite or args.counter
+    imported, invalid = import_claims(read_upload(args.file), counter_db, args.ledger, args.rollup,
+                                      args.sqlite, args.skip_invalid)
+    if not invalid.empty:
+        print(invalid.to_string())
+        if not args.skip_invalid:
+            raise SystemExit(f"พบ {len(invalid)} แถวที่ไม่ถูกต้อง ยังไม่ได้บันทึกข้อมูล (ใช้ --skip-invalid เพื่อข้าม)")
+    if not imported.empty:
+        print(f"นำเข้า {len(imported)} รายการ เลขที่ {imported['เลขที่ออก'].iloc[0]} - {imported['เลขที่ออก'].iloc[-1]}")
+
+    if args.pdf and not imported.empty:
+        from batch_pdf import write_merged_pdf
+        with open(args.pdf, "wb") as out:
+            count = write_merged_pdf(imported.to_dict("records"), out, workers=args.workers)
+        print(f"สร้าง {count} ใบเบิก -> {args.pdf}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import math
+
+from ledger import process_data
+from dashboard_data import YEAR_TYPE_COLUMNS
+from pdf_render import THAI_MONTHS
+from perf import timed
+
+# ==========================================
+# กราฟหน้าสรุป (สร้างเป็น Vega-Lite spec)
+# ==========================================
+# ฟังก์ชันในไฟล์นี้คืน dict ของ Vega-Lite spec (chart.to_dict()) แทน object ของ Altair
+# app.py จึง cache spec ไว้ด้วยคีย์ (year_type, year, dimension, data version) ได้
+# และ rerun ที่ข้อมูลไม่เปลี่ยนจะส่ง spec เดิมให้ st.vega_lite_chart() ทันที
+# กราฟแนวโน้มรับยอดรายเดือนที่รวมมาแล้วจากฝั่ง server (rollup/SQL) ข้อมูลที่ส่งไปเบราว์เซอร์จึงเล็กเสมอ
+# altair import ในฟังก์ชัน: โหลดเฉพาะตอนเปิดหน้าสรุปและ cache ของ spec ยังไม่มี
+
+TREND_MAX_POINTS = 60
+
+
+@timed("chart.donut")
+def donut_spec(data, category_col, value_col):
+    """spec ของกราฟโดนัทสัดส่วน (วงแหวน + ตัวเลขรอบวง)"""
+    import altair as alt
+
+    base = alt.Chart(data[[category_col, value_col]]).encode(theta=alt.Theta(value_col, stack=True))
+    pie = base.mark_arc(innerRadius=60).encode(
+        color=alt.Color(category_col),
+        order=alt.Order(value_col, sort="descending"),
+        tooltip=[category_col, alt.Tooltip(value_col, format=",.2f")]
+    )
+    text = base.mark_text(radius=140).encode(
+        text=alt.Text(value_col, format=",.0f"),
+        order=alt.Order(value_col, sort="descending"),
+        color=alt.value("black")
+    )
+    return (pie + text).to_dict()
+
+
+def bin_monthly(monthly, max_points=TREND_MAX_POINTS):
+    """รวมยอดรายเดือน (ไม่ว่าง) ให้เหลือไม่เกิน max_points จุด (ข้อมูลหลายปี -> รวมทีละ 2, 3, ... เดือน)
+
+    คืน DataFrame คอลัมน์ ปี, เดือน (เดือนแรกของช่วง), จำนวนเงิน, งวด (ป้ายแกน x)
+    """
+    monthly = monthly.sort_values(['ปี', 'เดือน'])
+    # เลขลำดับเดือนต่อเนื่อง (เดือนที่ไม่มีรายการก็นับ) เพื่อให้แต่ละช่วงยาวเท่ากันจริง
+    index = monthly['ปี'] * 12 + monthly['เดือน'] - 1
+    first = index.iloc[0]
+    step = max(1, math.ceil((index.iloc[-1] - first + 1) / max_points))
+    start = ((index - first) // step * step + first).rename('ลำดับเดือน')
+    binned = monthly.groupby(start)['จำนวนเงิน'].sum().reset_index()
+    binned['ปี'] = binned['ลำดับเดือน'] // 12
+    binned['เดือน'] = binned['ลำดับเดือน'] % 12 + 1
+    binned['งวด'] = binned['เดือน'].map("{:02d}".format) + "/" + binned['ปี'].astype(str)
+    return binned[['ปี', 'เดือน', 'จำนวนเงิน', 'งวด']]
+
+
+@timed("chart.trend")
+def monthly_trend_spec(monthly, year_type, year, max_points=TREND_MAX_POINTS):
+    """spec ของกราฟแท่งยอดใช้จ่ายรายเดือนทั้งหมด (monthly ต้องไม่ว่าง) เน้นสีช่วงที่อยู่ในปีที่เลือก"""
+    import altair as alt
+
+    binned = process_data(bin_monthly(monthly, max_points))
+    binned['ปีที่เลือก'] = binned[YEAR_TYPE_COLUMNS[year_type]] == int(year)
+    chart = alt.Chart(binned[['งวด', 'จำนวนเงิน', 'ปีที่เลือก']]).mark_bar().encode(
+        x=alt.X('งวด:O', sort=None, title="เดือน/ปี"),
+        y=alt.Y('จำนวนเงิน:Q', title="บาท"),
+        color=alt.condition(alt.datum['ปีที่เลือก'], alt.value("#e4572e"), alt.value("#9bb1c8")),
+        tooltip=['งวด', alt.Tooltip('จำนวนเงิน', format=",.2f")]
+    )
+    return chart.to_dict()
+
+
+@timed("chart.cumulative")
+def cumulative_spec(current, previous, year, target=0.0):
+    """spec ของกราฟเส้นยอดสะสมรายเดือนของปีที่เลือกเทียบปีก่อน (จาก analytics.select_year()) พร้อมเส้นวงเงิน"""
+    import altair as alt
+    import pandas as pd
+
+    rows = pd.concat([current.assign(ชุด=str(year)), previous.assign(ชุด=str(int(year) - 1))], ignore_index=True)
+    rows['งวด'] = rows['เดือน'].map(lambda m: THAI_MONTHS[m - 1])
+    order = rows.sort_values('period').drop_duplicates('period')['งวด'].tolist()
+    chart = alt.Chart(rows[['period', 'งวด', 'ชุด', 'จำนวนเงิน', 'สะสม']]).mark_line(point=True).encode(
+        x=alt.X('งวด:O', sort=order, title="เดือน"),
+        y=alt.Y('สะสม:Q', title="บาท (สะสม)"),
+        color=alt.Color('ชุด:N', title="ปี"),
+        tooltip=['ชุด', 'งวด', alt.Tooltip('จำนวนเงิน', format=",.2f"), alt.Tooltip('สะสม', format=",.2f")]
+    )
+    if target > 0:
+        rule = alt.Chart(pd.DataFrame({'วงเงิน': [target]})).mark_rule(color="#e4572e", strokeDash=[6, 4]).encode(
+            y='วงเงิน:Q', tooltip=[alt.Tooltip('วงเงิน', format=",.2f")]
+        )
+        chart = chart + rule
+    return chart.to_dict()
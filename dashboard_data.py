@@ -0,0 +1,175 @@
+import json
+import os
+
+import pandas as pd
+
+from ledger import atomic_write, read_ledger, read_ledger_from, process_data
+from perf import timed
+
+# ==========================================
+# ข้อมูลสำหรับหน้าสรุป: ตารางยอดรวม (rollup)
+# ==========================================
+# เก็บยอดใช้จ่ายรวมต่อ (year_type, year, รหัสหมวด, คณะ) และยอดรายเดือนต่อ (ปี, เดือน) ไว้ในไฟล์ JSON เล็ก ๆ
+# พร้อม "ledger_size" = จำนวนไบต์ของ ledger ที่รวมยอดไปแล้ว ทุกครั้งที่บันทึกรายการใหม่
+# จะอ่านเฉพาะส่วนท้ายไฟล์ที่เพิ่มมาแล้วบวกเข้า rollup (ไม่ต้องอ่าน ledger ทั้งไฟล์)
+# ถ้า ledger ถูกเขียนใหม่ (compaction/ล้างข้อมูล) จะสร้าง rollup ใหม่ทั้งหมด
+
+# ชื่อประเภทปีบนหน้าจอ (และใน budget_targets.csv) -> คอลัมน์ที่ process_data() สร้าง
+YEAR_TYPE_COLUMNS = {
+    "ปีงบประมาณ": "ปีงบประมาณ",
+    "ปีพุทธศักราช": "ปีปฏิทิน",
+    "ปีการศึกษา": "ปีการศึกษา",
+}
+
+DIMENSIONS = ["รหัสหมวด", "คณะ"]
+ROLLUP_KEYS = ["year_type", "year"] + DIMENSIONS
+# ยอดรายเดือนแยกเป็นตารางเล็กอีกตาราง (ถ้าใส่เดือนในคีย์ของ rollup หลัก ตารางจะใหญ่ขึ้น ~12 เท่า
+# และการบันทึกทุกครั้งต้องเขียน JSON ทั้งก้อนใหม่)
+MONTHLY_KEYS = ["ปี", "เดือน"]
+
+
+def file_version(path):
+    """คีย์เวอร์ชันของไฟล์ (mtime, size) ใช้ตัดสินว่าต้องโหลดใหม่หรือไม่"""
+    try:
+        st_ = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
+
+
+def rollup_from_frame(df):
+    """สร้าง rollup จาก DataFrame ที่ผ่าน process_data() แล้ว"""
+    if df.empty:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ['จำนวนเงิน'])
+    dims = df[DIMENSIONS].fillna("").astype(str)
+    frames = []
+    for year_type, col in YEAR_TYPE_COLUMNS.items():
+        g = pd.concat([df[[col, 'จำนวนเงิน']], dims], axis=1).groupby([col] + DIMENSIONS)['จำนวนเงิน'].sum().reset_index()
+        g = g.rename(columns={col: 'year'})
+        g.insert(0, 'year_type', year_type)
+        frames.append(g)
+    return pd.concat(frames, ignore_index=True)
+
+
+def monthly_from_frame(df):
+    """ยอดใช้จ่ายรายเดือน (ปี พ.ศ., เดือน) จาก DataFrame ที่ผ่าน process_data() แล้ว"""
+    if df.empty:
+        return pd.DataFrame(columns=MONTHLY_KEYS + ['จำนวนเงิน'])
+    valid = df[(df['ปี'] > 0) & df['เดือน'].between(1, 12)]
+    return valid.groupby(MONTHLY_KEYS)['จำนวนเงิน'].sum().reset_index()
+
+
+def _merge(rollup, delta, keys=ROLLUP_KEYS):
+    if delta.empty:
+        return rollup
+    if rollup.empty:
+        return delta
+    merged = pd.concat([rollup, delta], ignore_index=True)
+    return merged.groupby(keys)['จำนวนเงิน'].sum().reset_index()
+
+
+def _read_state(rollup_path):
+    try:
+        with open(rollup_path, encoding="utf-8") as f:
+            state = json.load(f)
+        rollup = pd.DataFrame(state["rows"], columns=ROLLUP_KEYS + ['จำนวนเงิน'])
+        rollup['year'] = rollup['year'].astype(int)
+        monthly = pd.DataFrame(state["monthly"], columns=MONTHLY_KEYS + ['จำนวนเงิน'])
+        monthly[MONTHLY_KEYS] = monthly[MONTHLY_KEYS].astype(int)
+        return state["ledger_inode"], state["ledger_size"], rollup, monthly
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+
+
+def _write_state(rollup_path, inode, size, rollup, monthly):
+    state = {"ledger_inode": inode, "ledger_size": size, "rows": rollup.values.tolist(),
+             "monthly": monthly.values.tolist()}
+
+    def write(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, default=int)
+
+    atomic_write(rollup_path, write)
+
+
+def rebuild_rollup(ledger_path):
+    """คำนวณ rollup ใหม่ทั้งหมดจาก ledger (ใช้ตอนเริ่มต้นและตอนตรวจความถูกต้อง)"""
+    return rollup_from_frame(process_data(read_ledger(ledger_path)))
+
+
+@timed("rollup.sync")
+def _sync(ledger_path, rollup_path):
+    """ทำให้ไฟล์ rollup ทันกับ ledger คืน (rollup, monthly)"""
+    try:
+        ledger_stat = os.stat(ledger_path)
+    except FileNotFoundError:
+        return rollup_from_frame(pd.DataFrame()), monthly_from_frame(pd.DataFrame())
+
+    state = _read_state(rollup_path)
+    if state is None or state[0] != ledger_stat.st_ino or ledger_stat.st_size < state[1]:
+        df, size = read_ledger_from(ledger_path)
+        df = process_data(df)
+        rollup, monthly = rollup_from_frame(df), monthly_from_frame(df)
+        _write_state(rollup_path, ledger_stat.st_ino, size, rollup, monthly)
+        return rollup, monthly
+
+    inode, size, rollup, monthly = state
+    if ledger_stat.st_size == size:
+        return rollup, monthly
+
+    tail_df, new_size = read_ledger_from(ledger_path, size)
+    if new_size != size:
+        tail_df = process_data(tail_df)
+        rollup = _merge(rollup, rollup_from_frame(tail_df))
+        monthly = _merge(monthly, monthly_from_frame(tail_df), MONTHLY_KEYS)
+        _write_state(rollup_path, inode, new_size, rollup, monthly)
+    return rollup, monthly
+
+
+def sync_rollup(ledger_path, rollup_path):
+    """ทำให้ rollup ทันกับ ledger แล้วคืนตาราง rollup (เรียกหลังบันทึกรายการ และตอนเปิดหน้าสรุป)"""
+    return _sync(ledger_path, rollup_path)[0]
+
+
+def sync_monthly(ledger_path, rollup_path):
+    """เหมือน sync_rollup() แต่คืนยอดรายเดือน (ปี, เดือน, จำนวนเงิน) สำหรับกราฟแนวโน้ม"""
+    return _sync(ledger_path, rollup_path)[1]
+
+
+def check_rollup(ledger_path, rollup_path, tolerance=0.005):
+    """เทียบ rollup แบบ incremental กับแบบคำนวณใหม่ทั้งหมด คืนเฉพาะแถวที่ไม่ตรงกัน (ว่าง = ถูกต้อง)"""
+    incremental = sync_rollup(ledger_path, rollup_path)
+    full = rebuild_rollup(ledger_path)
+    diff = full.merge(incremental, on=ROLLUP_KEYS, how='outer', suffixes=('_full', '_incremental'))
+    diff[['จำนวนเงิน_full', 'จำนวนเงิน_incremental']] = diff[['จำนวนเงิน_full', 'จำนวนเงิน_incremental']].fillna(0.0)
+    bad = (diff['จำนวนเงิน_full'] - diff['จำนวนเงิน_incremental']).abs() > tolerance
+    return diff[bad].reset_index(drop=True)
+
+
+def summarize(rollup, year_type, year, dim=None):
+    """ยอดรวมของ (year_type, year): dim=None คืนตัวเลขยอดรวม, ไม่งั้นคืนตารางแยกตาม dim"""
+    sub = rollup[(rollup['year_type'] == year_type) & (rollup['year'] == year)]
+    if dim is None:
+        return float(sub['จำนวนเงิน'].sum())
+    sub = sub[sub[dim] != ""]
+    return sub.groupby(dim)['จำนวนเงิน'].sum().reset_index()
+
+
+def available_years(rollup, year_type):
+    return sorted(rollup.loc[rollup['year_type'] == year_type, 'year'].unique(), reverse=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ตรวจ rollup เทียบกับการคำนวณใหม่จาก ledger")
+    parser.add_argument("--ledger", default="database_claims.csv")
+    parser.add_argument("--rollup", default="budget_rollup.json")
+    args = parser.parse_args()
+
+    mismatches = check_rollup(args.ledger, args.rollup)
+    if mismatches.empty:
+        print("rollup ถูกต้อง")
+    else:
+        print(mismatches.to_string())
+        raise SystemExit(1)
@@ -0,0 +1,133 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+from dashboard_data import file_version
+from perf import timed
+
+# ==========================================
+# ตัวนับเลขที่เอกสาร "0203/NNN" แยกตามปี พ.ศ.
+# ==========================================
+# เก็บเลขล่าสุดของแต่ละปีไว้ในตาราง SQLite เล็ก ๆ การขอเลขใหม่เป็น O(1)
+# และปลอดภัยเมื่อหลาย process/thread ขอพร้อมกัน (ล็อกด้วย BEGIN IMMEDIATE)
+# ปีใหม่ยังไม่มีแถวในตาราง -> เริ่มนับ 001 ใหม่อัตโนมัติ
+# ระหว่างที่ปีนั้นยังไม่มีแถว เลขเริ่มต้นมาจากเลขสูงสุดใน ledger CSV เดิม ซึ่ง cache ไว้ตาม file_version()
+# ของ ledger (หน้าจอ rerun บ่อยจึงไม่ต้องอ่าน CSV ทั้งไฟล์ทุกครั้ง)
+
+DOC_PREFIX = "0203"
+
+
+def format_doc_no(seq):
+    return f"{DOC_PREFIX}/{seq:03d}"
+
+
+def parse_doc_seq(doc_no):
+    """แปลง "0203/012" หรือ "12" เป็น 12 (ไม่ใช่ตัวเลข เช่น "abc", "2568/" -> None)"""
+    try:
+        return int(str(doc_no).strip().split("/")[-1])
+    except ValueError:
+        return None
+
+
+_COUNTER_DDL = "CREATE TABLE IF NOT EXISTS doc_counter (year INTEGER PRIMARY KEY, last_no INTEGER NOT NULL)"
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute(_COUNTER_DDL)
+    return conn
+
+
+# ledger_path -> (file_version, {ปี: เลขสูงสุด})
+_seed_cache = {}
+_seed_lock = threading.Lock()
+
+
+def _max_doc_by_year(ledger_path):
+    """เลขที่เอกสารสูงสุดของทุกปีใน ledger CSV (อ่านทั้งไฟล์ครั้งเดียว)"""
+    try:
+        df = pd.read_csv(ledger_path, encoding='utf-8-sig', usecols=['เลขที่ออก', 'ปี'], dtype=str, on_bad_lines='skip')
+    except (FileNotFoundError, ValueError, pd.errors.EmptyDataError):
+        return {}
+    years = pd.to_numeric(df['ปี'], errors='coerce')
+    nums = pd.to_numeric(df['เลขที่ออก'].str.split('/').str[-1], errors='coerce')
+    valid = years.notna() & nums.notna()
+    return {int(y): int(n) for y, n in nums[valid].groupby(years[valid]).max().items()}
+
+
+def _seed_from_ledger(ledger_path, year):
+    """หาเลขสูงสุดของปีนั้นจากไฟล์ CSV เดิม (ใช้ตอนยังไม่มีตัวนับของปีนั้น อ่านไฟล์ใหม่เฉพาะเมื่อ ledger เปลี่ยน)"""
+    if not ledger_path:
+        return 0
+    version = file_version(ledger_path)
+    if version is None:
+        return 0
+    with _seed_lock:
+        cached = _seed_cache.get(ledger_path)
+    if cached is None or cached[0] != version:
+        cached = (version, _max_doc_by_year(ledger_path))
+        with _seed_lock:
+            _seed_cache[ledger_path] = cached
+    return cached[1].get(year, 0)
+
+
+@timed("doc_no.peek")
+def peek_next_doc_no(db_path, year, ledger_path=None):
+    """ดูเลขถัดไปของปีนี้ (ไม่จองเลข) สำหรับแสดงผลบนหน้าจอ"""
+    conn = _connect(db_path)
+    try:
+        row = conn.execute("SELECT last_no FROM doc_counter WHERE year = ?", (year,)).fetchone()
+    finally:
+        conn.close()
+    last_no = row[0] if row else _seed_from_ledger(ledger_path, year)
+    return format_doc_no(last_no + 1)
+
+
+@timed("doc_no.allocate")
+def allocate_doc_block(db_path, year, count, ledger_path=None):
+    """จองเลขที่เอกสารต่อเนื่องกัน count เลขของปีนี้ในครั้งเดียว (atomic) คืน list ของ "0203/NNN" """
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT last_no FROM doc_counter WHERE year = ?", (year,)).fetchone()
+            last_no = row[0] if row else _seed_from_ledger(ledger_path, year)
+            new_no = last_no + count
+            conn.execute(
+                "INSERT INTO doc_counter (year, last_no) VALUES (?, ?) "
+                "ON CONFLICT(year) DO UPDATE SET last_no = excluded.last_no",
+                (year, new_no)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return [format_doc_no(n) for n in range(last_no + 1, new_no + 1)]
+
+
+def allocate_doc_no(db_path, year, ledger_path=None):
+    """จองเลขที่เอกสารถัดไปของปีนี้แบบ atomic แล้วคืนเป็นสตริง "0203/NNN" """
+    return allocate_doc_block(db_path, year, 1, ledger_path)[0]
+
+
+def raise_last_doc_nos(conn, last_by_year):
+    """ตั้งเลขล่าสุดของหลายปีบน connection ที่เปิดอยู่ (ไม่ commit เอง ใช้ใน transaction ของผู้เรียก)
+    จะไม่ลดเลขที่มีอยู่แล้วลง"""
+    conn.execute(_COUNTER_DDL)
+    conn.executemany(
+        "INSERT INTO doc_counter (year, last_no) VALUES (?, ?) "
+        "ON CONFLICT(year) DO UPDATE SET last_no = MAX(last_no, excluded.last_no)",
+        [(int(year), int(last_no)) for year, last_no in last_by_year.items()]
+    )
+
+
+def set_last_doc_no(db_path, year, last_no):
+    """ตั้งเลขล่าสุดของปีนั้น (ใช้ตอนย้ายข้อมูลเก่า) จะไม่ลดเลขที่มีอยู่แล้วลง"""
+    conn = _connect(db_path)
+    try:
+        raise_last_doc_nos(conn, {year: last_no})
+    finally:
+        conn.close()
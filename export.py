@@ -0,0 +1,132 @@
+import importlib.util
+import io
+import os
+import tempfile
+
+import pandas as pd
+
+from dashboard_data import YEAR_TYPE_COLUMNS
+from ledger import CLAIM_COLUMNS, ENCODING, process_data
+from perf import timed
+
+# ==========================================
+# ส่งออกข้อมูลเฉพาะส่วนที่กรอง (อ่าน/เขียนทีละ chunk)
+# ==========================================
+# ไม่โหลด ledger ทั้งไฟล์เข้าหน่วยความจำ: อ่านทีละ chunk กรองแล้วเขียนต่อท้ายไฟล์ปลายทางทันที
+# หน่วยความจำสูงสุดจึงขึ้นกับขนาด chunk ไม่ใช่ขนาดของ ledger
+# แถวที่ส่งออกจาก ledger CSV เป็นสตริงตามที่อยู่ในไฟล์ (process_data ใช้แค่คำนวณเงื่อนไขกรองบนสำเนา)
+# CSV ที่ส่งออก "ทั้งหมด" จึงตรงกับ ledger ทุกไบต์
+# Parquet ต้องมี pyarrow และ XLSX ต้องมี openpyxl (import เมื่อใช้งานเท่านั้น)
+
+CHUNKSIZE = 20000
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+
+def filter_mask(chunk, year=None, year_type="ปีพุทธศักราช", faculty=None, category=None, seq_from=None, seq_to=None):
+    """เงื่อนไขกรอง (Series ของ bool) ตามปี คณะ หมวดงบ และช่วงเลขที่ออก จาก DataFrame ที่ผ่าน process_data แล้ว"""
+    mask = pd.Series(True, index=chunk.index)
+    if year is not None:
+        mask &= chunk[YEAR_TYPE_COLUMNS[year_type]] == int(year)
+    if faculty:
+        mask &= chunk['คณะ'].isin([faculty] if isinstance(faculty, str) else list(faculty))
+    if category:
+        mask &= chunk['รหัสหมวด'].isin([category] if isinstance(category, str) else list(category))
+    if seq_from is not None or seq_to is not None:
+        seq = pd.to_numeric(chunk['เลขที่ออก'].astype(str).str.split('/').str[-1], errors='coerce')
+        if seq_from is not None:
+            mask &= seq >= seq_from
+        if seq_to is not None:
+            mask &= seq <= seq_to
+    return mask
+
+
+def iter_ledger_chunks(ledger_path, chunksize=CHUNKSIZE, **filters):
+    """อ่าน ledger CSV ทีละ chunk คืนเฉพาะแถวที่ตรงเงื่อนไข (ค่าเป็นสตริงตามไฟล์ คอลัมน์ตาม CLAIM_COLUMNS)"""
+    if not os.path.exists(ledger_path):
+        return
+    reader = pd.read_csv(ledger_path, encoding=ENCODING, dtype=str, keep_default_na=False,
+                         on_bad_lines="skip", chunksize=chunksize)
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        chunk = chunk.reindex(columns=CLAIM_COLUMNS, fill_value="")
+        chunk = chunk[filter_mask(process_data(chunk.copy()), **filters)]
+        if not chunk.empty:
+            yield chunk
+
+
+def _write_csv(chunks, out):
+    out.write("\ufeff".encode("utf-8"))
+    out.write((",".join(CLAIM_COLUMNS) + "\n").encode("utf-8"))
+    count = 0
+    for chunk in chunks:
+        out.write(chunk[CLAIM_COLUMNS].to_csv(index=False, header=False, lineterminator="\n").encode("utf-8"))
+        count += len(chunk)
+    return count
+
+
+def _write_parquet(chunks, out):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.string()) for c in CLAIM_COLUMNS])
+    count = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk[CLAIM_COLUMNS].astype(str), schema=schema, preserve_index=False)
+            writer.write_table(table)
+            count += len(chunk)
+    return count
+
+
+def _write_xlsx(chunks, out):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("claims")
+    ws.append(CLAIM_COLUMNS)
+    count = 0
+    for chunk in chunks:
+        for row in chunk[CLAIM_COLUMNS].itertuples(index=False, name=None):
+            ws.append(list(row))
+        count += len(chunk)
+    wb.save(out)
+    return count
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+@timed("export.write")
+def write_export(chunks, out, fmt="csv"):
+    """เขียน chunk ทั้งหมดลง out (file object แบบ binary) คืนจำนวนแถว"""
+    return _WRITERS[fmt](chunks, out)
+
+
+def export_to_tempfile(chunks, fmt="csv"):
+    """เขียนไฟล์ส่งออกลงไฟล์ชั่วคราวบนดิสก์ คืน (file object ที่ seek(0) แล้ว, จำนวนแถว)
+
+    file object เป็นไฟล์แบบ unbuffered (io.RawIOBase) ที่ st.download_button รับได้โดยตรง
+    จึงไม่มีสำเนาทั้งไฟล์ใน BytesIO อีกชุดก่อนส่งให้ปุ่มดาวน์โหลด (ลบตัวเองเมื่อปิด/ถูกเก็บกวาด)
+    """
+    raw = tempfile.TemporaryFile(buffering=0)
+    buffered = io.BufferedWriter(raw)  # writer ของ Parquet/XLSX เขียนทีละน้อย -> รวมเป็นก้อนก่อนลงดิสก์
+    count = write_export(chunks, buffered, fmt)
+    buffered.flush()
+    buffered.detach()
+    raw.seek(0)
+    return raw, count
+
+
+def available_formats():
+    """รูปแบบไฟล์ที่ใช้ได้ในเครื่องนี้ (ตัดรูปแบบที่ไม่มีไลบรารีออก)"""
+    formats = ["csv"]
+    for fmt, module in (("parquet", "pyarrow"), ("xlsx", "openpyxl")):
+        if importlib.util.find_spec(module) is not None:
+            formats.append(fmt)
+    return formats
@@ -0,0 +1,205 @@
+import contextlib
+import csv
+import io
+import os
+import re
+import stat
+import tempfile
+
+import pandas as pd
+
+from perf import span, timed
+
+# ==========================================
+# ชั้นจัดเก็บข้อมูลรายการเบิก (Claims Ledger)
+# ==========================================
+# ไฟล์ CSV ถูกใช้แบบ append-only: บันทึก 1 รายการ = เขียนต่อท้าย 1 แถวแล้ว fsync
+# ไม่ต้องอ่านทั้งไฟล์แล้วเขียนทับใหม่เหมือนเดิม ส่วนการจัดระเบียบไฟล์ (compaction)
+# จะทำเฉพาะเมื่อหัวตารางไม่ตรง schema หรือพบแถวที่เขียนค้างจากการ crash
+# 1 รายการ = 1 บรรทัดเสมอ: ขึ้นบรรทัดใหม่ในข้อความ (เช่นช่องที่ขึ้นบรรทัดใน Excel ตอนนำเข้า)
+# ถูกแทนด้วยช่องว่างตอนเขียน การอ่านส่วนท้ายไฟล์ (read_ledger_from) จึงตัดที่ "\n" ได้โดยไม่ตัดกลางรายการ
+
+CLAIM_COLUMNS = [
+    "NO", "เลขที่ออก", "วัน", "เดือน", "ปี", "ผู้ลงนาม", "ถึง", "เรื่อง",
+    "คณะ", "หัวหน้าโครงการวิจัย", "ผู้ประสาน", "เงินที่อนุมัติ",
+    "จำนวนเงิน", "ชื่อโครงการ", "รหัสหมวด", "บันทึกเมื่อ",
+    "สิ่งที่ส่งมาด้วย", "จำนวนเงิน_ตัวอักษร", "สั่งจ่ายให้", "ธนาคาร", "ตำแหน่ง"
+]
+
+ENCODING = "utf-8-sig"
+_BOM = "\ufeff".encode("utf-8")
+_NEWLINES = re.compile(r"\r\n|\r|\n")
+
+
+def _header_bytes():
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(CLAIM_COLUMNS)
+    return buf.getvalue().encode("utf-8")
+
+
+def _row_values(row):
+    values = []
+    for col in CLAIM_COLUMNS:
+        val = row.get(col, "")
+        if val is None:
+            val = ""
+        elif isinstance(val, str):
+            val = _NEWLINES.sub(" ", val)
+        values.append(val)
+    return values
+
+
+def _fsync_write(path, data, mode="ab"):
+    with open(path, mode) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def atomic_write(path, write):
+    """เขียนไฟล์แบบ atomic: write(tmp_path) เขียนไฟล์ชั่วคราวในโฟลเดอร์เดียวกัน แล้ว fsync + os.replace ทับ path
+    ถ้าขั้นไหนล้ม ไฟล์ชั่วคราวถูกลบทิ้งและไฟล์เดิมไม่ถูกแตะ"""
+    # ชื่อไฟล์ชั่วคราวไม่ซ้ำกัน เพราะหลาย session/คิวเขียนอาจเขียนไฟล์เดียวกันพร้อมกัน
+    # (ไฟล์ที่ replace ทีหลังชนะ ไฟล์ rollup/Parquet เก็บ ledger_size ของตัวเองไว้ ส่วนที่ขาดจะถูกอ่านจากท้าย ledger ครั้งถัดไป)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        # mkstemp สร้างไฟล์สิทธิ์ 0600: คงสิทธิ์ของไฟล์เดิมไว้
+        with contextlib.suppress(FileNotFoundError):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def init_ledger(path):
+    """สร้างไฟล์ ledger เปล่า (มีแต่หัวตาราง) ถ้ายังไม่มี"""
+    if not os.path.exists(path):
+        _fsync_write(path, _BOM + _header_bytes(), mode="wb")
+
+
+def needs_compaction(path):
+    """ตรวจแบบ O(1): หัวตารางตรง schema และไฟล์ลงท้ายด้วยขึ้นบรรทัดใหม่หรือไม่"""
+    if not os.path.exists(path):
+        return False
+    header = _BOM + _header_bytes()
+    with open(path, "rb") as f:
+        head = f.read(len(header))
+        if head != header:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def ensure_ledger(path):
+    """สร้างไฟล์ถ้ายังไม่มี หรือจัดระเบียบ (compaction) ถ้าหัวตารางไม่ตรง schema/มีแถวเขียนค้าง"""
+    if not os.path.exists(path):
+        init_ledger(path)
+    elif needs_compaction(path):
+        compact_ledger(path)
+
+
+def append_claims(path, rows):
+    """เขียนต่อท้ายหลายแถวในครั้งเดียว แล้ว fsync หนึ่งครั้ง"""
+    if not rows:
+        return
+    ensure_ledger(path)
+
+    with span("ledger.append", rows=len(rows)):
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        for row in rows:
+            writer.writerow(_row_values(row))
+        _fsync_write(path, buf.getvalue().encode("utf-8"))
+
+
+def append_claim(path, row):
+    """บันทึกรายการเบิก 1 รายการ (1 แถว)"""
+    append_claims(path, [row])
+
+
+@timed("ledger.read")
+def read_ledger(path, **kwargs):
+    """อ่าน ledger ทั้งหมดเป็น DataFrame (คืน DataFrame เปล่าตาม schema ถ้าไม่มีไฟล์)"""
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=CLAIM_COLUMNS)
+    return pd.read_csv(path, encoding=ENCODING, on_bad_lines="skip", **kwargs)
+
+
+def read_ledger_from(path, offset=0, **kwargs):
+    """อ่านแถวของ ledger ตั้งแต่ไบต์ที่ offset (เฉพาะแถวที่เขียนจบแล้ว) คืน (df, offset ใหม่)
+    ตัดที่ "\n" ตัวสุดท้ายได้เพราะ append_claims()/compact_ledger() เขียนรายการละ 1 บรรทัดเสมอ"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    if end == 0:
+        return pd.DataFrame(columns=CLAIM_COLUMNS), offset
+    if offset == 0:
+        df = pd.read_csv(io.BytesIO(data[:end]), encoding=ENCODING, on_bad_lines="skip", **kwargs)
+    else:
+        df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=CLAIM_COLUMNS, encoding=ENCODING,
+                         on_bad_lines="skip", **kwargs)
+    return df, offset + end
+
+
+@timed("ledger.compact")
+def compact_ledger(path):
+    """เขียนไฟล์ใหม่ตาม schema ปัจจุบัน (ตัดแถวที่เสีย/เขียนค้าง) แบบ atomic ด้วย atomic_write()"""
+    if not os.path.exists(path):
+        init_ledger(path)
+        return
+
+    # ตัดแถวสุดท้ายที่เขียนไม่จบ (ไม่มี newline ปิดท้าย) ทิ้งก่อน
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw and not raw.endswith(b"\n"):
+        raw = raw[:raw.rfind(b"\n") + 1]
+
+    try:
+        df = pd.read_csv(io.BytesIO(raw), encoding=ENCODING, on_bad_lines="skip", dtype=str, keep_default_na=False)
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame(columns=CLAIM_COLUMNS)
+    df = df.reindex(columns=CLAIM_COLUMNS, fill_value="").replace(_NEWLINES, " ", regex=True)
+
+    atomic_write(path, lambda tmp_path: df.to_csv(tmp_path, index=False, encoding=ENCODING, lineterminator="\n"))
+
+
+@timed("process_data")
+def process_data(df):
+    """แปลงชนิดข้อมูล ปี/เดือน/จำนวนเงิน และเพิ่มคอลัมน์ปีงบประมาณ ปีการศึกษา ปีปฏิทิน"""
+    if df.empty: 
+        return df
+        
+    required_cols = ['ปี', 'เดือน', 'จำนวนเงิน', 'ปีงบประมาณ', 'ปีการศึกษา', 'ปีปฏิทิน']
+    for col in required_cols:
+        if col not in df.columns: 
+            if col == 'จำนวนเงิน':
+                df[col] = pd.Series(dtype='float')
+            else:
+                df[col] = pd.Series(dtype='int')
+                
+    # ข้อมูลจาก typed_ledger.py มีชนิดข้อมูลถูกต้องอยู่แล้ว (int16/int8/float) ไม่ต้องแปลงซ้ำ
+    if not pd.api.types.is_integer_dtype(df['ปี']):
+        df['ปี'] = pd.to_numeric(df['ปี'], errors='coerce').fillna(0).astype(int)
+    if not pd.api.types.is_integer_dtype(df['เดือน']):
+        df['เดือน'] = pd.to_numeric(df['เดือน'], errors='coerce').fillna(0).astype(int)
+    if not pd.api.types.is_float_dtype(df['จำนวนเงิน']):
+        df['จำนวนเงิน'] = pd.to_numeric(df['จำนวนเงิน'], errors='coerce')
+    # คอลัมน์ float ที่อ่านจาก CSV ยังมี NaN ของช่องว่างได้ -> เติม 0.0 เสมอ
+    df['จำนวนเงิน'] = df['จำนวนเงิน'].fillna(0.0)
+    
+    # คำนวณทั้งคอลัมน์ทีเดียว (เดิมใช้ df.apply ทีละแถว)
+    # ปีงบประมาณ: ตั้งแต่เดือน ส.ค. (>= 8) นับเป็นปีงบถัดไป
+    # ปีการศึกษา: ก่อนเดือน มิ.ย. (< 6) ยังเป็นปีการศึกษาก่อนหน้า
+    year_dtype = df['ปี'].dtype
+    df['ปีงบประมาณ'] = df['ปี'] + (df['เดือน'] >= 8).astype(year_dtype)
+    df['ปีการศึกษา'] = df['ปี'] - (df['เดือน'] < 6).astype(year_dtype)
+    df['ปีปฏิทิน'] = df['ปี']
+    
+    return df
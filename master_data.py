@@ -0,0 +1,24 @@
+# ==========================================
+# ข้อมูลหลัก (Master Data)
+# ==========================================
+
+BUDGET_MASTER = {
+    "541010001": "หมวดส่งเสริมการวิจัย", 
+    "521130002": "ค่าถ่ายเอกสาร",
+    "521130004": "วัสดุสิ้นเปลืองสำนักงาน", 
+    "531111005": "ค่ายานพาหนะ",
+    "521140007": "สัมมนาภายใน", 
+    "531104002": "ค่าไปรษณียากร"
+}
+
+FACULTY_MASTER = [
+    "คณะนิติศาสตร์", "คณะบริหารธุรกิจ", "วิทยาลัยสหวิทยาการ",
+    "คณะพยาบาลศาสตร์แมคคอร์มิค", "คณะเภสัชศาสตร์", "วิทยาลัยนานาชาติ",
+    "วิทยาลัยดุริยศิลป์", "วิทยาลัยพระคริสต์ธรรมแมคกิลวารี",
+    "บัณฑิตวิทยาลัย", "สำนักการศึกษาทั่วไป", "สำนักวิจัย", "สำนักบริการวิชาการ"
+]
+
+
+def category_label(code):
+    """รหัสหมวด -> ข้อความที่บันทึกลง ledger เช่น "541010001 หมวดส่งเสริมการวิจัย" """
+    return f"{code} {BUDGET_MASTER[code]}"
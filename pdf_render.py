@@ -0,0 +1,287 @@
+import io
+import os
+import shutil
+import threading
+
+from perf import timed
+from thai_baht import bahttext
+
+# pypdf / reportlab import ภายในฟังก์ชันที่ใช้จริงเท่านั้น (โหลดตอนสร้าง PDF ครั้งแรก ไม่ใช่ตอนเปิดแอป)
+
+TEMPLATE_PDF = "ใบเบิก.pdf"         
+FONT_FILE = "THSarabunNew.ttf"       
+
+THAI_MONTHS = [
+    "มกราคม", "กุมภาพันธ์", "มีนาคม", "เมษายน", "พฤษภาคม", "มิถุนายน",
+    "กรกฎาคม", "สิงหาคม", "กันยายน", "ตุลาคม", "พฤศจิกายน", "ธันวาคม"
+]
+
+# --- 🎯 ฐานข้อมูลพิกัดข้อความ (PDF CONFIG) จัดกลุ่มล็อกบรรทัด ---
+# แกน Y (ความสูง) ของข้อมูลบรรทัดเดียวกันจะเท่ากันเสมอ เพื่อไม่ให้ข้อความเด้ง
+PDF_CONFIG = {
+    # บรรทัดที่ 1 (หน่วยงาน)
+    "faculty":    (160, 765),
+    
+    # บรรทัดที่ 2 (ที่ มพย และ วันที่)
+    "doc_no":     (100, 740),
+    "date_day":   (360, 740),
+    "date_month": (410, 740),
+    "date_year":  (490, 740),
+    
+    # บรรทัดที่ 3 (เรื่อง)
+    "subject":    (100, 715),
+    
+    # บรรทัดที่ 4 (สิ่งที่ส่งมาด้วย)
+    "attach_1":   (130, 665),
+    
+    # บรรทัดที่ 5 (ขอเบิกเงิน และ จำนวนเงินตัวเลข)
+    "check_req":  (72, 625),   # กากบาท [X] หน้าขอเบิกเงิน
+    "amount":     (190, 625),  # ตัวเลขจำนวนเงิน
+    
+    # บรรทัดที่ 6 (จำนวนเงินตัวอักษร - อยู่บรรทัดถัดลงมาตรงวงเล็บ)
+    "amount_txt": (150, 600),
+    
+    # บรรทัดที่ 7 (สั่งจ่าย และ วันที่รับเงิน)
+    "pay_to":     (130, 575),
+    "req_d":      (340, 575),
+    "req_m":      (390, 575),
+    "req_y":      (470, 575),
+    
+    # บรรทัดที่ 8 (เข้าบัญชีธนาคาร)
+    "check_bank": (72, 500),   # กากบาท [X] หน้าเข้าบัญชีธนาคาร
+    "bank_detail":(230, 500),  # ชื่อธนาคารและเลขบัญชี
+    
+    # บรรทัดที่ 9 (เพื่อใช้ในกิจกรรม)
+    "project":    (210, 475),
+    
+    # บรรทัดที่ 10 (งบประมาณของหน่วยงาน)
+    "faculty_budget": (240, 450),
+    
+    # บรรทัดที่ 11 (ในงบประมาณข้อ)
+    "check_budget": (72, 425), # กากบาท [X] หน้าในงบประมาณข้อ
+    "budget_cat": (180, 425),  # หมวดงบประมาณ
+    
+    # ส่วนลงชื่อผู้เบิก (ด้านล่างขวา)
+    "leader":     (360, 310),
+    "position":   (360, 285),
+}
+
+# ==========================================
+# Cache ฟอนต์และหน้าแม่แบบ PDF (ใช้ร่วมกันทุก session/thread)
+# ==========================================
+# โหลดฟอนต์ (ไฟล์ ~470 KB) และ parse ใบเบิก.pdf ครั้งเดียวต่อ process
+# ถ้าไฟล์บนดิสก์เปลี่ยน (mtime/size ไม่ตรง) จะโหลดใหม่อัตโนมัติ
+
+_lock = threading.Lock()
+_font_cache = {}      # path -> (version, font_name)
+_template_cache = {}  # path -> (version, PdfReader)
+
+
+def _version(path):
+    st_ = os.stat(path)
+    return (st_.st_mtime_ns, st_.st_size)
+
+
+def get_font_name(font_path=FONT_FILE):
+    """ลงทะเบียนฟอนต์ไทยกับ reportlab ครั้งเดียว คืนชื่อฟอนต์ (ไม่มีไฟล์ -> Helvetica)"""
+    try:
+        version = _version(font_path)
+    except FileNotFoundError:
+        return "Helvetica"
+    cached = _font_cache.get(font_path)
+    if cached and cached[0] == version:
+        return cached[1]
+    with _lock:
+        cached = _font_cache.get(font_path)
+        if cached and cached[0] == version:
+            return cached[1]
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        pdfmetrics.registerFont(TTFont('ThaiFont', font_path))
+        _font_cache[font_path] = (version, 'ThaiFont')
+        return 'ThaiFont'
+
+
+def _get_template_reader(template_path):
+    version = _version(template_path)
+    cached = _template_cache.get(template_path)
+    if cached and cached[0] == version:
+        return cached[1]
+    from pypdf import PdfReader
+
+    # อ่านทั้งไฟล์เข้าหน่วยความจำแล้วปิดไฟล์ทันที (เดิมเปิดค้างไว้ไม่ปิด)
+    with open(template_path, "rb") as f:
+        reader = PdfReader(io.BytesIO(f.read()))
+    _template_cache[template_path] = (version, reader)
+    return reader
+
+
+def add_template_page(writer, template_path=TEMPLATE_PDF):
+    """เพิ่มสำเนาหน้าแม่แบบลงใน writer แล้วคืนหน้านั้น (หน้าใน cache จะไม่ถูกแก้ไข)"""
+    with _lock:
+        # PdfReader ไม่ thread-safe ขณะ clone หน้า จึงต้องล็อกช่วงนี้
+        return writer.add_page(_get_template_reader(template_path).pages[0])
+
+
+def clear_resource_cache():
+    """ล้าง cache (ใช้ใน benchmark เพื่อวัดแบบ cold)"""
+    with _lock:
+        _font_cache.clear()
+        _template_cache.clear()
+
+
+# ==========================================
+# เตรียมไฟล์ฟอนต์ไทยโดยไม่บล็อกหน้าเว็บ
+# ==========================================
+# ใช้ไฟล์ที่มากับโปรเจกต์ (THSarabunNew.ttf) ก่อน ถ้าไม่มีใช้สำเนาใน cache ของเครื่อง
+# ไม่มีทั้งสองที่ -> ดาวน์โหลดใน thread พื้นหลัง (ครั้งเดียวต่อ process) ระหว่างนั้น PDF ใช้ Helvetica ไปก่อน
+
+FONT_URL = "https://github.com/gungunss/ThaiFonts/raw/master/THSarabunNew.ttf"
+FONT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                              "payap-disbursement")
+
+_download_lock = threading.Lock()
+_download_thread = None
+
+
+def _cached_font_path(font_path):
+    return os.path.join(FONT_CACHE_DIR, os.path.basename(font_path))
+
+
+def _copy_atomic(src, dst):
+    tmp_path = f"{dst}.tmp"
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def _download_font(font_path, url):
+    import requests
+
+    try:
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+    except requests.RequestException:
+        return
+    cached = _cached_font_path(font_path)
+    try:
+        os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+        with open(f"{cached}.tmp", "wb") as f:
+            f.write(response.content)
+        os.replace(f"{cached}.tmp", cached)
+        _copy_atomic(cached, font_path)
+    except OSError:
+        pass
+
+
+def ensure_font(font_path=FONT_FILE, url=FONT_URL):
+    """คืน True ถ้ามีไฟล์ฟอนต์พร้อมใช้ทันที ไม่งั้นเริ่มดาวน์โหลดเบื้องหลังแล้วคืน False (ไม่รอ network)"""
+    global _download_thread
+    cached = _cached_font_path(font_path)
+    try:
+        if os.path.exists(font_path):
+            if not os.path.exists(cached):
+                # เก็บสำเนาไว้ เผื่อไฟล์ในโฟลเดอร์แอปถูกลบ (เช่น ปุ่มล้างฐานข้อมูล)
+                os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+                _copy_atomic(font_path, cached)
+            return True
+        if os.path.exists(cached):
+            _copy_atomic(cached, font_path)
+            return True
+    except OSError:
+        # โฟลเดอร์ cache เขียนไม่ได้ ไม่ใช่เหตุให้แอปเปิดไม่ได้
+        return os.path.exists(font_path)
+
+    with _download_lock:
+        if _download_thread is None or not _download_thread.is_alive():
+            _download_thread = threading.Thread(target=_download_font, args=(font_path, url),
+                                                name="font-download", daemon=True)
+            _download_thread.start()
+    return False
+
+
+# ==========================================
+# สร้างใบเบิก PDF
+# ==========================================
+
+def draw_overlay(can, data, font_name):
+    """วาดข้อมูลใบเบิก 1 รายการลงหน้าปัจจุบันของ canvas"""
+    can.setFont(font_name, 14)
+
+    def draw(key, text):
+        if key in PDF_CONFIG:
+            base_x, base_y = PDF_CONFIG[key]
+            can.drawString(base_x, base_y, str(text))
+
+    # --- วาดข้อความลง PDF ---
+    draw("faculty", data.get("คณะ", ""))
+    draw("doc_no", data.get("เลขที่ออก", ""))
+    draw("date_day", data["วัน"])
+    draw("date_month", data["เดือน_ตัวอักษร"])
+    draw("date_year", data["ปี"])
+    
+    draw("subject", data.get("เรื่อง", ""))
+    # ไม่ดึง "ถึง" หรือ "เรียน" มาวาดใน PDF แล้ว
+    
+    draw("attach_1", data.get("สิ่งที่ส่งมาด้วย", "-"))
+    
+    can.setFont("Helvetica-Bold", 14)
+    draw("check_req", "X")
+    can.setFont(font_name, 14)
+    
+    draw("amount", f"{data['จำนวนเงิน']:,.2f}")
+    # ไม่ได้กรอกตัวอักษรไว้ -> แปลงจากตัวเลขให้อัตโนมัติ
+    draw("amount_txt", f"({data.get('จำนวนเงิน_ตัวอักษร') or bahttext(data['จำนวนเงิน'])})")
+    
+    draw("pay_to", data.get("สั่งจ่ายให้", ""))
+    draw("req_d", data["วัน"])
+    draw("req_m", data["เดือน_ตัวอักษร"])
+    draw("req_y", data["ปี"])
+    
+    if data.get("ธนาคาร", "") != "":
+        can.setFont("Helvetica-Bold", 14)
+        draw("check_bank", "X")
+        can.setFont(font_name, 12)
+        draw("bank_detail", data.get("ธนาคาร", ""))
+        can.setFont(font_name, 14)
+    
+    draw("project", data.get("ชื่อโครงการ", ""))
+    draw("faculty_budget", data.get("คณะ", ""))
+    
+    can.setFont("Helvetica-Bold", 14)
+    draw("check_budget", "X")
+    can.setFont(font_name, 14)
+    draw("budget_cat", data.get("รหัสหมวด", ""))
+    
+    draw("leader", f"({data.get('หัวหน้าโครงการวิจัย', '')})")
+    draw("position", data.get("ตำแหน่ง", ""))
+
+
+@timed("pdf.create")
+def create_filled_pdf(data, template_path=TEMPLATE_PDF, font_path=FONT_FILE):
+    """วาดข้อมูลใบเบิกทับหน้าแม่แบบ คืน BytesIO ของไฟล์ PDF
+
+    ไม่พบไฟล์แม่แบบ -> FileNotFoundError
+    """
+    if not os.path.exists(template_path):
+        raise FileNotFoundError(template_path)
+    from pypdf import PdfReader, PdfWriter
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    font_name = get_font_name(font_path)
+
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet, pagesize=A4)
+    draw_overlay(can, data, font_name)
+    can.save()
+    packet.seek(0)
+
+    output = PdfWriter()
+    page = add_template_page(output, template_path)
+    page.merge_page(PdfReader(packet).pages[0])
+
+    out_stream = io.BytesIO()
+    output.write(out_stream)
+    out_stream.seek(0)
+    return out_stream
@@ -0,0 +1,167 @@
+import functools
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+# ==========================================
+# จับเวลาส่วนที่ช้าในแต่ละ rerun (เปิดด้วย PAYAP_PERF=1)
+# ==========================================
+# span รอบการอ่าน/เขียนไฟล์, process_data, การสร้าง PDF และกราฟ
+# ผลของแต่ละ rerun แสดงในแผงผู้ดูแลที่ sidebar (เปิดหน้าเว็บด้วย ?admin=1)
+# และเขียนต่อท้าย perf_log.jsonl บรรทัดละหนึ่ง rerun
+#
+# ปิดอยู่ (ค่าเริ่มต้น): @timed คืนฟังก์ชันเดิมตั้งแต่ตอน import และ span() คืน object ว่างตัวเดียวกันทุกครั้ง
+# จึงแทบไม่มีค่าใช้จ่ายเพิ่ม
+#
+#   PAYAP_PERF=1 streamlit run app.py          แล้วเปิด http://localhost:8501/?admin=1
+#   PAYAP_PERF_LOG=/var/log/payap_perf.jsonl   เปลี่ยนที่เก็บ log
+
+ENABLED = os.environ.get("PAYAP_PERF", "") not in ("", "0")
+LOG_FILE = os.environ.get("PAYAP_PERF_LOG", "perf_log.jsonl")
+
+# Streamlit รันสคริปต์ของแต่ละ session ใน thread ของตัวเอง -> เก็บ span ของ rerun ปัจจุบันแยกตาม thread
+_local = threading.local()
+
+
+def _row_count(result):
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "rows", "start")
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        records = getattr(_local, "records", None)
+        if records is not None:
+            records.append({
+                "name": self.name,
+                "ms": round((time.perf_counter() - self.start) * 1000, 3),
+                "rows": self.rows,
+                "error": exc_type.__name__ if exc_type else None,
+            })
+        return False
+
+    def set_rows(self, rows):
+        self.rows = rows
+
+
+def span(name, rows=None):
+    """with span("ledger.append", rows=n): ... จับเวลาโค้ดในบล็อก (ปิดอยู่ = ไม่ทำอะไร)"""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, rows)
+
+
+def timed(name):
+    """decorator จับเวลาทั้งฟังก์ชัน นับแถวจากผลลัพธ์ถ้าเป็น DataFrame หรือ int
+    (ปิดอยู่ = คืนฟังก์ชันเดิมโดยไม่ห่อ)"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name, None) as s:
+                result = func(*args, **kwargs)
+                s.rows = _row_count(result)
+            return result
+        return wrapper
+    return decorator
+
+
+class _Bind:
+    __slots__ = ("records", "prev")
+
+    def __init__(self, records):
+        self.records = records
+
+    def __enter__(self):
+        self.prev = getattr(_local, "records", None)
+        _local.records = self.records
+        return self
+
+    def __exit__(self, *exc):
+        _local.records = self.prev
+        return False
+
+
+def current_records():
+    """span list ของ rerun ใน thread นี้ (None = ไม่ได้เก็บ) สำหรับส่งต่อไปกับงานที่ให้ thread อื่นทำ"""
+    return getattr(_local, "records", None)
+
+
+def bind_records(records):
+    """with bind_records(records): ... span ที่เกิดใน thread นี้ระหว่างบล็อกไปต่อท้าย records
+    (ใช้ใน thread เขียนของ write_queue ให้ span ไปอยู่ใน rerun ของ session ที่ส่งงานมา)"""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Bind(records)
+
+
+def start_rerun():
+    """เริ่มเก็บ span ของ rerun นี้ (เรียกที่ต้นสคริปต์)"""
+    if not ENABLED:
+        return
+    _local.records = []
+    _local.start = time.perf_counter()
+
+
+def finish_rerun(page, log_path=None):
+    """จบ rerun: คืน dict สรุป (ปิดอยู่/ยังไม่ start = None) และเขียนต่อท้าย log แบบ JSON Lines"""
+    records = getattr(_local, "records", None)
+    if not ENABLED or records is None:
+        return None
+    report = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        "page": page,
+        "total_ms": round((time.perf_counter() - _local.start) * 1000, 3),
+        "spans": records,
+    }
+    _local.records = None
+    with open(log_path or LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    return report
+
+
+def summarize_spans(spans):
+    """รวม span ชื่อเดียวกัน: [{"name", "calls", "ms", "rows"}] เรียงจากใช้เวลามากไปน้อย"""
+    totals = {}
+    for s in spans:
+        t = totals.setdefault(s["name"], {"name": s["name"], "calls": 0, "ms": 0.0, "rows": None})
+        t["calls"] += 1
+        t["ms"] = round(t["ms"] + s["ms"], 3)
+        if s["rows"] is not None:
+            t["rows"] = (t["rows"] or 0) + s["rows"]
+    return sorted(totals.values(), key=lambda t: t["ms"], reverse=True)
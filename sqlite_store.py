@@ -0,0 +1,318 @@
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+from budget_targets import read_targets
+from doc_numbers import raise_last_doc_nos
+from ledger import CLAIM_COLUMNS, process_data, read_ledger
+from perf import span, timed
+
+# ==========================================
+# ที่เก็บข้อมูลแบบ SQLite (ทางเลือกแทนไฟล์ CSV)
+# ==========================================
+# ตาราง claims ใช้คอลัมน์เดียวกับ database_claims.csv (ชื่อคอลัมน์ภาษาไทย)
+# มี index ที่ ปี, เดือน, คณะ, รหัสหมวด และ expression index ของปีงบประมาณ/ปีการศึกษา
+# ตัวกรองของหน้าสรุปจึงกลายเป็น query ที่ใช้ index แทนการ scan ทั้งไฟล์
+#
+#   python sqlite_store.py migrate --db payap_budget.db --ledger database_claims.csv --targets budget_targets.csv
+
+SQLITE_DB = "payap_budget.db"
+
+_INTEGER_COLS = {"วัน", "เดือน", "ปี"}
+_REAL_COLS = {"จำนวนเงิน", "เงินที่อนุมัติ"}
+
+# ต้องเขียน expression ให้ตรงกับตอนสร้าง index ทุกตัวอักษร SQLite จึงจะใช้ index ได้
+YEAR_EXPRESSIONS = {
+    "ปีงบประมาณ": '("ปี" + ("เดือน" >= 8))',
+    "ปีพุทธศักราช": '"ปี"',
+    "ปีการศึกษา": '("ปี" - ("เดือน" < 6))',
+}
+
+
+def _q(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_def(col):
+    if col in _INTEGER_COLS:
+        return f"{_q(col)} INTEGER"
+    if col in _REAL_COLS:
+        return f"{_q(col)} REAL"
+    return f"{_q(col)} TEXT"
+
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS claims (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(_column_def(c) for c in CLAIM_COLUMNS) + ")",
+    'CREATE INDEX IF NOT EXISTS idx_claims_year ON claims ("ปี")',
+    'CREATE INDEX IF NOT EXISTS idx_claims_month ON claims ("เดือน")',
+    'CREATE INDEX IF NOT EXISTS idx_claims_faculty ON claims ("คณะ")',
+    'CREATE INDEX IF NOT EXISTS idx_claims_category ON claims ("รหัสหมวด")',
+    f'CREATE INDEX IF NOT EXISTS idx_claims_fiscal_year ON claims ({YEAR_EXPRESSIONS["ปีงบประมาณ"]})',
+    f'CREATE INDEX IF NOT EXISTS idx_claims_academic_year ON claims ({YEAR_EXPRESSIONS["ปีการศึกษา"]})',
+    # faculty/category = "" หมายถึงวงเงินรวมทั้งปี (เหมือน budget_targets.csv)
+    "CREATE TABLE IF NOT EXISTS budget_targets (year_type TEXT NOT NULL, year INTEGER NOT NULL, "
+    "faculty TEXT NOT NULL DEFAULT '', category TEXT NOT NULL DEFAULT '', amount REAL NOT NULL, "
+    "PRIMARY KEY (year_type, year, faculty, category))",
+]
+
+SCHEMA_VERSION = 1
+
+
+def connect(db_path=SQLITE_DB):
+    conn = sqlite3.connect(db_path, timeout=30)
+    # สร้างตาราง/index เฉพาะฐานข้อมูลที่ยังไม่ถึง SCHEMA_VERSION (ไฟล์ใหม่)
+    # ฐานข้อมูลที่พร้อมแล้วเสียแค่ PRAGMA เดียวต่อการเชื่อมต่อ (เปลี่ยน schema เมื่อไรให้เพิ่ม SCHEMA_VERSION)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        for ddl in _SCHEMA:
+            conn.execute(ddl)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def init_db(db_path=SQLITE_DB):
+    connect(db_path).close()
+
+
+def _coerce(col, val):
+    if val is None or (isinstance(val, float) and pd.isna(val)) or val == "":
+        return 0 if col in _INTEGER_COLS else (0.0 if col in _REAL_COLS else "")
+    if col in _INTEGER_COLS:
+        try:
+            return int(float(val))
+        except ValueError:
+            return 0
+    if col in _REAL_COLS:
+        try:
+            return float(val)
+        except ValueError:
+            return 0.0
+    return str(val)
+
+
+_INSERT_SQL = (
+    f"INSERT INTO claims ({', '.join(_q(c) for c in CLAIM_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in CLAIM_COLUMNS)})"
+)
+
+
+def _insert_rows(conn, rows):
+    values = [tuple(_coerce(c, row.get(c)) for c in CLAIM_COLUMNS) for row in rows]
+    with span("sqlite.insert", rows=len(values)):
+        conn.executemany(_INSERT_SQL, values)
+
+
+def insert_claims(db_path, rows):
+    """บันทึกหลายรายการใน transaction เดียว"""
+    if not rows:
+        return
+    conn = connect(db_path)
+    try:
+        with conn:
+            _insert_rows(conn, rows)
+    finally:
+        conn.close()
+
+
+@timed("sqlite.read")
+def read_claims(db_path=SQLITE_DB, columns=None):
+    """รายการเบิกทั้งหมดเป็น DataFrame ตามลำดับที่บันทึก (คอลัมน์เดียวกับ CSV หรือเฉพาะ columns)"""
+    conn = connect(db_path)
+    try:
+        cols = ", ".join(_q(c) for c in (columns or CLAIM_COLUMNS))
+        return pd.read_sql_query(f"SELECT {cols} FROM claims ORDER BY id", conn)
+    finally:
+        conn.close()
+
+
+@timed("sqlite.summarize")
+def summarize(db_path, year_type, year, dim=None):
+    """เหมือน dashboard_data.summarize() แต่คำนวณด้วย query ที่ใช้ index"""
+    expr = YEAR_EXPRESSIONS[year_type]
+    conn = connect(db_path)
+    try:
+        if dim is None:
+            row = conn.execute(f'SELECT COALESCE(SUM("จำนวนเงิน"), 0) FROM claims WHERE {expr} = ?', (int(year),)).fetchone()
+            return float(row[0])
+        return pd.read_sql_query(
+            f'SELECT {_q(dim)}, SUM("จำนวนเงิน") AS "จำนวนเงิน" FROM claims '
+            f'WHERE {expr} = ? AND {_q(dim)} != \'\' GROUP BY {_q(dim)} ORDER BY {_q(dim)}',
+            conn, params=(int(year),)
+        )
+    finally:
+        conn.close()
+
+
+def available_years(db_path, year_type):
+    expr = YEAR_EXPRESSIONS[year_type]
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(f"SELECT DISTINCT {expr} FROM claims ORDER BY 1 DESC").fetchall()
+    finally:
+        conn.close()
+    return [r[0] for r in rows]
+
+
+@timed("sqlite.monthly")
+def monthly_spend(db_path):
+    """เหมือน dashboard_data.sync_monthly()"""
+    conn = connect(db_path)
+    try:
+        return pd.read_sql_query(
+            'SELECT "ปี", "เดือน", SUM("จำนวนเงิน") AS "จำนวนเงิน" FROM claims '
+            'WHERE "ปี" > 0 AND "เดือน" BETWEEN 1 AND 12 GROUP BY "ปี", "เดือน" ORDER BY "ปี", "เดือน"',
+            conn
+        )
+    finally:
+        conn.close()
+
+
+def iter_claim_chunks(db_path, chunksize=5000, year=None, year_type="ปีพุทธศักราช", faculty=None,
+                      category=None, seq_from=None, seq_to=None):
+    """เหมือน export.iter_ledger_chunks() แต่กรองด้วย SQL แล้วดึงทีละ chunk เป็น DataFrame"""
+    where, params = [], []
+    if year is not None:
+        where.append(f"{YEAR_EXPRESSIONS[year_type]} = ?")
+        params.append(int(year))
+    for col, values in (("คณะ", faculty), ("รหัสหมวด", category)):
+        if values:
+            values = [values] if isinstance(values, str) else list(values)
+            where.append(f'{_q(col)} IN ({", ".join("?" for _ in values)})')
+            params.extend(values)
+    seq_expr = "CAST(SUBSTR(\"เลขที่ออก\", INSTR(\"เลขที่ออก\", '/') + 1) AS INTEGER)"
+    if seq_from is not None:
+        where.append(f"{seq_expr} >= ?")
+        params.append(int(seq_from))
+    if seq_to is not None:
+        where.append(f"{seq_expr} <= ?")
+        params.append(int(seq_to))
+
+    cols = ", ".join(_q(c) for c in CLAIM_COLUMNS)
+    sql = f"SELECT {cols} FROM claims"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id"
+
+    conn = connect(db_path)
+    try:
+        for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunksize):
+            yield chunk
+    finally:
+        conn.close()
+
+
+def select_claims(db_path, seq_from=None, seq_to=None, year=None, year_type="ปีพุทธศักราช",
+                  faculty=None, chunksize=5000):
+    """เหมือน batch_pdf.select_claims() แต่กรองด้วย SQL"""
+    chunks = iter_claim_chunks(db_path, chunksize, year=year, year_type=year_type, faculty=faculty,
+                               seq_from=seq_from, seq_to=seq_to)
+    for chunk in chunks:
+        for row in chunk.to_dict("records"):
+            yield row
+
+
+def get_target(db_path, year_type, year, faculty="", category=""):
+    conn = connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT amount FROM budget_targets WHERE year_type = ? AND year = ? AND faculty = ? AND category = ?",
+            (year_type, int(year), faculty, category)
+        ).fetchone()
+    finally:
+        conn.close()
+    return float(row[0]) if row else 0.0
+
+
+def get_targets_for_year(db_path, year_type, year):
+    """วงเงินทุกระดับของปีนั้น {(คณะ, รหัสหมวด): amount} เหมือน TargetStore.for_year()"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT faculty, category, amount FROM budget_targets WHERE year_type = ? AND year = ?",
+                            (year_type, int(year))).fetchall()
+    finally:
+        conn.close()
+    return {(fac, cat): float(amount) for fac, cat, amount in rows}
+
+
+def get_all_targets(db_path):
+    """วงเงินทั้งหมด {(year_type, year): {(คณะ, รหัสหมวด): amount}} เหมือน TargetStore.all()"""
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT year_type, year, faculty, category, amount FROM budget_targets").fetchall()
+    finally:
+        conn.close()
+    targets = {}
+    for year_type, year, fac, cat, amount in rows:
+        targets.setdefault((year_type, int(year)), {})[(fac, cat)] = float(amount)
+    return targets
+
+
+_UPSERT_TARGET_SQL = (
+    "INSERT INTO budget_targets (year_type, year, faculty, category, amount) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(year_type, year, faculty, category) DO UPDATE SET amount = excluded.amount"
+)
+
+
+def save_target(db_path, year_type, year, amount, faculty="", category=""):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute(_UPSERT_TARGET_SQL, (year_type, int(year), faculty, category, float(amount)))
+    finally:
+        conn.close()
+
+
+def migrate_from_csv(db_path, ledger_path, targets_path=None):
+    """ย้ายข้อมูลจากไฟล์ CSV เดิมเข้า SQLite ครั้งเดียว (ตัวนับเลขที่เอกสารถูกตั้งต่อจากเลขสูงสุดของแต่ละปี)
+
+    ถ้าตาราง claims มีข้อมูลอยู่แล้วจะ raise ValueError เพื่อกันข้อมูลซ้ำ
+    ทั้งหมดทำใน transaction เดียว (BEGIN IMMEDIATE): ถ้าล้มเหลวกลางทางฐานข้อมูลจะว่างเหมือนเดิม ลองใหม่ได้
+    คืน (จำนวนรายการเบิก, จำนวนวงเงิน)
+    """
+    # อ่านและแปลงข้อมูลทั้งหมดให้เสร็จก่อนเปิด transaction
+    claims = read_ledger(ledger_path, dtype=str, keep_default_na=False) if os.path.exists(ledger_path) else pd.DataFrame()
+    claims = claims.reindex(columns=CLAIM_COLUMNS, fill_value="")
+    last_by_year = {}
+    if not claims.empty:
+        processed = process_data(claims.copy())
+        seq = pd.to_numeric(processed['เลขที่ออก'].str.split('/').str[-1], errors='coerce')
+        last_by_year = seq.groupby(processed['ปี']).max().dropna().to_dict()
+    targets = [(year_type, int(year), faculty, category, float(amount))
+               for (year_type, year), scoped in (read_targets(targets_path) if targets_path else {}).items()
+               for (faculty, category), amount in scoped.items()]
+
+    conn = connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM claims").fetchone()[0]:
+                raise ValueError(f"{db_path} มีข้อมูลอยู่แล้ว")
+            _insert_rows(conn, claims.to_dict("records"))
+            raise_last_doc_nos(conn, last_by_year)
+            conn.executemany(_UPSERT_TARGET_SQL, targets)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+    return len(claims), len(targets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="จัดการฐานข้อมูล SQLite ของระบบเบิกจ่าย")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="ย้ายข้อมูลจาก CSV เข้า SQLite")
+    migrate.add_argument("--db", default=SQLITE_DB)
+    migrate.add_argument("--ledger", default="database_claims.csv")
+    migrate.add_argument("--targets", default="budget_targets.csv")
+    args = parser.parse_args(argv)
+
+    n_claims, n_targets = migrate_from_csv(args.db, args.ledger, args.targets)
+    print(f"ย้ายข้อมูล {n_claims} รายการเบิก และ {n_targets} วงเงิน -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
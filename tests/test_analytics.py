@@ -0,0 +1,107 @@
+"""analytics: ค่าที่คำนวณด้วยมือของเดือนในปีงบประมาณ/ปีการศึกษา, เทียบปีก่อนช่วงเดียวกัน, อัตราการเบิกจ่ายและวันที่คาดว่าเกินวงเงิน"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from analytics import build_analytics, current_period, select_year
+from ledger import process_data
+
+FISCAL = "ปีงบประมาณ"
+ACADEMIC = "ปีการศึกษา"
+
+
+def _claims(rows):
+    """rows: (ปี พ.ศ., เดือน, คณะ, รหัสหมวด, จำนวนเงิน)"""
+    return process_data(pd.DataFrame(rows, columns=["ปี", "เดือน", "คณะ", "รหัสหมวด", "จำนวนเงิน"]))
+
+
+def _row(df, **match):
+    mask = pd.Series(True, index=df.index)
+    for col, value in match.items():
+        mask &= df[col] == value
+    assert mask.sum() == 1, df[mask]
+    return df[mask].iloc[0]
+
+
+def test_july_is_last_fiscal_period_and_outside_same_period_comparison():
+    claims = _claims([
+        (2568, 8, "ก", "01", 100.0),   # ปีงบ 2569 เดือนที่ 1
+        (2569, 7, "ก", "01", 50.0),    # ปีงบ 2569 เดือนที่ 12
+        (2569, 8, "ก", "01", 30.0),    # ปีงบ 2570 เดือนที่ 1
+    ])
+    # 15 ส.ค. 2569 = เดือนที่ 1 ของปีงบ 2570
+    today = date(2026, 8, 15)
+    assert current_period(FISCAL, today) == (2570, 1)
+    result = build_analytics(claims, {}, today)
+
+    july = _row(result["cumulative"], year_type=FISCAL, year=2569, period=12)
+    assert (july["ปี"], july["เดือน"], july["จำนวนเงิน"], july["สะสม"]) == (2569, 7, 50.0, 150.0)
+
+    yoy = _row(result["yoy"]["คณะ"], year_type=FISCAL, year=2570, คณะ="ก")
+    assert yoy["จำนวนเงิน"] == 30.0
+    assert yoy["ปีก่อน"] == 150.0
+    # ช่วงเดียวกันของปีก่อน = ส.ค. 2568 เท่านั้น ไม่รวม ก.ค. 2569
+    assert yoy["ปีก่อน_ช่วงเดียวกัน"] == 100.0
+    assert yoy["เปลี่ยนแปลง"] == -70.0
+    assert yoy["เปลี่ยนแปลง_%"] == pytest.approx(-70.0)
+
+
+def test_academic_year_rolls_over_in_june():
+    claims = _claims([
+        (2569, 5, "ก", "01", 10.0),    # ปีการศึกษา 2568 เดือนที่ 12
+        (2569, 6, "ก", "01", 20.0),    # ปีการศึกษา 2569 เดือนที่ 1
+    ])
+    assert current_period(ACADEMIC, date(2026, 5, 31)) == (2568, 12)
+    assert current_period(ACADEMIC, date(2026, 6, 1)) == (2569, 1)
+
+    result = build_analytics(claims, {}, date(2026, 6, 1))
+    cumulative = result["cumulative"]
+    may = _row(cumulative, year_type=ACADEMIC, year=2568, period=12)
+    assert (may["ปี"], may["เดือน"], may["จำนวนเงิน"], may["สะสม"]) == (2569, 5, 10.0, 10.0)
+    june = _row(cumulative, year_type=ACADEMIC, year=2569, period=1)
+    assert (june["ปี"], june["เดือน"], june["จำนวนเงิน"], june["สะสม"]) == (2569, 6, 20.0, 20.0)
+
+    # ปีที่ยังไม่จบแสดงเฉพาะเดือนที่ผ่านมาแล้ว, previous = ปีการศึกษา 2568 ทั้งปี
+    picked = select_year(result, ACADEMIC, 2569)
+    assert picked["cumulative"]["period"].tolist() == [1]
+    assert picked["previous"]["สะสม"].iloc[-1] == 10.0
+
+
+def test_year_without_target_has_no_burn_row():
+    claims = _claims([(2568, 10, "ก", "01", 100.0), (2569, 9, "ก", "01", 40.0)])
+    today = date(2026, 9, 15)
+
+    assert build_analytics(claims, {}, today)["burn"].empty
+
+    result = build_analytics(claims, {(FISCAL, 2570): {("", ""): 1000.0}}, today)
+    assert result["burn"][["year_type", "year"]].drop_duplicates().values.tolist() == [[FISCAL, 2570]]
+    assert select_year(result, FISCAL, 2569)["burn"].empty
+    assert _row(result["burn"], year=2570)["ใช้ไป"] == 40.0
+
+
+def test_mid_year_projection_and_overrun_date():
+    # ปีงบ 2570 = 1 ส.ค. 2569 - 31 ก.ค. 2570 (365 วัน) วันนี้ 31 ส.ค. 2569 = ผ่านไป 31 วัน
+    # ใช้ไป 3,100 บาท = เฉลี่ยวันละ 100 บาท
+    claims = _claims([(2569, 8, "ก", "01", 3000.0), (2569, 8, "ข", "02", 100.0)])
+    targets = {(FISCAL, 2570): {("", ""): 10000.0, ("ก", ""): 1000.0, ("", "02"): 100000.0}}
+    burn = build_analytics(claims, targets, date(2026, 8, 31))["burn"]
+
+    total = _row(burn, คณะ="", รหัสหมวด="")
+    assert total["ใช้ไป"] == 3100.0
+    assert total["ใช้ไป_%"] == pytest.approx(31.0)
+    assert total["เวลาผ่านไป_%"] == pytest.approx(31 / 365 * 100)
+    assert total["คาดการณ์ทั้งปี"] == pytest.approx(36500.0)
+    assert total["เฉลี่ยต่อเดือน"] == pytest.approx(36500.0 / 12)
+    # เหลือ 6,900 บาท / วันละ 100 = อีก 69 วัน
+    assert total["วันที่คาดว่าเกินวงเงิน"] == pd.Timestamp("2026-11-08")
+    assert total["สถานะ"] == "คาดว่าจะเกินวงเงิน"
+
+    faculty = _row(burn, คณะ="ก", รหัสหมวด="")
+    assert faculty["สถานะ"] == "เกินวงเงินแล้ว"
+    assert pd.isna(faculty["วันที่คาดว่าเกินวงเงิน"])
+
+    category = _row(burn, คณะ="", รหัสหมวด="02")
+    assert category["ใช้ไป"] == 100.0
+    assert category["สถานะ"] == "อยู่ในวงเงิน"
+    assert pd.isna(category["วันที่คาดว่าเกินวงเงิน"])
@@ -0,0 +1,133 @@
+"""budget_targets: ข้ามแถวที่เสีย, เขียนไฟล์แบบ atomic, TargetStore เห็นไฟล์ที่ถูกแก้จากภายนอก, วงเงินรายคณะ/รายหมวด"""
+import os
+
+import pandas as pd
+import pytest
+
+from budget_targets import TargetStore, attach_targets, read_targets, write_targets
+from ledger import ENCODING
+
+TARGETS = {
+    ("ปีงบประมาณ", 2569): {("", ""): 1000.0, ("ก", ""): 600.0, ("", "01"): 250.5},
+    ("ปีการศึกษา", 2568): {("", ""): 500.0},
+}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "budget_targets.csv")
+
+
+def _bump_mtime(path):
+    # บาง filesystem มี mtime ละเอียดแค่ระดับวินาที: ขยับให้ต่างแน่ ๆ
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_write_then_read_round_trip(path):
+    write_targets(path, TARGETS)
+    assert read_targets(path) == TARGETS
+
+
+def test_missing_or_empty_file_is_no_targets(path):
+    assert read_targets(path) == {}
+    open(path, "w").close()
+    assert read_targets(path) == {}
+
+
+def test_legacy_three_column_file_is_yearly_total(path):
+    with open(path, "w", encoding=ENCODING) as f:
+        f.write("year_type,year,amount\nปีงบประมาณ,2569,1500\n")
+    assert read_targets(path) == {("ปีงบประมาณ", 2569): {("", ""): 1500.0}}
+
+
+def test_invalid_rows_are_skipped_and_logged(path, caplog):
+    with open(path, "w", encoding=ENCODING) as f:
+        f.write(
+            "year_type,year,amount,faculty,category\n"
+            "ปีงบประมาณ,2569,1000,,\n"
+            "ปีงบประมาณ,2569,,ก,\n"          # วงเงินว่าง
+            "ปีงบประมาณ,สองห้า,10,,\n"       # ปีไม่ใช่ตัวเลข
+            "ปีงบประมาณ,2569.5,10,,\n"       # ปีไม่ใช่จำนวนเต็ม
+            ",2569,10,,\n"                    # ไม่มีประเภทปี
+            "ปีการศึกษา, 2568 , 20.5 ,,01\n"
+        )
+    with caplog.at_level("WARNING", logger="budget_targets"):
+        targets = read_targets(path)
+    assert targets == {
+        ("ปีงบประมาณ", 2569): {("", ""): 1000.0},
+        ("ปีการศึกษา", 2568): {("", "01"): 20.5},
+    }
+    assert "3, 4, 5, 6" in caplog.text
+
+
+def test_failed_write_keeps_previous_file(path, monkeypatch):
+    write_targets(path, TARGETS)
+    with open(path, "rb") as f:
+        before = f.read()
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        write_targets(path, {("ปีงบประมาณ", 2570): {("", ""): 1.0}})
+    with open(path, "rb") as f:
+        assert f.read() == before
+    # ไฟล์ชั่วคราวถูกลบทิ้ง
+    assert os.listdir(os.path.dirname(path)) == ["budget_targets.csv"]
+
+
+def test_scoped_lookup(path):
+    write_targets(path, TARGETS)
+    store = TargetStore(path)
+    assert store.get("ปีงบประมาณ", 2569) == 1000.0
+    assert store.get("ปีงบประมาณ", "2569", faculty="ก") == 600.0
+    assert store.get("ปีงบประมาณ", 2569, category="01") == 250.5
+    assert store.get("ปีงบประมาณ", 2569, faculty="ข") == 0.0
+    assert store.get("ปีงบประมาณ", 2570) == 0.0
+    assert store.for_year("ปีการศึกษา", 2568) == {("", ""): 500.0}
+    assert store.all() == TARGETS
+
+
+def test_set_and_delete_write_through(path):
+    store = TargetStore(path)
+    store.set("ปีงบประมาณ", 2569, 100, faculty="ก")
+    store.set("ปีงบประมาณ", 2569, 40, category="02")
+    assert read_targets(path) == {("ปีงบประมาณ", 2569): {("ก", ""): 100.0, ("", "02"): 40.0}}
+
+    store.set("ปีงบประมาณ", 2569, None, faculty="ก")
+    store.set("ปีงบประมาณ", 2569, None, category="02")
+    assert store.all() == {}
+    assert read_targets(path) == {}
+
+
+def test_store_refreshes_after_external_write(path):
+    write_targets(path, TARGETS)
+    store = TargetStore(path)
+    assert store.get("ปีงบประมาณ", 2569) == 1000.0
+
+    # process อื่น (หรือคนแก้ไฟล์ด้วยมือ) เขียนไฟล์ทับ
+    write_targets(path, {("ปีงบประมาณ", 2569): {("", ""): 2000.0}})
+    _bump_mtime(path)
+    assert store.get("ปีงบประมาณ", 2569) == 2000.0
+    assert store.get("ปีงบประมาณ", 2569, faculty="ก") == 0.0
+
+    os.remove(path)
+    assert store.all() == {}
+
+
+def test_attach_targets_by_faculty_and_category():
+    scoped = TARGETS[("ปีงบประมาณ", 2569)]
+    by_faculty = pd.DataFrame({"คณะ": ["ก", "ข"], "จำนวนเงิน": [100.0, 50.0]})
+    merged = attach_targets(by_faculty, "คณะ", scoped).set_index("คณะ")
+    assert merged.loc["ก", "คงเหลือ"] == 500.0
+    assert pd.isna(merged.loc["ข", "วงเงิน"])
+
+    # หมวดที่ตั้งวงเงินแต่ยังไม่มีการเบิก ก็ต้องแสดงด้วย
+    by_category = pd.DataFrame({"รหัสหมวด": ["02"], "จำนวนเงิน": [10.0]})
+    merged = attach_targets(by_category, "รหัสหมวด", scoped).set_index("รหัสหมวด")
+    assert merged.loc["01", "จำนวนเงิน"] == 0.0
+    assert merged.loc["01", "คงเหลือ"] == 250.5
+
+    assert attach_targets(by_faculty, "คณะ", {("", ""): 1.0}) is by_faculty
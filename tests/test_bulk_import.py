@@ -0,0 +1,85 @@
+"""bulk_import: ตรวจแถวที่ผิด, จองเลขที่เอกสารเป็นก้อนแยกตามปี และบันทึกแบบทั้งหมดหรือไม่บันทึกเลย"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from bulk_import import import_claims, prepare_rows, validate
+from doc_numbers import peek_next_doc_no
+from ledger import append_claims, read_ledger
+
+VALID = {"เรื่อง": "ค่าถ่ายเอกสาร", "ชื่อโครงการ": "โครงการ", "คณะ": "คณะนิติศาสตร์",
+         "จำนวนเงิน": "1,250.50", "รหัสหมวด": "521130002", "วัน": "5", "เดือน": "3", "ปี": "2569"}
+
+
+def _frame(*overrides):
+    return pd.DataFrame([dict(VALID, **o) for o in overrides])
+
+
+@pytest.mark.parametrize("override, message", [
+    ({"วัน": "abc"}, "วันไม่ใช่ตัวเลข"),
+    ({"วัน": ""}, "วันไม่ใช่ตัวเลข"),
+    ({"ปี": "2569x"}, "ปีไม่ใช่ตัวเลข"),
+    ({"ปี": "2026"}, "ปีต้องเป็น พ.ศ."),
+    ({"ปี": "0"}, "ปีต้องเป็น พ.ศ."),
+    ({"เดือน": "13"}, "เดือนไม่ถูกต้อง"),
+    ({"วัน": "31", "เดือน": "2"}, "วันไม่ถูกต้อง"),
+    ({"วัน": "29", "เดือน": "2", "ปี": "2569"}, "วันไม่ถูกต้อง"),  # ค.ศ. 2026 ไม่ใช่ปีอธิกสุรทิน
+    ({"จำนวนเงิน": "0"}, "จำนวนเงินไม่ถูกต้อง"),
+    ({"คณะ": "คณะที่ไม่มี"}, "คณะไม่อยู่ในรายชื่อ"),
+    ({"รหัสหมวด": "999"}, "รหัสหมวดไม่ถูกต้อง"),
+    ({"เรื่อง": " "}, "ไม่มีเรื่อง"),
+])
+def test_bad_rows_are_flagged(override, message):
+    _, errors = validate(_frame({}, override))
+    assert errors.iloc[0] == ""
+    assert message in errors.iloc[1]
+
+
+def test_valid_row_is_normalised():
+    cleaned, errors = validate(_frame({"วัน": "29", "เดือน": "2", "ปี": "2567", "รหัสหมวด": "521130002 อะไรก็ได้"}))
+    assert errors.tolist() == [""]
+    row = cleaned.iloc[0]
+    assert (row["วัน"], row["เดือน"], row["ปี"], row["จำนวนเงิน"]) == (29, 2, 2567, 1250.5)
+    assert row["รหัสหมวด"] == "521130002 ค่าถ่ายเอกสาร"
+
+
+def test_missing_date_columns_default_to_today():
+    cleaned, errors = validate(_frame({}).drop(columns=["วัน", "เดือน", "ปี"]))
+    now = datetime.now()
+    assert errors.tolist() == [""]
+    assert cleaned.iloc[0][["วัน", "เดือน", "ปี"]].tolist() == [now.day, now.month, now.year + 543]
+
+
+def test_missing_required_column():
+    with pytest.raises(ValueError):
+        validate(_frame({}).drop(columns=["คณะ"]))
+
+
+def test_mixed_year_block_allocation(tmp_path):
+    counter_db = str(tmp_path / "doc_counter.db")
+    ledger_path = str(tmp_path / "database_claims.csv")
+    append_claims(ledger_path, [{"เลขที่ออก": "0203/007", "ปี": 2569}])
+    cleaned, _ = validate(_frame({"ปี": "2569"}, {"ปี": "2570"}, {"ปี": "2569"}, {"ปี": "2570"}))
+    rows = prepare_rows(cleaned, counter_db, ledger_path)
+    # ปี 2569 ต่อจากเลขสูงสุดใน ledger, ปี 2570 เริ่ม 001 และลำดับแถวไม่เปลี่ยน
+    assert rows["เลขที่ออก"].tolist() == ["0203/008", "0203/001", "0203/009", "0203/002"]
+    assert rows["จำนวนเงิน_ตัวอักษร"].iloc[0] == "หนึ่งพันสองร้อยห้าสิบบาทห้าสิบสตางค์"
+    assert peek_next_doc_no(counter_db, 2569) == "0203/010"
+
+
+def test_all_or_nothing(tmp_path):
+    counter_db = str(tmp_path / "doc_counter.db")
+    ledger_path = str(tmp_path / "database_claims.csv")
+    df = _frame({}, {"วัน": "31", "เดือน": "2"}, {"ปี": "2570"})
+
+    imported, invalid = import_claims(df, counter_db, ledger_path)
+    assert imported.empty and invalid.index.tolist() == [1]
+    assert read_ledger(ledger_path).empty
+    assert peek_next_doc_no(counter_db, 2569) == "0203/001"  # ไม่มีการจองเลขทิ้ง
+
+    imported, invalid = import_claims(df, counter_db, ledger_path, skip_invalid=True)
+    assert imported["เลขที่ออก"].tolist() == ["0203/001", "0203/001"]
+    saved = read_ledger(ledger_path, dtype=str)
+    assert saved["ปี"].tolist() == ["2569", "2570"]
+    assert len(invalid) == 1
@@ -0,0 +1,57 @@
+"""ตัวนับเลขที่เอกสาร: หลาย process ขอเลขพร้อมกันต้องไม่ซ้ำไม่ข้าม, ปีใหม่เริ่ม 001, เลขเริ่มจาก ledger เดิม
+(ฉบับเต็มที่วัดความเร็วด้วย: benchmarks/stress_doc_numbers.py)"""
+from multiprocessing import Pool
+
+import pytest
+
+import doc_numbers
+from doc_numbers import allocate_doc_block, allocate_doc_no, parse_doc_seq, peek_next_doc_no
+from ledger import append_claims
+
+YEAR = 2569
+
+
+def _worker(args):
+    db_path, count = args
+    return [allocate_doc_no(db_path, YEAR) for _ in range(count)]
+
+
+def _nums(docs):
+    return sorted(int(doc.split("/")[-1]) for doc in docs)
+
+
+def test_concurrent_processes_no_duplicates_or_gaps(tmp_path):
+    db_path = str(tmp_path / "doc_counter.db")
+    workers, per_worker = 4, 25
+    with Pool(workers) as pool:
+        results = pool.map(_worker, [(db_path, per_worker)] * workers)
+    assert _nums(doc for batch in results for doc in batch) == list(range(1, workers * per_worker + 1))
+    assert allocate_doc_no(db_path, YEAR + 1) == "0203/001"
+
+
+def test_block_is_contiguous(tmp_path):
+    db_path = str(tmp_path / "doc_counter.db")
+    assert allocate_doc_no(db_path, YEAR) == "0203/001"
+    assert allocate_doc_block(db_path, YEAR, 3) == ["0203/002", "0203/003", "0203/004"]
+    assert peek_next_doc_no(db_path, YEAR) == "0203/005"
+
+
+def test_seed_from_ledger_follows_new_rows(tmp_path):
+    db_path = str(tmp_path / "doc_counter.db")
+    ledger_path = str(tmp_path / "database_claims.csv")
+    append_claims(ledger_path, [{"เลขที่ออก": "0203/041", "ปี": YEAR}, {"เลขที่ออก": "0203/007", "ปี": YEAR - 1}])
+    assert peek_next_doc_no(db_path, YEAR, ledger_path) == "0203/042"
+    assert peek_next_doc_no(db_path, YEAR - 1, ledger_path) == "0203/008"
+    assert ledger_path in doc_numbers._seed_cache
+
+    # ledger เปลี่ยน -> เลขเริ่มต้นต้องคำนวณใหม่ ไม่ใช้ค่าที่ cache ไว้
+    append_claims(ledger_path, [{"เลขที่ออก": "0203/050", "ปี": YEAR}])
+    assert peek_next_doc_no(db_path, YEAR, ledger_path) == "0203/051"
+    assert allocate_doc_no(db_path, YEAR, ledger_path) == "0203/051"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("0203/012", 12), ("12", 12), (" 7 ", 7), ("abc", None), ("2568/", None), ("", None),
+])
+def test_parse_doc_seq(text, expected):
+    assert parse_doc_seq(text) == expected
@@ -0,0 +1,58 @@
+"""export: CSV "ทั้งหมด" ตรงกับ ledger ทุกไบต์, ตัวกรองใช้ค่าที่แปลงแล้วแต่ส่งออกค่าเดิม, ไฟล์ชั่วคราวสำหรับปุ่มดาวน์โหลด"""
+import io
+
+import pytest
+
+from export import export_to_tempfile, iter_ledger_chunks, write_export
+from ledger import append_claims
+
+ROWS = [
+    {"เลขที่ออก": "0203/001", "วัน": 5, "เดือน": 8, "ปี": 2569, "คณะ": "ก", "จำนวนเงิน": 1000, "เรื่อง": 'มี "อัญประกาศ", จุลภาค'},
+    {"เลขที่ออก": "", "วัน": "", "เดือน": "", "ปี": "", "คณะ": "", "จำนวนเงิน": ""},
+    {"เลขที่ออก": "0203/002", "วัน": 1, "เดือน": 3, "ปี": 2570, "คณะ": "ข", "จำนวนเงิน": 12.5},
+]
+
+
+@pytest.fixture
+def ledger_path(tmp_path):
+    path = str(tmp_path / "database_claims.csv")
+    append_claims(path, ROWS)
+    return path
+
+
+def test_full_csv_export_matches_ledger_bytes(ledger_path):
+    out = io.BytesIO()
+    assert write_export(iter_ledger_chunks(ledger_path, chunksize=2), out, "csv") == 3
+    with open(ledger_path, "rb") as f:
+        assert out.getvalue() == f.read()
+
+
+def test_filters_use_processed_values_but_export_raw_strings(ledger_path):
+    # ส.ค. 2569 = ปีงบประมาณ 2570 เหมือน มี.ค. 2570
+    rows = [r for c in iter_ledger_chunks(ledger_path, year=2570, year_type="ปีงบประมาณ") for r in c.to_dict("records")]
+    assert [r["เลขที่ออก"] for r in rows] == ["0203/001", "0203/002"]
+    assert [r["จำนวนเงิน"] for r in rows] == ["1000", "12.5"]
+    assert "ปีงบประมาณ" not in rows[0]
+
+    picked = [r for c in iter_ledger_chunks(ledger_path, faculty=["ข"], seq_from=2) for r in c.to_dict("records")]
+    assert [r["เลขที่ออก"] for r in picked] == ["0203/002"]
+
+
+def test_export_to_tempfile(ledger_path):
+    out, count = export_to_tempfile(iter_ledger_chunks(ledger_path), "csv")
+    try:
+        assert isinstance(out, io.RawIOBase) and count == 3
+        with open(ledger_path, "rb") as f:
+            assert out.read() == f.read()
+    finally:
+        out.close()
+
+
+@pytest.mark.parametrize("fmt, module", [("parquet", "pyarrow"), ("xlsx", "openpyxl")])
+def test_other_formats(ledger_path, fmt, module):
+    pytest.importorskip(module)
+    out, count = export_to_tempfile(iter_ledger_chunks(ledger_path), fmt)
+    try:
+        assert count == 3 and len(out.read()) > 0
+    finally:
+        out.close()
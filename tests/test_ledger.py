@@ -0,0 +1,49 @@
+"""ledger: process_data() ให้ผลเหมือนกันไม่ว่าอ่านแบบสตริงหรือเดาชนิดข้อมูล, รายการละ 1 บรรทัดเสมอ"""
+import io
+import os
+
+import pandas as pd
+
+from ledger import append_claims, compact_ledger, needs_compaction, process_data, read_ledger, read_ledger_from
+
+CSV = "ปี,เดือน,จำนวนเงิน\n2569,3,100.5\n2569,8,\n,,\n"
+
+
+def test_blank_amounts_become_zero_with_inferred_dtypes():
+    df = process_data(pd.read_csv(io.StringIO(CSV)))
+    assert df['จำนวนเงิน'].tolist() == [100.5, 0.0, 0.0]
+
+
+def test_inferred_and_string_reads_agree():
+    inferred = process_data(pd.read_csv(io.StringIO(CSV)))
+    as_str = process_data(pd.read_csv(io.StringIO(CSV), dtype=str))
+    cols = ['ปี', 'เดือน', 'จำนวนเงิน', 'ปีงบประมาณ', 'ปีการศึกษา', 'ปีปฏิทิน']
+    pd.testing.assert_frame_equal(inferred[cols], as_str[cols], check_dtype=False)
+    assert inferred['ปีงบประมาณ'].tolist() == [2569, 2570, 0]
+
+
+def test_newlines_in_fields_stay_on_one_line(tmp_path):
+    path = str(tmp_path / "database_claims.csv")
+    append_claims(path, [{"เรื่อง": "บรรทัดแรก\nบรรทัดสอง\r\nสาม", "ปี": 2569, "จำนวนเงิน": 10}])
+    _, header_end = read_ledger_from(path)
+    append_claims(path, [{"เรื่อง": "ก\rข", "ปี": 2569, "จำนวนเงิน": 5}])
+
+    with open(path, "rb") as f:
+        assert f.read().count(b"\n") == 3  # หัวตาราง + 2 รายการ
+    full = read_ledger(path, dtype=str, keep_default_na=False)
+    assert full["เรื่อง"].tolist() == ["บรรทัดแรก บรรทัดสอง สาม", "ก ข"]
+
+    # ส่วนท้ายที่ยังเขียนไม่จบ (ไม่มี "\n") ต้องไม่ถูกนับ และ offset หยุดที่ท้ายรายการที่สมบูรณ์
+    with open(path, "ab") as f:
+        f.write("0,,1,1,2569,,,ค้าง".encode("utf-8"))
+    tail, end = read_ledger_from(path, header_end, dtype=str, keep_default_na=False)
+    assert tail["เรื่อง"].tolist() == ["ก ข"]
+    assert end == os.path.getsize(path) - len("0,,1,1,2569,,,ค้าง".encode("utf-8"))
+
+
+def test_compaction_normalises_newlines(tmp_path):
+    path = str(tmp_path / "database_claims.csv")
+    pd.DataFrame([{"เรื่อง": "a\nb", "ปี": "2569"}]).to_csv(path, index=False, encoding="utf-8-sig")
+    compact_ledger(path)
+    assert not needs_compaction(path)
+    assert read_ledger(path, dtype=str, keep_default_na=False)["เรื่อง"].tolist() == ["a b"]
@@ -0,0 +1,99 @@
+"""sqlite_store: บันทึก/อ่านกลับ, ตัวกรองของหน้าสรุป/พิมพ์ย้อนหลัง และการย้ายข้อมูลจาก CSV แบบ atomic"""
+import sqlite3
+
+import pytest
+
+import sqlite_store
+from budget_targets import write_targets
+from doc_numbers import allocate_doc_no
+from ledger import CLAIM_COLUMNS, append_claims
+
+ROWS = [
+    {"เลขที่ออก": "0203/001", "วัน": 5, "เดือน": 7, "ปี": 2569, "คณะ": "ก", "รหัสหมวด": "1", "จำนวนเงิน": 100.5},
+    {"เลขที่ออก": "0203/002", "วัน": 5, "เดือน": 8, "ปี": 2569, "คณะ": "ข", "รหัสหมวด": "1", "จำนวนเงิน": 200},
+    {"เลขที่ออก": "0203/003", "วัน": 1, "เดือน": 5, "ปี": 2570, "คณะ": "ก", "รหัสหมวด": "2", "จำนวนเงิน": 50.25},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "claims.db")
+    sqlite_store.init_db(path)
+    return path
+
+
+def test_round_trip(db):
+    sqlite_store.insert_claims(db, ROWS + [{"ปี": "", "จำนวนเงิน": "abc", "เรื่อง": None}])
+    df = sqlite_store.read_claims(db)
+    assert list(df.columns) == CLAIM_COLUMNS
+    assert df["เลขที่ออก"].tolist() == ["0203/001", "0203/002", "0203/003", ""]
+    assert df["จำนวนเงิน"].tolist() == [100.5, 200.0, 50.25, 0.0]
+    assert df["ปี"].tolist() == [2569, 2569, 2570, 0]
+    assert sqlite_store.read_claims(db, ["ปี", "คณะ"]).shape == (4, 2)
+
+
+def test_year_type_filters(db):
+    sqlite_store.insert_claims(db, ROWS)
+    # ก.ค. 2569 = ปีงบ 2569, ส.ค. 2569 = ปีงบ 2570; ก.ค./ส.ค. 2569 และ พ.ค. 2570 = ปีการศึกษา 2569
+    assert sqlite_store.summarize(db, "ปีงบประมาณ", 2569) == 100.5
+    assert sqlite_store.summarize(db, "ปีงบประมาณ", 2570) == 250.25
+    assert sqlite_store.summarize(db, "ปีการศึกษา", 2569) == 350.75
+    assert sqlite_store.summarize(db, "ปีพุทธศักราช", 2569) == 300.5
+    by_faculty = sqlite_store.summarize(db, "ปีงบประมาณ", 2570, "คณะ")
+    assert dict(zip(by_faculty["คณะ"], by_faculty["จำนวนเงิน"])) == {"ก": 50.25, "ข": 200.0}
+    assert sqlite_store.available_years(db, "ปีงบประมาณ") == [2570, 2569]
+
+
+def test_chunk_and_doc_range_filters(db):
+    sqlite_store.insert_claims(db, ROWS)
+    chunks = list(sqlite_store.iter_claim_chunks(db, chunksize=1, faculty=["ก"]))
+    assert [c["เลขที่ออก"].iloc[0] for c in chunks] == ["0203/001", "0203/003"]
+    picked = sqlite_store.select_claims(db, seq_from=2, seq_to=3)
+    assert [r["เลขที่ออก"] for r in picked] == ["0203/002", "0203/003"]
+    picked = sqlite_store.select_claims(db, year=2570, year_type="ปีงบประมาณ", faculty=["ข"])
+    assert [r["เลขที่ออก"] for r in picked] == ["0203/002"]
+
+
+def test_targets(db):
+    sqlite_store.save_target(db, "ปีงบประมาณ", 2569, 1000)
+    sqlite_store.save_target(db, "ปีงบประมาณ", 2569, 300, faculty="ก")
+    sqlite_store.save_target(db, "ปีงบประมาณ", 2569, 400, faculty="ก")
+    assert sqlite_store.get_target(db, "ปีงบประมาณ", 2569, faculty="ก") == 400
+    assert sqlite_store.get_target(db, "ปีงบประมาณ", 2570) == 0.0
+    assert sqlite_store.get_all_targets(db) == {("ปีงบประมาณ", 2569): {("", ""): 1000.0, ("ก", ""): 400.0}}
+
+
+def _csv_sources(tmp_path):
+    ledger_path = str(tmp_path / "database_claims.csv")
+    targets_path = str(tmp_path / "budget_targets.csv")
+    append_claims(ledger_path, ROWS)
+    write_targets(targets_path, {("ปีงบประมาณ", 2569): {("", ""): 1000.0, ("", "1"): 500.0}})
+    return ledger_path, targets_path
+
+
+def test_migrate_from_csv(tmp_path, db):
+    ledger_path, targets_path = _csv_sources(tmp_path)
+    assert sqlite_store.migrate_from_csv(db, ledger_path, targets_path) == (3, 2)
+    assert sqlite_store.read_claims(db)["เลขที่ออก"].tolist() == ["0203/001", "0203/002", "0203/003"]
+    assert sqlite_store.get_targets_for_year(db, "ปีงบประมาณ", 2569) == {("", ""): 1000.0, ("", "1"): 500.0}
+    # ตัวนับต่อจากเลขสูงสุดของแต่ละปีใน ledger
+    assert allocate_doc_no(db, 2569) == "0203/003"
+    assert allocate_doc_no(db, 2570) == "0203/004"
+    with pytest.raises(ValueError):
+        sqlite_store.migrate_from_csv(db, ledger_path, targets_path)
+
+
+def test_migrate_failure_leaves_database_empty(tmp_path, db, monkeypatch):
+    ledger_path, targets_path = _csv_sources(tmp_path)
+
+    def broken(conn, last_by_year):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(sqlite_store, "raise_last_doc_nos", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_store.migrate_from_csv(db, ledger_path, targets_path)
+    assert sqlite_store.read_claims(db).empty
+    assert sqlite_store.get_all_targets(db) == {}
+
+    monkeypatch.undo()
+    assert sqlite_store.migrate_from_csv(db, ledger_path, targets_path) == (3, 2)
@@ -0,0 +1,112 @@
+"""ความถูกต้องของ thai_baht: ตัวอย่างที่รู้คำตอบ + เทียบกับตัวแปลงอ้างอิงแบบอ่านทีละหลักจากสตริง"""
+import random
+
+import pytest
+
+from thai_baht import _satang_text, bahttext, bahttext_series, number_text
+
+KNOWN = {
+    0: "ศูนย์บาทถ้วน",
+    1: "หนึ่งบาทถ้วน",
+    10: "สิบบาทถ้วน",
+    11: "สิบเอ็ดบาทถ้วน",
+    20: "ยี่สิบบาทถ้วน",
+    21: "ยี่สิบเอ็ดบาทถ้วน",
+    101: "หนึ่งร้อยเอ็ดบาทถ้วน",
+    111: "หนึ่งร้อยสิบเอ็ดบาทถ้วน",
+    1000: "หนึ่งพันบาทถ้วน",
+    1001: "หนึ่งพันเอ็ดบาทถ้วน",
+    1234.5: "หนึ่งพันสองร้อยสามสิบสี่บาทห้าสิบสตางค์",
+    0.25: "ยี่สิบห้าสตางค์",
+    0.01: "หนึ่งสตางค์",
+    0.11: "สิบเอ็ดสตางค์",
+    1.005: "หนึ่งบาทหนึ่งสตางค์",  # half-up จากค่าทศนิยมที่พิมพ์ ไม่ใช่ค่า float ภายใน
+    2.675: "สองบาทหกสิบแปดสตางค์",
+    0.995: "หนึ่งบาทถ้วน",
+    999999.99: "เก้าแสนเก้าหมื่นเก้าพันเก้าร้อยเก้าสิบเก้าบาทเก้าสิบเก้าสตางค์",
+    1000000: "หนึ่งล้านบาทถ้วน",
+    1000001: "หนึ่งล้านเอ็ดบาทถ้วน",
+    11000000: "สิบเอ็ดล้านบาทถ้วน",
+    21000021: "ยี่สิบเอ็ดล้านยี่สิบเอ็ดบาทถ้วน",
+    "1,500,000.75": "หนึ่งล้านห้าแสนบาทเจ็ดสิบห้าสตางค์",
+    -50: "ลบห้าสิบบาทถ้วน",
+}
+
+_REF_DIGITS = "ศูนย์ หนึ่ง สอง สาม สี่ ห้า หก เจ็ด แปด เก้า".split()
+_REF_PLACES = ["", "สิบ", "ร้อย", "พัน", "หมื่น", "แสน"]
+
+
+def reference_number(n):
+    """ตัวแปลงอ้างอิง: ตัดสตริงเป็นกลุ่มละ 6 หลักจากขวา แล้วอ่านทีละหลัก"""
+    s = str(n)
+    if s == "0":
+        return "ศูนย์"
+    groups = []
+    while s:
+        groups.insert(0, s[-6:])
+        s = s[:-6]
+    out = ""
+    for gi, group in enumerate(groups):
+        group = group.lstrip("0")
+        for i, ch in enumerate(group):
+            place = len(group) - 1 - i
+            d = int(ch)
+            if d == 0:
+                continue
+            if place == 1 and d == 1:
+                out += "สิบ"
+            elif place == 1 and d == 2:
+                out += "ยี่สิบ"
+            elif place == 0 and d == 1 and (len(group) > 1 or gi > 0):
+                out += "เอ็ด"
+            else:
+                out += _REF_DIGITS[d] + _REF_PLACES[place]
+        if gi < len(groups) - 1:
+            out += "ล้าน"
+    return out
+
+
+def reference_satang(satang):
+    baht, st_ = divmod(satang, 100)
+    if st_ == 0:
+        return reference_number(baht) + "บาทถ้วน"
+    return (reference_number(baht) + "บาท" if baht else "") + reference_number(st_) + "สตางค์"
+
+
+@pytest.mark.parametrize("amount, expected", KNOWN.items(), ids=[str(a) for a in KNOWN])
+def test_known(amount, expected):
+    assert bahttext(amount) == expected
+
+
+@pytest.mark.parametrize("amount", [None, float("nan"), ""])
+def test_empty(amount):
+    assert bahttext(amount) == ""
+
+
+def test_every_integer_up_to_200k():
+    bad = [n for n in range(200_001) if number_text(n) != reference_number(n)]
+    assert not bad, bad[:10]
+
+
+@pytest.mark.parametrize("n", [10 ** k + d for k in range(6, 16) for d in (0, 1, 11, 21, 100_001)])
+def test_millions(n):
+    assert number_text(n) == reference_number(n)
+
+
+@pytest.mark.parametrize("baht", [0, 1, 21, 1000001])
+def test_every_satang(baht):
+    for st_ in range(100):
+        satang = baht * 100 + st_
+        assert _satang_text(satang) == reference_satang(satang)
+
+
+def test_random_amounts():
+    rng = random.Random(0)
+    for _ in range(5_000):
+        satang = rng.randrange(10 ** 15)
+        assert _satang_text(satang) == reference_satang(satang)
+
+
+def test_series_matches_scalar():
+    amounts = [0, 1.005, 21, None, 1234.5, 1.005, "1,500,000.75"]
+    assert list(bahttext_series(amounts)) == [bahttext(a) for a in amounts]
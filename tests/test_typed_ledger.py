@@ -0,0 +1,97 @@
+"""typed_ledger: Parquet ที่ตามทันแถวต่อท้าย CSV ให้ผลเหมือนอ่าน CSV ตรง ๆ, แปลงไป-กลับไม่เสียข้อมูล, เขียนล้มไม่ทิ้งไฟล์ชั่วคราว"""
+import os
+
+import pandas as pd
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import typed_ledger
+from ledger import append_claims, process_data, read_ledger
+from typed_ledger import check_round_trip, load_claims
+
+FIRST = [
+    {"NO": 1, "เลขที่ออก": "0203/001", "วัน": 5, "เดือน": 8, "ปี": 2569, "คณะ": "ก", "รหัสหมวด": "01",
+     "จำนวนเงิน": 1234.5, "เรื่อง": 'มี "อัญประกาศ", จุลภาค'},
+    {"NO": 2, "เลขที่ออก": "0203/002", "วัน": 1, "เดือน": 3, "ปี": 2570, "คณะ": "ข", "รหัสหมวด": "02",
+     "จำนวนเงิน": 0.1},
+]
+TAIL = [
+    {"NO": 3, "เลขที่ออก": "0203/003", "วัน": 30, "เดือน": 5, "ปี": 2570, "คณะ": "ค", "รหัสหมวด": "01",
+     "จำนวนเงิน": 99.99},
+    {"NO": 4, "เลขที่ออก": "", "วัน": "", "เดือน": "", "ปี": "", "คณะ": "", "จำนวนเงิน": ""},
+]
+COMPARE = ["NO", "วัน", "เดือน", "ปี", "คณะ", "รหัสหมวด", "จำนวนเงิน", "ปีงบประมาณ", "ปีการศึกษา", "ปีปฏิทิน"]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    ledger_path = str(tmp_path / "database_claims.csv")
+    append_claims(ledger_path, FIRST)
+    return ledger_path, str(tmp_path / "database_claims.parquet")
+
+
+def _normalized(df):
+    out = pd.DataFrame({col: df[col] for col in COMPARE})
+    for col in ["NO", "วัน", "เดือน", "ปี", "ปีงบประมาณ", "ปีการศึกษา", "ปีปฏิทิน"]:
+        out[col] = pd.to_numeric(out[col], errors="coerce").fillna(0).astype("int64")
+    for col in ["คณะ", "รหัสหมวด"]:
+        out[col] = out[col].astype(str)
+    out["จำนวนเงิน"] = out["จำนวนเงิน"].astype(float).round(2)
+    return out.reset_index(drop=True)
+
+
+def _expected(ledger_path):
+    return _normalized(process_data(read_ledger(ledger_path, dtype=str, keep_default_na=False)))
+
+
+@pytest.mark.parametrize("refresh_min_bytes", [typed_ledger.REFRESH_MIN_BYTES, 0])
+def test_appends_after_typed_write_match_csv(paths, monkeypatch, refresh_min_bytes):
+    # 0 = ส่วนท้ายทุกขนาดทำให้เขียน Parquet ใหม่, ค่าปกติ = ต่อส่วนท้ายในหน่วยความจำ
+    monkeypatch.setattr(typed_ledger, "REFRESH_MIN_BYTES", refresh_min_bytes)
+    monkeypatch.setattr(typed_ledger, "REFRESH_RATIO", 0.0)
+    ledger_path, typed_path = paths
+
+    pd.testing.assert_frame_equal(_normalized(load_claims(ledger_path, typed_path)), _expected(ledger_path))
+    assert os.path.exists(typed_path)
+
+    for row in TAIL:
+        append_claims(ledger_path, [row])
+        pd.testing.assert_frame_equal(_normalized(load_claims(ledger_path, typed_path)), _expected(ledger_path))
+
+    claims = load_claims(ledger_path, typed_path, columns=["ปี", "เดือน", "จำนวนเงิน_สตางค์", "เรื่อง"])
+    assert claims["จำนวนเงิน_สตางค์"].tolist() == [123450, 10, 9999, 0]
+    assert claims["เรื่อง"].iloc[0] == 'มี "อัญประกาศ", จุลภาค'
+
+
+def test_rewritten_ledger_rebuilds_typed_copy(paths):
+    ledger_path, typed_path = paths
+    load_claims(ledger_path, typed_path)
+    os.remove(ledger_path)
+    append_claims(ledger_path, TAIL[:1])
+    pd.testing.assert_frame_equal(_normalized(load_claims(ledger_path, typed_path)), _expected(ledger_path))
+
+
+def test_check_round_trip_is_clean(paths, tmp_path):
+    ledger_path, _ = paths
+    append_claims(ledger_path, TAIL)
+    work = tmp_path / "work"
+    work.mkdir()
+    assert check_round_trip(ledger_path, str(work)) == []
+
+
+def test_failed_typed_write_leaves_no_temp_file(paths, monkeypatch):
+    ledger_path, typed_path = paths
+    load_claims(ledger_path, typed_path)
+    with open(typed_path, "rb") as f:
+        before = f.read()
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pq, "write_table", fail)
+    with pytest.raises(OSError):
+        typed_ledger.csv_to_typed(ledger_path, typed_path)
+    with open(typed_path, "rb") as f:
+        assert f.read() == before
+    assert sorted(os.listdir(os.path.dirname(typed_path))) == ["database_claims.csv", "database_claims.parquet"]
@@ -0,0 +1,161 @@
+"""คิวเขียน: session บันทึกพร้อมกันขณะหน้าสรุปอ่าน/sync rollup, rollup ล้มเหลวไม่ทำให้การบันทึกล้มเหลว,
+span ของงานใน thread เขียนกลับไปอยู่ใน rerun ของผู้ส่ง (ฉบับเต็ม: benchmarks/stress_write_queue.py)"""
+import threading
+
+import pytest
+
+import perf
+import write_queue
+from dashboard_data import check_rollup, sync_monthly, sync_rollup
+from ledger import read_ledger
+from write_queue import WriteQueue
+
+YEAR = 2569
+
+
+def _claim(session, i):
+    return {"วัน": 1, "เดือน": 1 + i % 12, "ปี": YEAR, "เรื่อง": f"s{session}-{i}",
+            "คณะ": "คณะนิติศาสตร์", "จำนวนเงิน": 100.25, "รหัสหมวด": "521130002"}
+
+
+def _paths(tmp_path):
+    return str(tmp_path / "doc_counter.db"), str(tmp_path / "database_claims.csv"), str(tmp_path / "budget_rollup.json")
+
+
+def test_concurrent_sessions_with_dashboard_readers(tmp_path):
+    counter_db, ledger_path, rollup_path = _paths(tmp_path)
+    wq = WriteQueue(counter_db, ledger_path, rollup_path)
+    n_sessions, per_session = 8, 10
+    returned, errors = {}, []
+    stop = threading.Event()
+
+    def reader():
+        # หน้าสรุป sync rollup เองนอกคิว (เขียนไฟล์ rollup พร้อมกับ thread เขียน)
+        while not stop.is_set():
+            try:
+                sync_rollup(ledger_path, rollup_path)
+                sync_monthly(ledger_path, rollup_path)
+            except Exception as e:
+                errors.append(repr(e))
+
+    def session(s):
+        try:
+            for i in range(per_session):
+                returned[f"s{s}-{i}"] = wq.save_claim(_claim(s, i))
+        except Exception as e:
+            errors.append(repr(e))
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    sessions = [threading.Thread(target=session, args=(s,)) for s in range(n_sessions)]
+    for t in readers + sessions:
+        t.start()
+    for t in sessions:
+        t.join()
+    stop.set()
+    for t in readers:
+        t.join()
+    wq.close()
+
+    assert not errors, errors[:3]
+    ledger = read_ledger(ledger_path, dtype=str)
+    assert dict(zip(ledger["เรื่อง"], ledger["เลขที่ออก"])) == returned
+    nums = sorted(int(doc.split("/")[-1]) for doc in returned.values())
+    assert nums == list(range(1, n_sessions * per_session + 1))
+    assert check_rollup(ledger_path, rollup_path).empty
+
+
+def test_rollup_failure_does_not_fail_saved_claims(tmp_path, monkeypatch):
+    counter_db, ledger_path, rollup_path = _paths(tmp_path)
+
+    def broken_sync(*args):
+        raise FileNotFoundError("rollup tmp")
+
+    monkeypatch.setattr(write_queue, "sync_rollup", broken_sync)
+    wq = WriteQueue(counter_db, ledger_path, rollup_path)
+    try:
+        assert wq.save_claim(_claim(0, 0)) == "0203/001"
+    finally:
+        wq.close()
+    assert read_ledger(ledger_path, dtype=str)["เลขที่ออก"].tolist() == ["0203/001"]
+
+
+def test_writer_spans_reach_caller_rerun(tmp_path, monkeypatch):
+    counter_db, ledger_path, rollup_path = _paths(tmp_path)
+    monkeypatch.setattr(perf, "ENABLED", True)
+    # @timed ของโมดูลแอปตัดสินตอน import (ตอนนี้ปิดอยู่) จึงห่อฟังก์ชันที่ thread เขียนเรียกใหม่หลังเปิด
+    monkeypatch.setattr(write_queue, "write_claims", perf.timed("test.write_claims")(write_queue.write_claims))
+    set_target = perf.timed("test.set_target")(lambda: None)
+
+    wq = WriteQueue(counter_db, ledger_path, rollup_path)
+    try:
+        perf.start_rerun()
+        wq.save_claim(_claim(0, 0))
+        wq.call(set_target)
+        report = perf.finish_rerun("test", str(tmp_path / "perf_log.jsonl"))
+    finally:
+        wq.close()
+    names = {s["name"] for s in report["spans"]}
+    assert {"test.write_claims", "test.set_target"} <= names
+
+
+def test_failing_job_does_not_kill_writer(tmp_path, monkeypatch):
+    counter_db, ledger_path, rollup_path = _paths(tmp_path)
+    wq = WriteQueue(counter_db, ledger_path, rollup_path, timeout=10)
+
+    def fatal():
+        raise SystemExit("หลุดจาก except Exception ของ _run_call")
+
+    commit = wq._commit_claims
+    calls = []
+
+    def commit_once_broken(batch):
+        # ล้มนอก try ของ _commit_claims (เช่นบั๊กตอนรวม batch)
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise RuntimeError("batch พัง")
+        commit(batch)
+
+    monkeypatch.setattr(wq, "_commit_claims", commit_once_broken)
+    try:
+        with pytest.raises(SystemExit):
+            wq.call(fatal)
+        with pytest.raises(RuntimeError):
+            wq.save_claim(_claim(0, 0))
+        # thread เขียนยังอยู่ งานถัดไปเสร็จตามปกติ
+        assert wq.save_claim(_claim(0, 1)) == "0203/001"
+        assert wq.call(lambda: "ok") == "ok"
+    finally:
+        wq.close()
+    assert read_ledger(ledger_path, dtype=str)["เรื่อง"].tolist() == ["s0-1"]
+
+
+def test_timeout_withdraws_queued_claim(tmp_path):
+    counter_db, ledger_path, rollup_path = _paths(tmp_path)
+    wq = WriteQueue(counter_db, ledger_path, rollup_path, timeout=0.2)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+
+    try:
+        busy = wq.submit(slow)
+        assert started.wait(1)
+        # งานที่ยังรอคิวถูกถอนออก -> ยังไม่ได้บันทึกแน่นอน
+        with pytest.raises(TimeoutError, match="ยังไม่ได้บันทึก"):
+            wq.save_claim(_claim(0, 0))
+        release.set()
+        busy.result(1)
+
+        # งานที่กำลังทำอยู่ถอนไม่ได้ -> แจ้งว่าอาจบันทึกแล้ว
+        started.clear()
+        release.clear()
+        with pytest.raises(TimeoutError, match="อาจบันทึกสำเร็จ"):
+            wq.call(slow)
+        assert started.is_set()
+        release.set()
+        assert wq.save_claim(_claim(0, 1)) == "0203/001"
+    finally:
+        release.set()
+        wq.close()
+    assert read_ledger(ledger_path, dtype=str)["เรื่อง"].tolist() == ["s0-1"]
@@ -0,0 +1,82 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+
+import pandas as pd
+
+# ==========================================
+# แปลงจำนวนเงินเป็นตัวอักษรภาษาไทย
+# ==========================================
+# 1000 -> "หนึ่งพันบาทถ้วน", 21.50 -> "ยี่สิบเอ็ดบาทห้าสิบสตางค์"
+# ปัดเศษสตางค์แบบ half-up ด้วย Decimal (ไม่ใช้ float ตรง ๆ) และจำผลลัพธ์ไว้ด้วย lru_cache
+# เพราะการนำเข้าข้อมูล/พิมพ์ใบเบิกจำนวนมากจะเจอจำนวนเงินซ้ำ ๆ บ่อย
+
+_DIGITS = ["", "หนึ่ง", "สอง", "สาม", "สี่", "ห้า", "หก", "เจ็ด", "แปด", "เก้า"]
+_PLACES = ["", "สิบ", "ร้อย", "พัน", "หมื่น", "แสน"]
+
+
+def _below_million(n, units_ed):
+    """ข้อความของ 0 <= n < 1,000,000 (units_ed=True: หลักหน่วยที่เป็น 1 อ่านว่า "เอ็ด")"""
+    words = []
+    for place in range(5, -1, -1):
+        digit = (n // 10 ** place) % 10
+        if digit == 0:
+            continue
+        if place == 1:
+            words.append("สิบ" if digit == 1 else ("ยี่สิบ" if digit == 2 else _DIGITS[digit] + "สิบ"))
+        elif place == 0 and digit == 1 and units_ed:
+            words.append("เอ็ด")
+        else:
+            words.append(_DIGITS[digit] + _PLACES[place])
+    return "".join(words)
+
+
+@lru_cache(maxsize=65536)
+def number_text(n):
+    """จำนวนเต็มไม่ติดลบเป็นตัวอักษร เช่น 101 -> "หนึ่งร้อยเอ็ด", 0 -> "ศูนย์" """
+    if n == 0:
+        return "ศูนย์"
+    millions, rest = divmod(n, 1_000_000)
+    text = number_text(millions) + "ล้าน" if millions else ""
+    if rest:
+        text += _below_million(rest, units_ed=n > 1)
+    return text
+
+
+@lru_cache(maxsize=65536)
+def _satang_text(satang):
+    baht, st_ = divmod(satang, 100)
+    if st_ == 0:
+        return number_text(baht) + "บาทถ้วน"
+    text = number_text(baht) + "บาท" if baht else ""
+    return text + number_text(st_) + "สตางค์"
+
+
+def to_satang(amount):
+    """จำนวนเงิน (float/int/str/Decimal) -> จำนวนสตางค์แบบ int ปัดครึ่งขึ้น"""
+    try:
+        value = Decimal(str(amount).replace(",", "").strip())
+    except InvalidOperation:
+        raise ValueError(f"จำนวนเงินไม่ถูกต้อง: {amount!r}")
+    return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+@lru_cache(maxsize=65536)
+def _bahttext_cached(amount):
+    satang = to_satang(amount)
+    if satang < 0:
+        return "ลบ" + _satang_text(-satang)
+    return _satang_text(satang)
+
+
+def bahttext(amount):
+    """แปลงจำนวนเงินเป็นข้อความภาษาไทย เช่น 1000 -> "หนึ่งพันบาทถ้วน" (ค่าว่าง/NaN -> "")"""
+    if amount is None or (isinstance(amount, float) and amount != amount) or amount == "":
+        return ""
+    return _bahttext_cached(amount)
+
+
+def bahttext_series(amounts):
+    """แปลงทั้งคอลัมน์ โดยคำนวณเฉพาะค่าที่ไม่ซ้ำกันแล้ว map กลับ"""
+    amounts = pd.Series(amounts)
+    uniques = amounts.dropna().unique()
+    return amounts.map({a: bahttext(a) for a in uniques}).fillna("")
@@ -0,0 +1,238 @@
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from ledger import CLAIM_COLUMNS, ENCODING, atomic_write, process_data, read_ledger, read_ledger_from
+from perf import timed
+from thai_baht import to_satang
+
+# ==========================================
+# ledger แบบมีชนิดข้อมูล (typed, columnar) สำหรับงานวิเคราะห์
+# ==========================================
+# database_claims.csv ยังเป็นที่เก็บหลัก (append-only) ไฟล์นี้เป็นสำเนา Parquet ที่กำหนดชนิดข้อมูลแล้ว:
+#   ปี int16, วัน/เดือน int8, NO int32 (0 = ว่าง)
+#   จำนวนเงิน -> จำนวนเงิน_สตางค์ int64 (fixed-point ยอดรวมไม่มีเศษ float สะสม)
+#   คณะ/รหัสหมวด และช่องที่ค่าซ้ำกันมาก -> category
+#   ข้อความยาว (เรื่อง ชื่อโครงการ ฯลฯ) อ่านจากไฟล์เฉพาะเมื่อขอคอลัมน์นั้น (Parquet อ่านแยกคอลัมน์ได้)
+# ในไฟล์เก็บ inode/ขนาดของ CSV ที่แปลงไปแล้ว (เหมือน budget_rollup.json) ถ้ามีแถวใหม่ต่อท้าย
+# จะอ่านเฉพาะส่วนท้ายของ CSV มาต่อ และเขียนไฟล์ Parquet ใหม่เมื่อส่วนท้ายใหญ่เกินเกณฑ์
+#
+#   python typed_ledger.py to-parquet --ledger database_claims.csv -o database_claims.parquet
+#   python typed_ledger.py to-csv database_claims.parquet -o database_claims.csv
+
+TYPED_FILE = "database_claims.parquet"
+AMOUNT_SATANG = "จำนวนเงิน_สตางค์"
+
+INT_COLUMNS = {"NO": "int32", "วัน": "int8", "เดือน": "int8", "ปี": "int16"}
+CATEGORY_COLUMNS = ["คณะ", "รหัสหมวด", "ผู้ลงนาม", "ถึง", "ตำแหน่ง"]
+TEXT_COLUMNS = [c for c in CLAIM_COLUMNS if c not in INT_COLUMNS and c not in CATEGORY_COLUMNS and c != "จำนวนเงิน"]
+TYPED_COLUMNS = list(INT_COLUMNS) + [AMOUNT_SATANG] + CATEGORY_COLUMNS + TEXT_COLUMNS
+# คอลัมน์ที่โหลดเมื่อไม่ได้ระบุ: พอสำหรับยอดรวม/กราฟ/การวิเคราะห์ทุกแบบในหน้าสรุป
+CORE_COLUMNS = ["NO", "วัน", "เดือน", "ปี", AMOUNT_SATANG, "คณะ", "รหัสหมวด"]
+
+# เขียนไฟล์ Parquet ใหม่เมื่อส่วนท้ายที่ยังไม่ได้แปลงใหญ่กว่า 1 MB หรือ 5% ของส่วนที่แปลงแล้ว
+REFRESH_MIN_BYTES = 1 << 20
+REFRESH_RATIO = 0.05
+_META_KEY = b"payap.ledger"
+
+
+def _satang_column(amounts):
+    """สตริงจำนวนเงิน -> สตางค์ int64 ปัดครึ่งขึ้นด้วย Decimal (แปลงเฉพาะค่าที่ไม่ซ้ำ ค่าเสีย/ว่าง = 0)"""
+    def convert(value):
+        try:
+            return to_satang(value) if value else 0
+        except ValueError:
+            return 0
+    codes, uniques = pd.factorize(amounts.astype(str))
+    satang = np.array([convert(v) for v in uniques], dtype="int64")
+    return pd.Series(satang[codes], index=amounts.index)
+
+
+def to_typed(raw):
+    """DataFrame ของ ledger ที่อ่านแบบ dtype=str -> DataFrame ตาม TYPED_COLUMNS"""
+    raw = raw.reindex(columns=CLAIM_COLUMNS, fill_value="").fillna("")
+    typed = pd.DataFrame(index=raw.index)
+    for col, dtype in INT_COLUMNS.items():
+        typed[col] = pd.to_numeric(raw[col], errors="coerce").fillna(0).astype(dtype)
+    typed[AMOUNT_SATANG] = _satang_column(raw["จำนวนเงิน"])
+    for col in CATEGORY_COLUMNS:
+        typed[col] = raw[col].astype(str).astype("category")
+    for col in TEXT_COLUMNS:
+        typed[col] = raw[col].astype(str)
+    return typed
+
+
+def from_typed(typed):
+    """กลับทิศของ to_typed(): คืน DataFrame สตริงตาม CLAIM_COLUMNS (เลขจำนวนเต็ม 0 -> ช่องว่าง)"""
+    raw = pd.DataFrame(index=typed.index)
+    for col in CLAIM_COLUMNS:
+        if col in INT_COLUMNS:
+            raw[col] = typed[col].astype(str).where(typed[col] != 0, "")
+        elif col == "จำนวนเงิน":
+            # เขียนแบบเดียวกับที่แอปบันทึก float ลง CSV เช่น 1234.5, 1000.0
+            raw[col] = (typed[AMOUNT_SATANG] / 100).astype(str)
+        else:
+            raw[col] = typed[col].astype(str)
+    return raw
+
+
+def _read_meta(typed_path):
+    import pyarrow.parquet as pq
+
+    try:
+        meta = pq.read_schema(typed_path).metadata or {}
+        state = json.loads(meta[_META_KEY])
+        return state["ledger_inode"], state["ledger_size"]
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        return None
+
+
+@timed("typed.write")
+def write_typed(typed_path, typed, ledger_inode=None, ledger_size=None):
+    """เขียน DataFrame แบบ typed เป็น Parquet แบบ atomic (ผ่าน atomic_write())"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(typed[TYPED_COLUMNS], preserve_index=False)
+    state = json.dumps({"ledger_inode": ledger_inode, "ledger_size": ledger_size}).encode()
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: state})
+    atomic_write(typed_path, lambda tmp_path: pq.write_table(table, tmp_path, compression="zstd"))
+
+
+def read_typed(typed_path, columns=None):
+    """อ่านไฟล์ Parquet เฉพาะคอลัมน์ที่ขอ (None = CORE_COLUMNS)"""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(typed_path, columns=list(columns or CORE_COLUMNS)).to_pandas()
+
+
+def _concat(head, tail):
+    """ต่อ DataFrame โดยรวม category ของทั้งสองฝั่ง (ไม่งั้น pandas จะแปลงคอลัมน์เป็น object)"""
+    if tail.empty:
+        return head
+    if head.empty:
+        return tail
+    tail = tail.set_axis(pd.RangeIndex(len(head), len(head) + len(tail)))
+    for col in head.columns:
+        if isinstance(head[col].dtype, pd.CategoricalDtype):
+            categories = head[col].cat.categories.union(tail[col].cat.categories)
+            head[col] = head[col].cat.set_categories(categories)
+            tail[col] = tail[col].cat.set_categories(categories)
+    return pd.concat([head, tail])
+
+
+@timed("typed.load")
+def load_claims(ledger_path, typed_path=TYPED_FILE, columns=None):
+    """รายการเบิกทั้งหมดแบบ typed ผ่าน process_data() แล้ว (มีคอลัมน์ จำนวนเงิน เป็นบาทด้วย)
+
+    columns: คอลัมน์จาก TYPED_COLUMNS ที่ต้องการ (None = CORE_COLUMNS) ข้อความยาวจะถูกอ่านเมื่อขอเท่านั้น
+    ไฟล์ Parquet ถูกสร้าง/อัปเดตจาก ledger ให้อัตโนมัติ
+    """
+    columns = list(columns or CORE_COLUMNS)
+    try:
+        ledger_stat = os.stat(ledger_path)
+    except FileNotFoundError:
+        typed = to_typed(pd.DataFrame(columns=CLAIM_COLUMNS))[columns]
+        return _finish(typed)
+
+    state = _read_meta(typed_path)
+    if state is None or state[0] != ledger_stat.st_ino or ledger_stat.st_size < state[1]:
+        # ยังไม่มีไฟล์ หรือ ledger ถูกเขียนใหม่ (compaction/ล้างข้อมูล) -> แปลงใหม่ทั้งไฟล์
+        raw, size = read_ledger_from(ledger_path, dtype=str, keep_default_na=False)
+        typed = to_typed(raw)
+        write_typed(typed_path, typed, ledger_stat.st_ino, size)
+        return _finish(typed[columns])
+
+    inode, size = state
+    tail_raw, new_size = read_ledger_from(ledger_path, size, dtype=str, keep_default_na=False)
+    tail = to_typed(tail_raw)
+    if new_size - size > max(REFRESH_MIN_BYTES, size * REFRESH_RATIO):
+        typed = _concat(read_typed(typed_path, TYPED_COLUMNS), tail)
+        write_typed(typed_path, typed, inode, new_size)
+        return _finish(typed[columns])
+    return _finish(_concat(read_typed(typed_path, columns), tail[columns]))
+
+
+def _finish(typed):
+    typed = typed.reset_index(drop=True)
+    if AMOUNT_SATANG in typed.columns:
+        typed["จำนวนเงิน"] = typed[AMOUNT_SATANG] / 100
+    if "ปี" in typed.columns and "เดือน" in typed.columns:
+        typed = process_data(typed)
+    return typed
+
+
+def csv_to_typed(ledger_path, typed_path):
+    """แปลง ledger CSV ทั้งไฟล์เป็น Parquet คืนจำนวนรายการ"""
+    ledger_stat = os.stat(ledger_path)
+    raw, size = read_ledger_from(ledger_path, dtype=str, keep_default_na=False)
+    typed = to_typed(raw)
+    write_typed(typed_path, typed, ledger_stat.st_ino, size)
+    return len(typed)
+
+
+def typed_to_csv(typed_path, ledger_path):
+    """เขียน Parquet กลับเป็น ledger CSV (หัวตาราง/encoding เดียวกับที่แอปใช้) คืนจำนวนรายการ"""
+    raw = from_typed(read_typed(typed_path, TYPED_COLUMNS))
+    atomic_write(ledger_path,
+                 lambda tmp_path: raw[CLAIM_COLUMNS].to_csv(tmp_path, index=False, encoding=ENCODING,
+                                                            lineterminator="\n"))
+    return len(raw)
+
+
+def check_round_trip(ledger_path, tmp_dir):
+    """แปลง CSV -> Parquet -> CSV แล้วเทียบกับต้นฉบับ คืนชื่อคอลัมน์ที่ค่าไม่ตรง (ว่าง = ถูกต้อง)"""
+    typed_path = os.path.join(tmp_dir, "round_trip.parquet")
+    csv_path = os.path.join(tmp_dir, "round_trip.csv")
+    csv_to_typed(ledger_path, typed_path)
+    typed_to_csv(typed_path, csv_path)
+    before = read_ledger(ledger_path, dtype=str, keep_default_na=False)
+    after = read_ledger(csv_path, dtype=str, keep_default_na=False)
+    bad = []
+    for col in before.columns:
+        if col == "จำนวนเงิน":
+            # ตรงกันที่ความละเอียดระดับสตางค์ ("1234.50" กับ "1234.5" ถือว่าเท่ากัน)
+            same = _satang_column(before[col]).equals(_satang_column(after[col]))
+        elif col in INT_COLUMNS:
+            # "05" กับ "5" ถือว่าเท่ากัน
+            same = pd.to_numeric(before[col], errors="coerce").fillna(0).equals(
+                pd.to_numeric(after[col], errors="coerce").fillna(0))
+        else:
+            same = before[col].equals(after[col])
+        if not same:
+            bad.append(col)
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="แปลง ledger ระหว่าง CSV กับ Parquet แบบ typed")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("to-parquet", help="CSV -> Parquet")
+    pack.add_argument("--ledger", default="database_claims.csv")
+    pack.add_argument("-o", "--output", default=TYPED_FILE)
+    unpack = sub.add_parser("to-csv", help="Parquet -> CSV")
+    unpack.add_argument("typed", nargs="?", default=TYPED_FILE)
+    unpack.add_argument("-o", "--output", required=True)
+    check = sub.add_parser("check", help="ตรวจว่าแปลงไป-กลับแล้วข้อมูลเหมือนเดิม")
+    check.add_argument("--ledger", default="database_claims.csv")
+    args = parser.parse_args(argv)
+
+    if args.command == "to-parquet":
+        print(f"แปลง {csv_to_typed(args.ledger, args.output)} รายการ -> {args.output}")
+    elif args.command == "to-csv":
+        print(f"แปลง {typed_to_csv(args.typed, args.output)} รายการ -> {args.output}")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            bad = check_round_trip(args.ledger, tmp)
+        if bad:
+            print("คอลัมน์ที่ไม่ตรง: " + ", ".join(bad))
+            raise SystemExit(1)
+        print("แปลงไป-กลับได้ข้อมูลเหมือนเดิม")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+import sqlite_store
+from dashboard_data import sync_rollup
+from doc_numbers import allocate_doc_block
+from ledger import append_claims
+from perf import bind_records, current_records, timed
+
+# ==========================================
+# คิวเขียนข้อมูล (single writer) ใช้ร่วมกันทุก session ใน process
+# ==========================================
+# Streamlit รันแต่ละ session ใน thread ของตัวเอง ถ้าทุก thread เขียน ledger/rollup/วงเงินเอง
+# การบันทึกที่ชนกัน, compaction และปุ่มล้างข้อมูลอาจทำให้แถวหายหรือไฟล์ชั่วคราวทับกัน
+# ที่นี่ทุกงานเขียนถูกส่งเข้าคิวเดียว แล้ว thread เขียนตัวเดียวทำตามลำดับ:
+#   - รายการเบิกที่เข้าคิวมาติดกัน (สูงสุด max_batch) ถูกรวมเป็น group commit เดียว:
+#     จองเลขที่เอกสารเป็นก้อนต่อปี -> append + fsync ครั้งเดียว -> sync rollup ครั้งเดียว
+#     แต่ละ session ได้เลขที่เอกสารของตัวเองกลับไป
+#   - งานอื่น (บันทึกวงเงิน, นำเข้าจำนวนมาก, ล้างข้อมูล) ทำทีละงาน ไม่ซ้อนกับการเขียนใด ๆ
+# ล็อกระดับ process เท่านั้น: ถ้ารันหลาย process เลขที่เอกสารยังไม่ซ้ำเพราะตัวนับใช้ BEGIN IMMEDIATE
+# เมื่อ append ลง ledger สำเร็จแล้ว รายการถือว่าบันทึกแล้ว: ถ้า sync rollup ล้มเหลวจะ log ไว้เฉย ๆ
+# (rollup ตามทันเองในการ sync ครั้งถัดไป) ไม่ให้ session ได้ error แล้วกดบันทึกซ้ำจนรายการซ้ำ
+# span ที่เกิดใน thread เขียน (จองเลข, append, sync rollup, บันทึกวงเงิน) ถูกส่งกลับไปอยู่ใน rerun
+# ของ session ที่ส่งงานมา (perf.bind_records) จึงยังเห็นในแผงผู้ดูแลและ perf_log.jsonl
+# thread เขียนต้องไม่ตาย: ถ้ารอบใดล้มนอกงานของผู้ใช้ งานในรอบนั้นได้ exception แล้วคิวทำงานต่อ
+# ผู้ส่งงานรอไม่เกิน timeout (ค่าเริ่มต้น WRITE_TIMEOUT วินาที) งานที่ยังไม่เริ่มจะถูกถอนออกจากคิว
+# ข้อความของ TimeoutError บอกผู้ใช้ได้ว่ารายการ "ยังไม่ได้บันทึก" หรือ "อาจบันทึกแล้ว" (กันกดบันทึกซ้ำ)
+
+MAX_BATCH = 256
+WRITE_TIMEOUT = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("kind", "payload", "future", "records")
+
+    def __init__(self, kind, payload):
+        self.kind = kind
+        self.payload = payload
+        self.future = Future()
+        # span list ของ rerun ที่ส่งงานนี้มา (None = ไม่ได้จับเวลา)
+        self.records = current_records()
+
+
+class WriteQueue:
+    """คิวงานเขียนของ process เดียว (สร้างครั้งเดียวด้วย st.cache_resource)"""
+
+    def __init__(self, counter_db, ledger_path=None, rollup_path=None, sqlite_db=None, max_batch=MAX_BATCH,
+                 timeout=WRITE_TIMEOUT):
+        self.counter_db = counter_db
+        self.ledger_path = ledger_path
+        self.rollup_path = rollup_path
+        self.sqlite_db = sqlite_db
+        self.max_batch = max_batch
+        self.timeout = timeout
+        # สถิติสำหรับ benchmark: จำนวน group commit และจำนวนรายการที่เขียนไปแล้ว
+        self.commits = 0
+        self.claims_written = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    # ---------- ฝั่ง session ----------
+
+    def submit_claim(self, row):
+        """ส่งรายการเบิก 1 รายการเข้าคิว คืน Future ที่ให้เลขที่เอกสาร ("0203/NNN")"""
+        job = _Job("claim", dict(row))
+        self._queue.put(job)
+        return job.future
+
+    @timed("queue.save_claim")
+    def save_claim(self, row, timeout=None):
+        """บันทึกรายการเบิกแล้วรอจนเขียนลงดิสก์ คืนเลขที่เอกสารที่จองให้ (timeout=None = self.timeout)"""
+        return self._wait(self.submit_claim(row), timeout)
+
+    def submit(self, func, *args, **kwargs):
+        """ส่งงานเขียนอื่น ๆ (func ถูกเรียกใน thread เขียน) คืน Future ของผลลัพธ์"""
+        job = _Job("call", (func, args, kwargs))
+        self._queue.put(job)
+        return job.future
+
+    @timed("queue.call")
+    def call(self, func, *args, timeout=None, **kwargs):
+        """เหมือน submit() แต่รอผลลัพธ์ไม่เกิน timeout วินาที (None = self.timeout)
+        exception ของ func ถูก raise ที่ผู้เรียก"""
+        if threading.current_thread() is self._thread:
+            # เรียกซ้อนจากงานที่กำลังทำอยู่ใน thread เขียน -> ทำเลย (ถ้าเข้าคิวจะรอตัวเองตลอดไป)
+            return func(*args, **kwargs)
+        return self._wait(self.submit(func, *args, **kwargs), timeout)
+
+    def _wait(self, future, timeout):
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except TimeoutError:
+            if future.cancel():
+                raise TimeoutError("ระบบบันทึกข้อมูลไม่ว่าง รายการนี้ยังไม่ได้บันทึก กรุณาลองใหม่อีกครั้ง") from None
+            raise TimeoutError("ระบบบันทึกข้อมูลตอบช้ากว่าปกติ รายการอาจบันทึกสำเร็จภายหลัง "
+                               "กรุณาตรวจสอบในหน้าสรุปก่อนบันทึกซ้ำ") from None
+
+    def close(self):
+        """รอให้งานที่ค้างในคิวเสร็จแล้วหยุด thread เขียน"""
+        self._queue.put(_Job("stop", None))
+        self._thread.join()
+
+    # ---------- ฝั่ง thread เขียน ----------
+
+    def _run(self):
+        pending = None
+        while True:
+            job = pending or self._queue.get()
+            pending = None
+            if job.kind == "stop":
+                return
+            # False = ผู้ส่งรอจนหมดเวลาแล้วถอนงานออก (Future.cancel) -> ข้าม
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            batch = [job]
+            try:
+                if job.kind == "call":
+                    self._run_call(job)
+                    continue
+
+                # ดึงรายการเบิกที่รออยู่ในคิวตอนนี้มารวมกัน (ไม่รอเพิ่ม: ระหว่าง fsync ของรอบก่อนงานจะสะสมเอง)
+                while len(batch) < self.max_batch:
+                    try:
+                        nxt = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if nxt.kind != "claim":
+                        pending = nxt
+                        break
+                    if nxt.future.set_running_or_notify_cancel():
+                        batch.append(nxt)
+                self._commit_claims(batch)
+            except BaseException as e:
+                # ล้มนอก try ของ _run_call/_commit_claims (หรือ func โยน BaseException เช่น SystemExit):
+                # งานในรอบนี้ต้องได้ผลเสมอ ไม่งั้นผู้ส่งรอจนหมดเวลา แล้ว thread เขียนทำงานต่อ
+                logger.exception("งานในคิวเขียนล้มเหลว (%d งาน)", len(batch))
+                for failed in batch:
+                    if not failed.future.done():
+                        failed.future.set_exception(e)
+
+    def _run_call(self, job):
+        func, args, kwargs = job.payload
+        try:
+            with bind_records(job.records):
+                result = func(*args, **kwargs)
+        except Exception as e:
+            job.future.set_exception(e)
+        else:
+            job.future.set_result(result)
+
+    def _commit_claims(self, batch):
+        rows = [job.payload for job in batch]
+        spans = []
+        try:
+            with bind_records(spans):
+                by_year = {}
+                for i, row in enumerate(rows):
+                    by_year.setdefault(int(row["ปี"]), []).append(i)
+                ledger_for_seed = None if self.sqlite_db else self.ledger_path
+                for year, idx in by_year.items():
+                    for i, doc_no in zip(idx, allocate_doc_block(self.counter_db, year, len(idx), ledger_for_seed)):
+                        rows[i]["เลขที่ออก"] = doc_no
+                write_claims(rows, self.ledger_path, self.rollup_path, self.sqlite_db)
+        except Exception as e:
+            self._share_spans(batch, spans)
+            for job in batch:
+                job.future.set_exception(e)
+            return
+        self._share_spans(batch, spans)
+        self.commits += 1
+        self.claims_written += len(rows)
+        for job, row in zip(batch, rows):
+            job.future.set_result(row["เลขที่ออก"])
+
+    @staticmethod
+    def _share_spans(batch, spans):
+        """group commit ทำงานแทนทุก session ใน batch -> ทุก rerun ที่รออยู่ได้ span ชุดเดียวกัน"""
+        for job in batch:
+            if job.records is not None:
+                job.records.extend(spans)
+
+
+def write_claims(rows, ledger_path=None, rollup_path=None, sqlite_db=None):
+    """เขียนรายการทั้งชุดในครั้งเดียว (CSV: append + fsync ครั้งเดียว แล้ว sync rollup, SQLite: transaction เดียว)"""
+    if sqlite_db:
+        sqlite_store.insert_claims(sqlite_db, rows)
+        return
+    append_claims(ledger_path, rows)
+    if rollup_path:
+        try:
+            sync_rollup(ledger_path, rollup_path)
+        except Exception:
+            # รายการอยู่ใน ledger แล้ว rollup จะตามทันใน sync ครั้งถัดไป (ดูหมายเหตุด้านบน)
+            logger.exception("sync rollup หลังบันทึก %d รายการไม่สำเร็จ", len(rows))